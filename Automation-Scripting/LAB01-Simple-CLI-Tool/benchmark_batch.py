@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+LAB01 - Batch and Stream Mode Benchmark
+
+Compares four ways of running the calculator over many rows:
+
+- one process per row, as a shell loop would (timed on a sample of rows
+  and scaled up, since a million launches would take too long)
+- batch mode on a CSV file
+- batch mode on a binary file of float64 pairs
+- stream mode, piped "x y op" records cycling through the operations
+  (run a second time on five copies of the input, to show that its
+  memory use doesn't grow with the stream)
+
+Every result is checked against a plain Python calculation. One row in
+ten divides by zero.
+
+Usage:
+    python benchmark_batch.py
+    python benchmark_batch.py --rows 5000000 --op mul
+"""
+
+import argparse
+import math
+import os
+import random
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli_tool.py")
+
+OPERATIONS = ("add", "sub", "mul", "div")
+
+
+def make_rows(count, seed=1):
+    """Random x and y values, every tenth y zero."""
+    rng = random.Random(seed)
+    return [(round(rng.uniform(-1000, 1000), 3), 0.0 if number % 10 == 0 else float(rng.randint(-50, 50) or 1))
+            for number in range(count)]
+
+
+def expected(rows, operation):
+    """The results, computed one row at a time in plain Python."""
+    results = []
+    for number, (x, y) in enumerate(rows):
+        row_operation = operation or OPERATIONS[number % len(OPERATIONS)]
+        if row_operation == "div" and y == 0:
+            results.append(math.nan)
+        else:
+            results.append({"add": x + y, "sub": x - y, "mul": x * y, "div": x / y if y else 0}[row_operation])
+    return results
+
+
+def matches(results, wanted, decimals=6):
+    """Whether results match the expected values to `decimals` places."""
+    return len(results) == len(wanted) and all(
+        math.isnan(a) and math.isnan(b) or abs(a - b) <= 0.6 * 10 ** -decimals + 1e-12 * abs(b)
+        for a, b in zip(results, wanted))
+
+
+def run_batch(input_file, output_file, operation, format):
+    """Run batch mode in a new process, return the elapsed seconds."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, SCRIPT, "--batch", input_file, "--op", operation, "--format", format,
+                    "--output", output_file], check=True, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def run_stream(input_file, output_file, copies=1):
+    """
+    Pipe copies of input_file through stream mode; return the seconds and
+    its peak RSS in MB.
+
+    The pipeline is started from a fresh child process: a process forked
+    from this one, holding all the rows, would count their memory in its
+    own peak.
+    """
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", input_file, output_file,
+                             str(copies)], check=True, stdout=subprocess.PIPE, text=True)
+    seconds, peak_mb = result.stdout.split()
+    return float(seconds), float(peak_mb)
+
+
+def child(input_file, output_file, copies):
+    """Run the stream pipeline for run_stream() and print its seconds and peak RSS."""
+    start = time.perf_counter()
+    with open(output_file, "wb") as output:
+        producer = subprocess.Popen(["cat"] + [input_file] * int(copies), stdout=subprocess.PIPE)
+        process = subprocess.Popen([sys.executable, SCRIPT, "--stream"], stdin=producer.stdout, stdout=output,
+                                   stderr=subprocess.DEVNULL)
+        producer.stdout.close()
+        _, status, usage = os.wait4(process.pid, 0)
+        producer.wait()
+    if status != 0:
+        raise RuntimeError(f"Stream mode failed with status {status}")
+    print(time.perf_counter() - start, usage.ru_maxrss / 1024)
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Benchmark the calculator's batch mode.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows to calculate (default: 1000000)")
+    parser.add_argument("--op", choices=OPERATIONS, default="div",
+                        help="Operation to benchmark (default: div)")
+    parser.add_argument("--sample", type=int, default=50,
+                        help="Rows run as separate processes, to time one launch per row (default: 50)")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    print("Batch and Stream Mode Benchmark")
+    print("===============================")
+
+    rows = make_rows(args.rows)
+    wanted = expected(rows, args.op)
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_file = os.path.join(workdir, "rows.csv")
+        binary_file = os.path.join(workdir, "rows.f64")
+        with open(csv_file, "w") as file:
+            file.write("x,y\n")
+            file.writelines(f"{x},{y}\n" for x, y in rows)
+        with open(binary_file, "wb") as file:
+            file.write(b"".join(struct.pack("<dd", x, y) for x, y in rows))
+
+        start = time.perf_counter()
+        for x, y in rows[:args.sample]:
+            subprocess.run([sys.executable, SCRIPT, "--op", args.op, "--", str(x), str(y)],
+                           check=True, stdout=subprocess.DEVNULL)
+        per_row = (time.perf_counter() - start) / args.sample
+
+        csv_seconds = run_batch(csv_file, os.path.join(workdir, "out.csv"), args.op, "csv")
+        with open(os.path.join(workdir, "out.csv")) as file:
+            csv_ok = matches([float(line) if line.strip() else math.nan for line in file], wanted)
+        binary_seconds = run_batch(binary_file, os.path.join(workdir, "out.f64"), args.op, "binary")
+        with open(os.path.join(workdir, "out.f64"), "rb") as file:
+            binary_ok = matches([value for value, in struct.iter_unpack("<d", file.read())], wanted)
+
+        stream_file = os.path.join(workdir, "records.txt")
+        with open(stream_file, "w") as file:
+            file.writelines(f"{x} {y} {OPERATIONS[number % len(OPERATIONS)]}\n" for number, (x, y) in enumerate(rows))
+        stream_seconds, stream_mb = run_stream(stream_file, os.path.join(workdir, "stream.csv"))
+        with open(os.path.join(workdir, "stream.csv")) as file:
+            stream_ok = matches([float(line) if line.strip() else math.nan for line in file], expected(rows, None))
+        long_seconds, long_mb = run_stream(stream_file, os.devnull, copies=5)
+
+    print(f"{args.rows} rows, --op {args.op}\n")
+    print(f"{'Mode':<24} {'Seconds':>9} {'Rows/s':>12}  Verified")
+    print(f"{'one process per row':<24} {per_row * args.rows:>9.0f} {1 / per_row:>12,.0f}  "
+          f"(estimated from {args.sample} rows)")
+    for name, seconds, ok in (("batch, CSV", csv_seconds, csv_ok), ("batch, binary", binary_seconds, binary_ok),
+                              ("stream, x y op", stream_seconds, stream_ok)):
+        print(f"{name:<24} {seconds:>9.2f} {args.rows / seconds:>12,.0f}  {'yes' if ok else 'NO'}")
+    print(f"{'stream, 5x as long':<24} {long_seconds:>9.2f} {5 * args.rows / long_seconds:>12,.0f}")
+    print(f"\nStream mode peak RSS: {stream_mb:.0f} MB for {args.rows} records, "
+          f"{long_mb:.0f} MB for {5 * args.rows}.")
+    print("Times include starting Python (and importing NumPy).")
+
+
+if __name__ == "__main__":
+    main()
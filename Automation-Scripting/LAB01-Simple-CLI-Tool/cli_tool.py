@@ -5,57 +5,596 @@ LAB01 - Simple CLI Calculator Tool
 This script demonstrates how to build a command-line interface (CLI) tool using argparse.
 The tool performs basic arithmetic operations based on user input.
 
+Batch mode applies one operation to every row of a file of x and y columns,
+so millions of calculations cost one process launch instead of one each.
+The input is CSV (two numbers per line, separated by a comma or spaces) or
+raw binary (x and y as little-endian float64 pairs). It is read and
+answered a block at a time, so memory use stays flat however long it is.
+With NumPy installed, each block is computed as whole arrays; without it,
+row by row. A division by zero only blanks its own row (an empty line in
+CSV output, NaN in binary output) and is counted in the summary.
+
+Stream mode reads endless "x y op" records from stdin (each with its own
+operation) and answers them as they come, a block at a time: large blocks
+while the input floods in, a line at a time while it trickles. Memory use
+is bounded by the block size, however long the stream runs.
+
 Usage:
     python cli_tool.py 10 5 --op add     # Addition
     python cli_tool.py 10 5 --op sub     # Subtraction
     python cli_tool.py 10 5 --op mul     # Multiplication
     python cli_tool.py 10 5 --op div     # Division
+    python cli_tool.py --batch pairs.csv --op div > results.csv
+    cat pairs.csv | python cli_tool.py --batch - --op mul --output results.csv
+    python cli_tool.py --batch pairs.f64 --format binary --op add --output results.f64
+    producer | python cli_tool.py --stream | consumer
 """
 
-# TODO: Import the required modules
-# import argparse
-# import sys
+import argparse
+import array
+import math
+import os
+import select
+import sys
+import time
+import warnings
+
+try:
+    import numpy
+except ImportError:  # Optional: batch mode computes row by row without it
+    numpy = None
+
+
+OPERATIONS = ("add", "sub", "mul", "div")
+
+# Batch input is read this many bytes at a time
+BLOCK_SIZE = 1024 * 1024
+
+# Bytes per row of binary batch input: x and y as little-endian float64
+ROW_BYTES = 16
+
+# Longest stream record accepted, in bytes
+MAX_RECORD = 4096
+
+# Turns "add", "sub", "mul" and "div" into "0  ", "1  ", "2  " and " 3 " (and commas into spaces)
+_OPERATION_CODES = bytes.maketrans(b"a,dsubmliv", b"0  1  2 3 ")
+
+# Keeps one digit per operation name, as above, and nothing else
+_OPERATION_NAMES = bytes.maketrans(b"asmi", b"0123")
+_NOT_OPERATION_NAMES = bytes(byte for byte in range(256) if byte not in b"asmi")
+_OPERATION_ENDINGS = tuple(name.encode() for name in OPERATIONS)
+
+# Which bytes split fields, as bytes.split() sees them (commas are spaces by then)
+_WHITESPACE = numpy.array([byte in b" \t\n\r\x0b\x0c" for byte in range(256)]) if numpy else None
+
+# Batch results are written rounded to this many decimals
+DEFAULT_DECIMALS = 6
+
+# Text of 0000-9999 (one column per number), for formatting four digits at a time
+_DIGITS = numpy.array([list(b"%04d" % number) for number in range(10000)], dtype=numpy.uint8).T if numpy else None
 
 
 def main():
     """Main function to set up and run the CLI calculator."""
-    # TODO: Create an argument parser with a description
-    
-    # TODO: Add arguments for the numbers and operation
-    # - Add x as first positional argument (number)
-    # - Add y as second positional argument (number)
-    # - Add --op as optional argument with choices and default value
-    
-    # TODO: Parse the arguments
-    
-    # TODO: Perform the calculation based on the operation
-    
-    # TODO: Display the result to the user
-    
-    # Optional: Display available commands
-    pass
+    parser = argparse.ArgumentParser(description="A simple command-line calculator tool")
+    parser.add_argument("x", type=float, nargs="?", help="First number")
+    parser.add_argument("y", type=float, nargs="?", help="Second number")
+    parser.add_argument("--op", choices=OPERATIONS, default="add", help="Operation to perform (default: add)")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="Apply the operation to every x,y row of FILE ('-' for stdin)")
+    parser.add_argument("--format", choices=("csv", "binary"), default="csv",
+                        help="Batch input and output format (default: csv)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Answer 'x y op' records from stdin, one result per line, until it closes")
+    parser.add_argument("--output", metavar="FILE", help="Write batch or stream results to FILE (default: stdout)")
+    parser.add_argument("--decimals", type=int, choices=range(1, 13), default=DEFAULT_DECIMALS, metavar="N",
+                        help=f"Decimals of batch and stream results, 1-12 (default: {DEFAULT_DECIMALS})")
+    args = parser.parse_args()
+
+    if args.stream:
+        if args.x is not None or args.batch:
+            parser.error("--stream reads its numbers from stdin")
+        stream(args.output, args.decimals)
+        return
+
+    if args.batch:
+        if args.x is not None:
+            parser.error("numbers can't be given with --batch")
+        started = time.perf_counter()
+        try:
+            input_file = sys.stdin.buffer if args.batch == "-" else open(args.batch, "rb")
+            output_file = open(args.output, "wb") if args.output else sys.stdout.buffer
+            with input_file, output_file:
+                rows, errors = run_batch(input_file, output_file, args.op, args.format, args.decimals)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        # Stdout may hold the results, so the summary goes to stderr
+        print(f"Calculated {rows} rows in {time.perf_counter() - started:.2f}s"
+              + (f"; {errors} divisions by zero left blank" if errors else ""), file=sys.stderr)
+        return
+
+    if args.x is None or args.y is None:
+        parser.error("two numbers are required (or --batch FILE, or --stream)")
+    result = calculate(args.x, args.y, args.op)
+    if result is not None:
+        print(f"Result: {result}")
 
 
 def calculate(x, y, operation):
     """
     Perform calculation based on the specified operation.
-    
+
     Args:
         x (float): First number
         y (float): Second number
         operation (str): Operation to perform
-        
+
+    Returns:
+        float: Result of the calculation, or None if it can't be done
+    """
+    if operation == "add":
+        return x + y
+    elif operation == "sub":
+        return x - y
+    elif operation == "mul":
+        return x * y
+    elif operation == "div":
+        try:
+            return x / y
+        except ZeroDivisionError:
+            print("Error: Division by zero is not allowed.")
+            return None
+    else:
+        print(f"Error: Unknown operation '{operation}'.")
+        return None
+
+
+def calculate_block(x, y, operation):
+    """
+    Apply an operation to whole columns at once.
+
+    Args:
+        x: First numbers (NumPy array, or list without NumPy)
+        y: Second numbers, as many as x
+        operation (str): Operation to perform
+
+    Returns:
+        tuple: (results, number of rows divided by zero); those rows are NaN
+    """
+    if numpy is None:
+        results = [math.nan if operation == "div" and b == 0 else _apply(a, b, operation) for a, b in zip(x, y)]
+        return results, sum(1 for b in y if b == 0) if operation == "div" else 0
+    with numpy.errstate(over="ignore", invalid="ignore"):  # inf and NaN results are passed on
+        if operation == "add":
+            return numpy.add(x, y), 0
+        if operation == "sub":
+            return numpy.subtract(x, y), 0
+        if operation == "mul":
+            return numpy.multiply(x, y), 0
+        # Rows with a zero divisor are masked out rather than turned into inf
+        zero = y == 0
+        results = numpy.divide(x, y, out=numpy.full(len(x), numpy.nan), where=~zero)
+        return results, int(numpy.count_nonzero(zero))
+
+
+def _apply(x, y, operation):
+    """calculate() for one row of a batch, without the error messages."""
+    if operation == "add":
+        return x + y
+    if operation == "sub":
+        return x - y
+    if operation == "mul":
+        return x * y
+    return x / y
+
+
+def parse_lines(data, first_line=1):
+    """
+    Parse CSV rows of two numbers, one row per line. Blank lines are skipped.
+
+    Returns:
+        tuple: (x values, y values) as lists
+
+    Raises:
+        ValueError: If a line doesn't hold exactly two numbers
+    """
+    xs, ys = [], []
+    for number, line in enumerate(data.split(b"\n"), first_line):
+        fields = line.replace(b",", b" ").split()
+        if not fields:
+            continue
+        try:
+            if len(fields) != 2:
+                raise ValueError
+            xs.append(float(fields[0]))
+            ys.append(float(fields[1]))
+        except ValueError:
+            raise ValueError(f"line {number}: expected two numbers, got {line.decode(errors='replace')!r}") from None
+    return xs, ys
+
+
+def parse_csv_block(data, first_line=1):
+    """
+    Parse a block of whole CSV lines into x and y columns.
+
+    With NumPy, the block is parsed in one call, when every line has
+    exactly one comma and every field is one number; otherwise (blank
+    lines, space-separated or malformed ones) it is parsed again line by
+    line, which skips blank lines and reports the bad line.
+    """
+    if numpy is not None:
+        text = data[:-1] if data.endswith(b"\n") else data
+        rows = text.count(b"\n") + 1
+        raw = numpy.frombuffer(text, dtype=numpy.uint8)
+        commas = numpy.flatnonzero(raw == ord(","))
+        # The i-th comma must be on line i, so that no values of two lines run together
+        one_comma_per_line = len(commas) == rows and numpy.array_equal(
+            numpy.searchsorted(numpy.flatnonzero(raw == ord("\n")), commas), numpy.arange(rows))
+        values = None
+        if one_comma_per_line:
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("error", DeprecationWarning)
+                    values = numpy.fromstring(text.replace(b"\n", b","), sep=",")
+            except (ValueError, DeprecationWarning):
+                values = None
+        if values is not None and values.size == 2 * rows:
+            return values[0::2], values[1::2]
+    xs, ys = parse_lines(data, first_line)
+    if numpy is not None:
+        return numpy.array(xs, dtype=numpy.float64), numpy.array(ys, dtype=numpy.float64)
+    return xs, ys
+
+
+def read_csv_blocks(file):
+    """
+    Read CSV input a block of whole lines at a time. A first line with no
+    digits in it (a header such as "x,y") is skipped; a malformed first
+    row of numbers is reported like any other.
+
+    Yields:
+        tuple: (x values, y values) of each block
+    """
+    line_number = 1
+    rest = b""
+    first = True
+    while True:
+        data = file.read(BLOCK_SIZE)
+        if not data:
+            break
+        data = rest + data
+        end = data.rfind(b"\n") + 1
+        if end == 0:  # No whole line yet
+            rest = data
+            continue
+        data, rest = data[:end], data[end:]
+        if first:
+            first = False
+            header, _, body = data.partition(b"\n")
+            if not any(char.isdigit() for char in header.decode(errors="replace")):
+                data = body
+                line_number += 1
+        if data:
+            yield parse_csv_block(data, line_number)
+        line_number += data.count(b"\n")
+    if rest.strip():
+        yield parse_csv_block(rest, line_number)
+
+
+def read_binary_blocks(file):
+    """
+    Read binary input (x, y float64 pairs) a block at a time.
+
+    Yields:
+        tuple: (x values, y values) of each block
+
+    Raises:
+        ValueError: If the input ends in the middle of a row
+    """
+    while True:
+        data = file.read(BLOCK_SIZE - BLOCK_SIZE % ROW_BYTES)
+        if not data:
+            break
+        # A pipe may return less than asked; top up to whole rows
+        while len(data) % ROW_BYTES:
+            more = file.read(ROW_BYTES - len(data) % ROW_BYTES)
+            if not more:
+                raise ValueError(f"binary input ends in the middle of a row ({ROW_BYTES} bytes per row)")
+            data += more
+        if numpy is not None:
+            values = numpy.frombuffer(data, dtype="<f8")
+            yield values[0::2], values[1::2]
+        else:
+            values = array.array("d", data)
+            if sys.byteorder == "big":
+                values.byteswap()
+            yield values[0::2], values[1::2]
+
+
+def format_csv(results, decimals=DEFAULT_DECIMALS):
+    """
+    Format results as CSV lines, rounded to `decimals` and without trailing
+    zeros (15.0, 0.333333); NaN rows become empty lines.
+
+    With NumPy, the text of a whole block is built at once as a byte
+    matrix with one column per result (so that every step works on
+    contiguous memory), a lookup table giving four digits at a time. The
+    unused bytes of each result are then dropped in one pass.
+    """
+    if numpy is None or not len(results):
+        return _format_values(results, decimals)
+    blank = numpy.isnan(results)
+    scaled = numpy.rint(numpy.abs(results) * 10.0 ** decimals)
+    scaled[blank] = 0
+    if scaled.max() >= 1e18:  # inf, or too large for int64
+        return _format_values(results.tolist(), decimals)
+    scaled = scaled.astype(numpy.int64)
+
+    # Digits of every result, in groups of four
+    groups = max((len(str(int(scaled.max()))) + 3) // 4, (decimals + 4) // 4)
+    width = groups * 4
+    whole_width = width - decimals
+    digits = numpy.empty((width, len(results)), dtype=numpy.uint8)
+    rest = scaled
+    for group in range(groups - 1, -1, -1):
+        rest, low = numpy.divmod(rest, 10000)
+        digits[group * 4:group * 4 + 4] = _DIGITS[:, low]
+
+    # Text of each result: "-", the integer digits, ".", the decimals, "\n"
+    text = numpy.empty((width + 3, len(results)), dtype=numpy.uint8)
+    text[0] = ord("-")
+    text[1:1 + whole_width] = digits[:whole_width]
+    text[1 + whole_width] = ord(".")
+    text[2 + whole_width:2 + width] = digits[whole_width:]
+    text[-1] = ord("\n")
+
+    # Keep the sign of negative results, the integer digits from the first
+    # significant one and the decimals up to the last non-zero one (at
+    # least one of each)
+    keep = numpy.ones(text.shape, dtype=bool)
+    keep[0] = (results < 0) & (scaled != 0)
+    seen = numpy.zeros(len(results), dtype=bool)
+    for column in range(whole_width - 1):
+        seen |= digits[column] != ord("0")
+        keep[1 + column] = seen
+    seen[:] = False
+    for column in range(width - 1, whole_width, -1):
+        seen |= digits[column] != ord("0")
+        keep[2 + column] = seen
+    keep[:-1, blank] = False
+    return text.T[keep.T].tobytes()
+
+
+def _format_values(values, decimals):
+    """format_csv() one value at a time."""
+    return "".join("\n" if value != value else f"{round(value, decimals) + 0.0!r}\n" for value in values).encode()
+
+
+def format_binary(results):
+    """Format results as little-endian float64 (NaN for rows divided by zero)."""
+    if numpy is not None:
+        return numpy.asarray(results, dtype="<f8").tobytes()
+    values = array.array("d", results)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def run_batch(input_file, output_file, operation, format="csv", decimals=DEFAULT_DECIMALS):
+    """
+    Apply an operation to every row of a batch input, writing the results
+    as each block is done.
+
+    Args:
+        input_file: Binary file to read rows from
+        output_file: Binary file to write results to, one per row
+        operation (str): Operation to perform
+        format (str): "csv" or "binary", for both input and output
+        decimals (int): Decimals of CSV results
+
     Returns:
-        float: Result of the calculation
+        tuple: (rows calculated, rows divided by zero)
+
+    Raises:
+        ValueError: If the input is malformed
     """
-    # TODO: Implement the calculation logic for different operations
-    # - Addition (add)
-    # - Subtraction (sub)
-    # - Multiplication (mul)
-    # - Division (div)
-    # - Handle potential errors (like division by zero)
-    pass
+    blocks = read_csv_blocks(input_file) if format == "csv" else read_binary_blocks(input_file)
+    rows = errors = 0
+    for x, y in blocks:
+        results, zero = calculate_block(x, y, operation)
+        output_file.write(format_csv(results, decimals) if format == "csv" else format_binary(results))
+        rows += len(x)
+        errors += zero
+    return rows, errors
+
+
+def read_available(file, size=BLOCK_SIZE):
+    """
+    Read a stream in blocks of up to size bytes, without waiting for a
+    block to fill: each block holds what had arrived when it was read.
+    A busy stream thus gives large blocks and a slow one small blocks, so
+    its records are answered as they come.
+
+    Yields:
+        bytes: The next block, until the end of the stream
+    """
+    fd = file.fileno()
+    while True:
+        data = os.read(fd, size)
+        if not data:
+            return
+        parts = [data]
+        length = len(data)
+        while length < size and _readable(fd):
+            more = os.read(fd, size - length)
+            if not more:
+                break
+            parts.append(more)
+            length += len(more)
+        yield b"".join(parts)
+
+
+def _readable(fd):
+    """Whether fd has data that can be read without waiting."""
+    try:
+        return bool(select.select([fd], [], [], 0)[0])
+    except (OSError, ValueError):  # select() only handles sockets on Windows
+        return False
+
+
+def parse_records(data):
+    """
+    Parse whole "x y op" lines (commas may separate the fields too).
+
+    With NumPy, the operation names are first turned into their index in
+    OPERATIONS, one letter becoming the digit and the others spaces, so
+    that the block parses in one call as three numbers per line. The block
+    is parsed line by line instead if any line doesn't have three fields,
+    or if the codes read don't match the operation names in the text.
+
+    Returns:
+        tuple: (x values, y values, operation indexes, malformed lines);
+            a malformed line gets index -1
+    """
+    # "inf" and "nan" share letters with the operation names, so leave them to the line parser
+    if numpy is not None and b"n" not in data and data.rstrip().endswith(_OPERATION_ENDINGS):
+        rows = data.count(b"\n") + (not data.endswith(b"\n"))
+        names = numpy.frombuffer(data.translate(_OPERATION_NAMES, _NOT_OPERATION_NAMES), dtype=numpy.uint8)
+        codes = data.translate(_OPERATION_CODES)
+        raw = numpy.frombuffer(codes, dtype=numpy.uint8)
+        space = _WHITESPACE[raw]
+        starts = numpy.flatnonzero(~space & numpy.concatenate(([True], space[:-1])))
+        # The i-th field must be on line i // 3, so that no line has more or fewer than three
+        three_per_line = len(starts) == 3 * rows and numpy.array_equal(
+            numpy.searchsorted(numpy.flatnonzero(raw == ord("\n")), starts), numpy.arange(3 * rows) // 3)
+        values = None
+        if len(names) == rows and three_per_line:
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("error", DeprecationWarning)
+                    # An exact count parses into one allocation: letting the array grow
+                    # fragments the heap a little more with every block
+                    values = numpy.fromstring(codes, sep=" ", count=3 * rows)
+            except (ValueError, DeprecationWarning):
+                values = None
+        # Each code must also sit where its name was, at the end of its line
+        if values is not None and numpy.array_equal(values[2::3], names - ord("0")):
+            return values[0::3], values[1::3], values[2::3].astype(numpy.int8), 0
+
+    xs, ys, operations = [], [], []
+    malformed = 0
+    for line in data.splitlines():
+        fields = line.replace(b",", b" ").split()
+        if not fields:
+            continue
+        try:
+            x, y = float(fields[0]), float(fields[1])
+            operation = OPERATIONS.index(fields[2].decode())
+            if len(fields) != 3:
+                raise ValueError
+        except (ValueError, IndexError, UnicodeDecodeError):
+            x = y = math.nan
+            operation = -1
+            malformed += 1
+        xs.append(x)
+        ys.append(y)
+        operations.append(operation)
+    if numpy is not None:
+        return (numpy.array(xs, dtype=numpy.float64), numpy.array(ys, dtype=numpy.float64),
+                numpy.array(operations, dtype=numpy.int8), malformed)
+    return xs, ys, operations, malformed
+
+
+def calculate_records(x, y, operations):
+    """
+    Apply each record's own operation.
+
+    With NumPy, all four operations are computed for the whole block and
+    each record picks its own, which is cheaper than sorting the records
+    by operation.
+
+    Returns:
+        tuple: (results, number of records divided by zero); those and
+            malformed records are NaN
+    """
+    if numpy is None:
+        results = [math.nan if operation < 0 or operation == 3 and b == 0 else _apply(a, b, OPERATIONS[operation])
+                   for a, b, operation in zip(x, y, operations)]
+        return results, sum(1 for b, operation in zip(y, operations) if operation == 3 and b == 0)
+    with numpy.errstate(all="ignore"):
+        results = numpy.choose(numpy.maximum(operations, 0), (x + y, x - y, x * y, x / y))
+    zero = (operations == OPERATIONS.index("div")) & (y == 0)
+    results[zero | (operations < 0)] = numpy.nan
+    return results, int(numpy.count_nonzero(zero))
+
+
+def run_stream(input_file, output_file, decimals=DEFAULT_DECIMALS):
+    """
+    Answer "x y op" records until the input ends, one result per line.
+
+    Each block of input is parsed, calculated and formatted as a whole,
+    and its results are written and flushed in one go. A division by zero
+    or a malformed record gives an empty line, so results stay in step
+    with the records.
+
+    Returns:
+        tuple: (records, divisions by zero, malformed records)
+
+    Raises:
+        ValueError: If a line is longer than MAX_RECORD bytes
+    """
+    records = errors = malformed = 0
+    rest = b""
+    for data in read_available(input_file):
+        data = rest + data
+        end = data.rfind(b"\n") + 1
+        data, rest = data[:end], data[end:]
+        if len(rest) > MAX_RECORD:
+            raise ValueError(f"record {records + 1} is longer than {MAX_RECORD} bytes")
+        if not data:
+            continue
+        x, y, operations, bad = parse_records(data)
+        results, zero = calculate_records(x, y, operations)
+        output_file.write(format_csv(results, decimals))
+        output_file.flush()
+        records += len(x)
+        errors += zero
+        malformed += bad
+    if rest.strip():
+        x, y, operations, bad = parse_records(rest)
+        results, zero = calculate_records(x, y, operations)
+        output_file.write(format_csv(results, decimals))
+        records += len(x)
+        errors += zero
+        malformed += bad
+    return records, errors, malformed
+
+
+def stream(output=None, decimals=DEFAULT_DECIMALS):
+    """Run stream mode on stdin and report on stderr when it ends."""
+    started = time.perf_counter()
+    output_file = None
+    try:
+        output_file = open(output, "wb") if output else sys.stdout.buffer
+        records, errors, malformed = run_stream(sys.stdin.buffer, output_file, decimals)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    except BrokenPipeError:  # The reader went away, e.g. "| head"
+        # Python flushes stdout again on exit, so point it somewhere that can't fail
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if output and output_file:
+            output_file.close()
+    elapsed = time.perf_counter() - started
+    print(f"Calculated {records} records in {elapsed:.2f}s ({records / max(elapsed, 1e-9):,.0f}/s)"
+          + (f"; {errors} divisions by zero left blank" if errors else "")
+          + (f"; {malformed} malformed records left blank" if malformed else ""), file=sys.stderr)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,708 @@
+"""
+Asyncio backend for the LAB02 bulk downloader.
+
+The thread pool of downloader.download_many() needs a thread per file in
+flight, which is fine for dozens of files and wasteful for thousands. This
+backend runs every transfer as a coroutine on one event loop, over a small
+HTTP/1.1 client built on asyncio streams, so thousands of files can be in
+flight at once for a few kilobytes each:
+
+- Bandwidth: all transfers share one token bucket (--bandwidth). Bodies are
+  read READ_SIZE bytes at a time and each read waits its turn for tokens,
+  so every transfer gets an equal share whatever the size of its file.
+- Connections: at most per_host transfers run at once against any one host,
+  over keep-alive connections that are reused from one file to the next.
+- Priorities: a waiting transfer starts in order of priority (lower first,
+  as in the manifest's priority=N), then arrival. Waiting counts too: every
+  AGING seconds of waiting is worth one step of priority, so low-priority
+  files are delayed but never starved.
+- Large files: a response of LARGE_FILE bytes or more may only hold
+  LARGE_SHARE of a host's connections. When that share is taken, the
+  transfer gives up its connection after the headers and waits for a large
+  slot, leaving the rest for small files.
+
+Memory use is bounded by the number of transfers in flight times their
+read buffers, whatever the size or number of files.
+
+Usage:
+    python downloader.py --manifest artifacts.txt --backend asyncio --workers 2000 --per-host 500
+    python downloader.py --manifest artifacts.txt --backend asyncio --bandwidth 50
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import os
+import ssl
+import time
+import urllib.parse
+from collections import Counter, defaultdict
+
+from requests.structures import CaseInsensitiveDict
+
+from download_cache import DownloadCache
+from downloader import (DEFAULT_PER_HOST, PART_SUFFIX, RETRIES, USER_AGENT, WANT_CONTENT_DIGEST, DigestMismatch,
+                        DownloadError, Progress, content_digest, format_size, remove_files, validators)
+
+
+# Transfers in flight at once, over all hosts
+DEFAULT_CONCURRENCY = 1000
+
+# Body bytes read (and charged to the bandwidth limit) at a time, and the
+# read buffer of each connection; with thousands of connections these
+# decide the memory use (and STREAM_LIMIT is the longest header line)
+READ_SIZE = 16 * 1024
+STREAM_LIMIT = 16 * 1024
+
+# Seconds allowed to connect, and to wait for each read
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 60
+
+MAX_REDIRECTS = 5
+
+# Responses from this size on count as large files, which may only hold
+# this share of the connections to their host
+LARGE_FILE = 8 * 1024 * 1024
+LARGE_SHARE = 0.5
+
+# Seconds of waiting worth one step of priority
+AGING = 10.0
+
+
+class HTTPError(DownloadError):
+    """The server answered with an error status."""
+
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+
+
+class _NeedLargeSlot(Exception):
+    """Raised when a transfer turns out to be large and no large slot is free."""
+
+
+async def with_timeout(awaitable, seconds):
+    """
+    Await with a time limit, like asyncio.wait_for().
+
+    Raises:
+        TimeoutError: If it takes longer, saying how long it waited. Unlike
+            asyncio.TimeoutError before Python 3.11, it is an OSError, so
+            it is retried and reported like the other network errors.
+    """
+    try:
+        return await asyncio.wait_for(awaitable, seconds)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"timed out after {seconds:g}s") from None
+
+
+def is_transient(error):
+    """Whether a failed transfer is worth retrying: network trouble or a 5xx."""
+    # asyncio.TimeoutError is only the built-in TimeoutError from Python 3.11
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError, asyncio.IncompleteReadError)):
+        return True
+    return isinstance(error, HTTPError) and error.status >= 500
+
+
+class TokenBucket:
+    """
+    Bandwidth limit shared by every transfer.
+
+    Tokens (bytes) refill at `rate` per second, up to `burst`. A read takes
+    as many tokens as it got bytes, even if that leaves the bucket in debt,
+    and then sleeps until the debt is paid off. Readers are thus served in
+    the order they asked, one READ_SIZE at a time, and a transfer can't get
+    more than its share by reading more often.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(rate / 10, READ_SIZE)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    async def take(self, amount):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate) - amount
+        self.updated = now
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class PriorityScheduler:
+    """
+    Decides which waiting transfer starts next.
+
+    Waiting transfers are kept in a heap per host (and per lane: small or
+    large), keyed by arrival time plus priority * AGING. The key never
+    changes while a transfer waits, yet a transfer that has waited
+    priority * AGING seconds longer than another comes first, so waiting
+    raises priority without any re-sorting.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST):
+        self.concurrency = max(concurrency, 1)
+        self.per_host = max(per_host, 1)
+        self.large_per_host = max(int(self.per_host * LARGE_SHARE), 1)
+        self.waiting = defaultdict(list)
+        self.active = Counter()
+        self.large_active = Counter()
+        self.running = 0
+        self._order = itertools.count()
+
+    def key(self, priority):
+        """The heap key of a transfer with this priority arriving now."""
+        return time.monotonic() + priority * AGING
+
+    async def acquire(self, host, key, large=False):
+        """
+        Wait for a slot to download from host.
+
+        Returns:
+            dict: The slot, to pass to promote() and release()
+        """
+        slot = {"host": host, "large": large}
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiting[host, large], (key, next(self._order), future, slot))
+        self._dispatch()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(slot)  # Granted just as it was cancelled
+            raise
+
+    def promote(self, slot):
+        """
+        Move a running transfer to the large lane of its host.
+
+        Returns:
+            bool: False if the large lane is full
+        """
+        if self.large_active[slot["host"]] >= self.large_per_host:
+            return False
+        self.large_active[slot["host"]] += 1
+        slot["large"] = True
+        return True
+
+    def release(self, slot):
+        """Free a slot returned by acquire()."""
+        self.running -= 1
+        self.active[slot["host"]] -= 1
+        if slot["large"]:
+            self.large_active[slot["host"]] -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Start the best waiting transfers that may start now."""
+        while self.running < self.concurrency:
+            best = None
+            for (host, large), heap in list(self.waiting.items()):
+                while heap and heap[0][2].done():  # Cancelled while waiting
+                    heapq.heappop(heap)
+                if not heap:
+                    del self.waiting[host, large]
+                    continue
+                if self.active[host] >= self.per_host:
+                    continue
+                if large and self.large_active[host] >= self.large_per_host:
+                    continue
+                if best is None or heap[0] < best[0]:
+                    best = heap[0], heap
+            if best is None:
+                return
+            _, _, future, slot = heapq.heappop(best[1])
+            self.running += 1
+            self.active[slot["host"]] += 1
+            if slot["large"]:
+                self.large_active[slot["host"]] += 1
+            future.set_result(slot)
+
+
+class Connection(asyncio.BufferedProtocol):
+    """
+    An HTTP/1.1 connection to one origin (scheme, host, port).
+
+    The socket is read straight into one fixed buffer of STREAM_LIMIT
+    bytes, and reading pauses while the buffer is full. An
+    asyncio.StreamReader instead receives up to 256 KB at a time however
+    slowly it is read, which adds up over thousands of connections.
+    """
+
+    def __init__(self, origin):
+        self.origin = origin
+        self.reused = False
+        self.transport = None
+        self.buffer = bytearray(STREAM_LIMIT)
+        self.start = self.end = 0  # Unread bytes are buffer[start:end]
+        self.eof = False
+        self.paused = False
+        self._waiter = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def get_buffer(self, sizehint):
+        if self.start == self.end:
+            self.start = self.end = 0
+        elif self.end == len(self.buffer):
+            self.buffer[:self.end - self.start] = self.buffer[self.start:self.end]
+            self.start, self.end = 0, self.end - self.start
+        return memoryview(self.buffer)[self.end:]
+
+    def buffer_updated(self, nbytes):
+        self.end += nbytes
+        if self.start == 0 and self.end == len(self.buffer):
+            self.paused = True
+            self.transport.pause_reading()
+        self._wake()
+
+    def eof_received(self):
+        self.eof = True
+        self._wake()
+
+    def connection_lost(self, exc):
+        self.eof = True
+        self._wake()
+
+    def _wake(self):
+        if self._waiter and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def _more(self):
+        """Wait for more bytes to arrive (or the end of the connection)."""
+        if self.paused:
+            self.paused = False
+            self.transport.resume_reading()
+        self._waiter = asyncio.get_running_loop().create_future()
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+
+    def _take(self, size):
+        data = bytes(self.buffer[self.start:min(self.start + size, self.end)])
+        self.start += len(data)
+        return data
+
+    async def read(self, size):
+        """Read up to size bytes; b"" at the end of the connection."""
+        while self.start == self.end and not self.eof:
+            await self._more()
+        return self._take(size)
+
+    async def readline(self):
+        """
+        Read up to and including the next newline.
+
+        Raises:
+            ValueError: If the line doesn't fit in the buffer
+        """
+        while True:
+            newline = self.buffer.find(b"\n", self.start, self.end)
+            if newline >= 0:
+                return self._take(newline + 1 - self.start)
+            if self.eof:
+                return self._take(self.end - self.start)
+            if self.start == 0 and self.end == len(self.buffer):
+                raise ValueError("Line longer than the read buffer")
+            await self._more()
+
+    async def readexactly(self, size):
+        data = b""
+        while len(data) < size:
+            more = await self.read(size - len(data))
+            if not more:
+                raise asyncio.IncompleteReadError(data, size)
+            data += more
+        return data
+
+    def write(self, data):
+        self.transport.write(data)
+
+    def close(self):
+        if self.transport:
+            self.transport.close()
+
+
+class ConnectionPool:
+    """Idle keep-alive connections, at most `keep` per origin."""
+
+    def __init__(self, keep=DEFAULT_PER_HOST):
+        self.keep = keep
+        self.idle = defaultdict(list)
+        self._ssl = None
+
+    async def get(self, origin):
+        """Return an idle connection to origin, or open a new one."""
+        idle = self.idle.get(origin)
+        while idle:
+            connection = idle.pop()
+            if not (connection.transport.is_closing() or connection.eof):
+                connection.reused = True
+                return connection
+            connection.close()
+        scheme, host, port = origin
+        context = None
+        if scheme == "https":
+            self._ssl = self._ssl or ssl.create_default_context()
+            context = self._ssl
+        _, connection = await with_timeout(asyncio.get_running_loop().create_connection(
+            lambda: Connection(origin), host, port, ssl=context), CONNECT_TIMEOUT)
+        return connection
+
+    def put(self, connection):
+        """Keep a connection whose last response was read completely."""
+        idle = self.idle[connection.origin]
+        if len(idle) < self.keep:
+            idle.append(connection)
+        else:
+            connection.close()
+
+    def close(self):
+        for idle in self.idle.values():
+            for connection in idle:
+                connection.close()
+        self.idle.clear()
+
+
+def origin_of(url):
+    """Return the (scheme, host, port) of a URL."""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise DownloadError(f"Unsupported URL: {url}")
+    return parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80)
+
+
+class Response:
+    """
+    The status and headers of a response, and its body as it arrives.
+
+    The body must be read to the end (or the response closed) before the
+    connection is used again.
+    """
+
+    def __init__(self, url, connection, status, headers, method):
+        self.url = url
+        self.connection = connection
+        self.status = status
+        self.headers = headers
+        self.keep_alive = headers.get("Connection", "").lower() != "close"
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            self.length, self.chunked = 0, False
+        else:
+            self.chunked = "chunked" in headers.get("Transfer-Encoding", "").lower()
+            length = headers.get("Content-Length", "")
+            self.length = int(length) if length.isdigit() and not self.chunked else None
+            if self.length is None and not self.chunked:
+                self.keep_alive = False  # The body ends when the connection does
+
+    async def iter_body(self):
+        """Yield the body in pieces of at most READ_SIZE bytes."""
+        reader = self.connection
+        if self.chunked:
+            while True:
+                line = await with_timeout(reader.readline(), READ_TIMEOUT)
+                try:
+                    size = int(line.split(b";")[0], 16)
+                except ValueError:
+                    raise DownloadError(f"Malformed chunked body from {self.url}") from None
+                if size == 0:
+                    break
+                async for data in self._read_exactly(size):
+                    yield data
+                await with_timeout(reader.readexactly(2), READ_TIMEOUT)
+            while await with_timeout(reader.readline(), READ_TIMEOUT) not in (b"\r\n", b"\n", b""):  # Trailers
+                pass
+        elif self.length is not None:
+            async for data in self._read_exactly(self.length):
+                yield data
+        else:
+            while True:
+                data = await with_timeout(reader.read(READ_SIZE), READ_TIMEOUT)
+                if not data:
+                    break
+                yield data
+
+    async def _read_exactly(self, size):
+        reader = self.connection
+        while size > 0:
+            data = await with_timeout(reader.read(min(READ_SIZE, size)), READ_TIMEOUT)
+            if not data:
+                raise asyncio.IncompleteReadError(b"", size)
+            size -= len(data)
+            yield data
+
+    async def drain(self):
+        """Skip the rest of a short body so the connection can be reused."""
+        async for _ in self.iter_body():
+            pass
+
+
+async def read_head(connection):
+    """
+    Read a response's status line and headers.
+
+    Returns:
+        tuple: (HTTP version, status code, CaseInsensitiveDict of headers)
+    """
+    status_line = await connection.readline()
+    if not status_line:
+        raise ConnectionResetError("Connection closed before the response")
+    version, status, *_ = status_line.decode("latin-1").split(None, 2)
+    headers = CaseInsensitiveDict()
+    while True:
+        line = await connection.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name, value = name.strip(), value.strip()
+        # Repeated headers are combined, as RFC 9110 allows
+        headers[name] = f"{headers[name]}, {value}" if name in headers else value
+    return version, int(status), headers
+
+
+async def send_request(pool, method, url, headers):
+    """
+    Send a request and read the status and headers of its response.
+
+    A reused keep-alive connection may have been closed by the server in
+    the meantime; then the request is sent again on a new connection.
+
+    Returns:
+        Response: The response, its body not read yet
+    """
+    origin = origin_of(url)
+    parts = urllib.parse.urlsplit(url)
+    target = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+    host = parts.netloc.rpartition("@")[2]
+    lines = [f"{method} {target} HTTP/1.1", f"Host: {host}", f"User-Agent: {USER_AGENT}",
+             "Accept-Encoding: identity"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    while True:
+        connection = await pool.get(origin)
+        try:
+            connection.write(request)
+            version, status, response_headers = await with_timeout(read_head(connection), READ_TIMEOUT)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            connection.close()
+            if connection.reused:
+                continue
+            raise ConnectionError(f"{url}: {e}") from e
+        except ValueError:  # Garbled status line, or a header line over STREAM_LIMIT
+            connection.close()
+            raise DownloadError(f"Malformed response from {url}") from None
+        except BaseException:
+            connection.close()
+            raise
+        response = Response(url, connection, status, response_headers, method)
+        if version == "HTTP/1.0" and response_headers.get("Connection", "").lower() != "keep-alive":
+            response.keep_alive = False
+        return response
+
+
+class AsyncDownloader:
+    """
+    Downloads files concurrently on one event loop, sharing connections, a
+    bandwidth limit and a priority scheduler (see the module docstring).
+
+    download() may be called from many tasks at once; each call waits for
+    a slot, then streams its file to disk.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST, bandwidth=None,
+                 progress=None, cache=None):
+        self.scheduler = PriorityScheduler(concurrency, per_host)
+        self.pool = ConnectionPool(per_host)
+        self.bucket = TokenBucket(bandwidth) if bandwidth else None
+        self.progress = progress or Progress(enabled=False)
+        self.cache = cache
+
+    def close(self):
+        self.pool.close()
+
+    async def download(self, url, destination, checksum=None, priority=0, retries=RETRIES):
+        """
+        Download one file, verifying it as it is written.
+
+        Args:
+            url (str): URL of the file
+            destination (str): Where to save it
+            checksum (tuple, optional): (algorithm, hex digest) it must match
+            priority (int): Lower starts sooner
+            retries (int): Attempts before giving up on network errors
+
+        Returns:
+            bool: True if the file came from the cache
+
+        Raises:
+            DownloadError: If the server refused or the checksum doesn't match
+            OSError: If every attempt failed
+        """
+        directory = os.path.dirname(destination)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        key = self.scheduler.key(priority)
+        large = False
+        cached = self.cache.lookup(url) if self.cache else None
+        if cached and checksum and checksum[0] == "sha256" and checksum[1] != cached["sha256"]:
+            cached = None  # The manifest wants different content; don't even ask
+
+        attempt = 0
+        while True:
+            slot = await self.scheduler.acquire(host, key, large)
+            try:
+                hit = await self._transfer(slot, url, destination, checksum, cached)
+                if hit is not None:
+                    return hit
+                cached = None  # Evicted meanwhile: download it after all
+                continue
+            except _NeedLargeSlot:
+                large = True  # Wait in the large lane, keeping its place
+                continue
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, DigestMismatch, HTTPError) as e:
+                attempt += 1
+                if attempt == retries or not (isinstance(e, DigestMismatch) or is_transient(e)):
+                    raise
+            finally:
+                self.scheduler.release(slot)
+            await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+
+    async def _transfer(self, slot, url, destination, checksum, cached):
+        """
+        One attempt at a download, holding a scheduler slot.
+
+        Returns:
+            bool: True if the file came from the cache, or None if the cached
+                copy the server confirmed was evicted in the meantime
+        """
+        headers = {"Want-Content-Digest": WANT_CONTENT_DIGEST, **DownloadCache.conditional_headers(cached)}
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await send_request(self.pool, "GET", url, headers)
+            if response.status in (301, 302, 303, 307, 308) and "Location" in response.headers:
+                await self._finish(response, drain=True)
+                url = urllib.parse.urljoin(url, response.headers["Location"])
+                continue
+            break
+        else:
+            response.connection.close()
+            raise DownloadError(f"Too many redirects for {url}")
+
+        if response.status == 304 and cached:
+            await self._finish(response)
+            return True if self.cache.materialize(cached, destination) else None
+        if response.status >= 300:
+            response.connection.close()
+            raise HTTPError(response.status, url)
+        if (response.length or 0) >= LARGE_FILE and not slot["large"] and not self.scheduler.promote(slot):
+            response.connection.close()
+            raise _NeedLargeSlot()
+
+        digests = {checksum[0]: hashlib.new(checksum[0])} if checksum else {}
+        if self.cache:
+            digests.setdefault("sha256", hashlib.sha256())
+        expected = content_digest(response.headers)
+        if expected:
+            digests.setdefault(expected[0], hashlib.new(expected[0]))
+        part_file = destination + PART_SUFFIX
+        written = 0
+        try:
+            # Unbuffered: the body already arrives in READ_SIZE pieces, and
+            # a write buffer per file adds up over thousands of transfers
+            with open(part_file, "wb", buffering=0) as file:
+                async for data in response.iter_body():
+                    file.write(data)
+                    for digest in digests.values():
+                        digest.update(data)
+                    written += len(data)
+                    self.progress.update(len(data))
+                    if self.bucket:
+                        await self.bucket.take(len(data))
+            await self._finish(response)
+            if expected and digests[expected[0]].digest() != expected[1]:
+                raise DigestMismatch(f"{url} doesn't match its {expected[0]} Content-Digest")
+        except BaseException:
+            response.connection.close()
+            remove_files(part_file)
+            self.progress.update(-written)
+            raise
+
+        if checksum and digests[checksum[0]].hexdigest() != checksum[1]:
+            remove_files(part_file)
+            raise DownloadError(f"{checksum[0]} mismatch: expected {checksum[1]}, "
+                                f"got {digests[checksum[0]].hexdigest()}")
+        os.replace(part_file, destination)
+        if self.cache:
+            self.cache.store(url, destination, digests["sha256"].hexdigest(), *validators(response.headers))
+        return False
+
+    async def _finish(self, response, drain=False):
+        """Hand the connection of a response back to the pool, if it can be reused."""
+        if drain:
+            try:
+                await response.drain()
+            except (OSError, asyncio.IncompleteReadError):
+                response.keep_alive = False
+        if response.keep_alive:
+            self.pool.put(response.connection)
+        else:
+            response.connection.close()
+
+
+async def _download_all(downloader, entries, failures, hits):
+    async def one(entry):
+        try:
+            if await downloader.download(entry["url"], entry["destination"], entry["checksum"],
+                                         entry.get("priority", 0)):
+                hits.append(entry)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, DownloadError) as e:
+            failures.append((entry, e))
+        finally:
+            downloader.progress.file_done()
+
+    try:
+        await asyncio.gather(*(one(entry) for entry in entries))
+    finally:
+        downloader.close()
+
+
+def download_many_async(entries, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST, show_progress=True,
+                        bandwidth=None, cache=None):
+    """
+    Download many files at once on an event loop; the asyncio counterpart
+    of downloader.download_many().
+
+    Args:
+        entries (list): Entries as returned by downloader.read_manifest()
+        concurrency (int): Files downloaded at once
+        per_host (int): Files downloaded at once from the same host
+        show_progress (bool): Whether to display progress
+        bandwidth (float, optional): Total speed limit in bytes per second
+        cache (DownloadCache, optional): Cache to use
+
+    Returns:
+        bool: True if every file was downloaded (and verified)
+    """
+    progress = Progress(label="Bulk download", enabled=show_progress, files=len(entries))
+    downloader = AsyncDownloader(concurrency, per_host, bandwidth, progress, cache)
+    failures = []
+    hits = []
+
+    limit = f", {format_size(bandwidth)}/s in total" if bandwidth else ""
+    print(f"Downloading {len(entries)} files with asyncio, {concurrency} at once "
+          f"(at most {per_host} per host{limit})...")
+    started = time.perf_counter()
+    asyncio.run(_download_all(downloader, entries, failures, hits))
+    progress.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Downloaded {len(entries) - len(failures)} of {len(entries)} files "
+          f"({format_size(progress.done)}) in {elapsed:.1f}s"
+          + (f", {len(hits)} unchanged and linked from the cache" if cache else ""))
+    for entry, error in failures:
+        print(f"  Failed: {entry['url']} -> {entry['destination']}: {error}")
+    return not failures
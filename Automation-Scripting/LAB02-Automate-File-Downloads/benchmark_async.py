@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+LAB02 - Asyncio Backend Benchmark
+
+Two experiments against local_server.py, each download running in a
+child process so that its peak memory can be measured on its own:
+
+1. Scale: every file of a batch is downloaded at once by the asyncio
+   backend (5,000 by default). The server holds each response for a
+   moment, so the transfers really overlap, and reports the most it had
+   in flight. The batch is repeated with files four and sixteen times as
+   large, which shouldn't change the memory used.
+2. Fairness: a few large files are listed ahead of many small ones, with
+   few connections per host and a total bandwidth limit. Without the
+   large-file lane the large files take every connection and the small
+   files wait for them; with it, the small files finish right away.
+
+Usage:
+    python benchmark_async.py
+    python benchmark_async.py --files 10000 --latency 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import async_downloader
+from async_downloader import AsyncDownloader
+from benchmark_bulk import make_files
+from benchmark_download import file_digest, make_file
+from local_server import start_server
+
+
+def child(spec):
+    """Run one download batch described by spec and print its results as JSON."""
+    if not spec["large_lane"]:
+        async_downloader.LARGE_SHARE = 1.0
+    entries = [{"url": url, "destination": destination, "checksum": ("sha256", digest), "small": small}
+               for url, destination, digest, small in spec["files"]]
+    finished = {}
+    failures = []
+
+    async def run():
+        downloader = AsyncDownloader(spec["concurrency"], spec["per_host"], spec["bandwidth"])
+        started = time.perf_counter()
+
+        async def one(number, entry):
+            try:
+                await downloader.download(entry["url"], entry["destination"], entry["checksum"])
+                finished[number] = time.perf_counter() - started
+            except (OSError, asyncio.IncompleteReadError, async_downloader.DownloadError) as e:
+                failures.append(f"{entry['url']}: {e}")
+
+        try:
+            await asyncio.gather(*(one(number, entry) for number, entry in enumerate(entries)))
+        finally:
+            downloader.close()
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    small = [finished[number] for number, entry in enumerate(entries) if entry["small"] and number in finished]
+    print(json.dumps({"elapsed": elapsed, "failures": failures[:5], "failed": len(failures),
+                      "small_median": statistics.median(small) if small else None,
+                      "small_max": max(small) if small else None}))
+
+
+def run_child(spec, workdir):
+    """Run child() in a new process; return its results and peak RSS in MB."""
+    spec_file = os.path.join(workdir, "spec.json")
+    with open(spec_file, "w") as file:
+        json.dump(spec, file)
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child", spec_file],
+                               stdout=subprocess.PIPE, text=True)
+    output = process.stdout.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    if status != 0:
+        raise RuntimeError(f"Benchmark child failed with status {status}")
+    result = json.loads(output)
+    result["peak_mb"] = usage.ru_maxrss / 1024
+    return result
+
+
+def batch(url, files, destination_dir, small=True):
+    """Download specs for files (name, "sha256:<hex>") as returned by make_files()."""
+    return [[f"{url}/{name}", os.path.join(destination_dir, name), checksum.partition(":")[2], small]
+            for name, checksum in files]
+
+
+def main():
+    """Run both experiments and print their tables."""
+    parser = argparse.ArgumentParser(description="Benchmark the asyncio download backend.")
+    parser.add_argument("--files", type=int, default=5000, help="Files downloaded at once (default: 5000)")
+    parser.add_argument("--size-kb", type=int, default=64, help="Largest small file in KB (default: 64)")
+    parser.add_argument("--latency", type=float, default=1.0,
+                        help="Server delay per response in seconds, which keeps the transfers overlapping "
+                             "(default: 1)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with open(args.child) as file:
+            child(json.load(file))
+        return
+
+    print("Asyncio Backend Benchmark")
+    print("=========================")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        served = os.path.join(workdir, "served")
+        os.mkdir(served)
+        sizes = {factor: os.path.join(served, f"x{factor}") for factor in (1, 4, 16)}
+        files = {}
+        for factor, directory in sizes.items():
+            os.mkdir(directory)
+            files[factor] = make_files(directory, args.files, args.size_kb * 1024 * factor)
+
+        print(f"\n1. Scale: {args.files} files at once, up to {args.size_kb} KB (then 4x and 16x larger), "
+              f"{args.latency * 1000:g} ms per response\n")
+        print(f"{'Files':>6} {'Largest':>8} {'Seconds':>8} {'In flight':>10} {'Peak RSS':>9}  Verified")
+        server, url = start_server(served, latency=args.latency)
+        try:
+            for count, factor in ((args.files // 10, 1), (args.files, 1), (args.files, 4), (args.files, 16)):
+                server.peak_active = 0
+                spec = {"files": batch(f"{url}/x{factor}", files[factor][:count], os.path.join(workdir, "out")),
+                        "concurrency": count, "per_host": count, "bandwidth": None, "large_lane": True}
+                result = run_child(spec, workdir)
+                print(f"{count:>6} {args.size_kb * factor:>5} KB {result['elapsed']:>8.1f} "
+                      f"{server.peak_active:>10} {result['peak_mb']:>6.0f} MB  "
+                      f"{'yes' if not result['failed'] else 'NO: ' + '; '.join(result['failures'])}")
+        finally:
+            server.shutdown()
+
+        large = []
+        for number in range(8):
+            name = f"large-{number}.bin"
+            make_file(os.path.join(served, name), 32 * 1024 * 1024)
+            large.append((name, "sha256:" + file_digest(os.path.join(served, name))))
+        print("\n2. Fairness: 8 files of 32 MB listed ahead of 200 small ones, "
+              "8 connections, 100 MB/s in total\n")
+        print(f"{'Large-file lane':<16} {'Seconds':>8} {'Small files done (median / last)':>34}")
+        server, url = start_server(served)
+        try:
+            for lane in (False, True):
+                spec = {"files": batch(url, large, os.path.join(workdir, "fair"), small=False)
+                        + batch(f"{url}/x1", files[1][:200], os.path.join(workdir, "fair")),
+                        "concurrency": 8, "per_host": 8, "bandwidth": 100 * 1024 * 1024, "large_lane": lane}
+                result = run_child(spec, workdir)
+                print(f"{'on' if lane else 'off':<16} {result['elapsed']:>8.1f} "
+                      f"{result['small_median']:>22.2f}s / {result['small_max']:.2f}s"
+                      + ("" if not result["failed"] else "  FAILED: " + "; ".join(result["failures"])))
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
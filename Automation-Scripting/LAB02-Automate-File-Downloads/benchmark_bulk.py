@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+LAB02 - Bulk Download Benchmark
+
+Downloads many small files from local_server.py three ways:
+
+- one at a time, as separate downloader.py runs would (a new connection
+  and a HEAD request per file; interpreter start-up is not even counted)
+- bulk mode with a single worker (keep-alive connection reuse only)
+- bulk mode with a pool of workers
+
+The server waits --latency seconds before every response, standing in for
+the round trip to a real server. Every file is verified against its
+SHA-256 checksum from the manifest.
+
+Usage:
+    python benchmark_bulk.py
+    python benchmark_bulk.py --files 2000 --latency 0.02 --workers 32
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import os
+import tempfile
+import time
+
+from downloader import create_session, download_file, download_many, read_manifest
+from local_server import start_server
+
+
+def make_files(directory, count, max_size):
+    """Write count files of random sizes up to max_size, return a manifest."""
+    lines = []
+    for number in range(count):
+        data = os.urandom(1024 + number * 7919 % max(max_size - 1024, 1))
+        name = f"artifact-{number:05d}.bin"
+        with open(os.path.join(directory, name), "wb") as file:
+            file.write(data)
+        lines.append((name, "sha256:" + hashlib.sha256(data).hexdigest()))
+    return lines
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Benchmark bulk downloads against one file at a time.")
+    parser.add_argument("--files", type=int, default=500, help="Number of files (default: 500)")
+    parser.add_argument("--max-kb", type=int, default=64, help="Largest file size in KB (default: 64)")
+    parser.add_argument("--latency", type=float, default=0.01,
+                        help="Server delay per response in seconds (default: 0.01)")
+    parser.add_argument("--workers", type=int, default=16, help="Workers for bulk mode (default: 16)")
+    args = parser.parse_args()
+
+    print("Bulk Download Benchmark")
+    print("=======================")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        served = os.path.join(workdir, "served")
+        os.mkdir(served)
+        files = make_files(served, args.files, args.max_kb * 1024)
+        server, url = start_server(served, latency=args.latency)
+        total_mb = sum(os.path.getsize(os.path.join(served, name)) for name, _ in files) / (1024 * 1024)
+
+        def manifest_for(run):
+            manifest_file = os.path.join(workdir, f"{run}.txt")
+            with open(manifest_file, "w") as manifest:
+                for name, checksum in files:
+                    manifest.write(f"{url}/{name} {os.path.join(workdir, run, name)} {checksum}\n")
+            return read_manifest(manifest_file)
+
+        def one_at_a_time():
+            for entry in manifest_for("sequential"):
+                with create_session(1) as session:
+                    if not download_file(entry["url"], entry["destination"], False, 1, session=session):
+                        return False
+            return True
+
+        runs = [
+            ("one at a time", one_at_a_time),
+            ("bulk, 1 worker", lambda: download_many(manifest_for("bulk1"), 1, 1, False)),
+            (f"bulk, {args.workers} workers",
+             lambda: download_many(manifest_for("bulk"), args.workers, args.workers, False)),
+        ]
+
+        print(f"{args.files} files, {total_mb:.1f} MB, {args.latency * 1000:g} ms per response\n")
+        print(f"{'Mode':<18} {'Seconds':>8} {'Files/s':>8} {'Speedup':>8}  Verified")
+        baseline = None
+        try:
+            for name, run in runs:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    ok = run()
+                    elapsed = time.perf_counter() - start
+                baseline = baseline or elapsed
+                print(f"{name:<18} {elapsed:>8.2f} {args.files / elapsed:>8.0f} {baseline / elapsed:>7.1f}x  "
+                      f"{'yes' if ok else 'NO'}")
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+LAB02 - Parallel Download Benchmark
+
+Downloads the same file from local_server.py over 1, 2, 4 and 8
+connections and checks every copy. The server caps the speed of each
+connection, like a single TCP stream over a long or busy path, which is
+what parallel ranges get around.
+
+Each download is verified against the file's SHA-256 while it is written.
+With --corrupt, the server damages a fraction of its responses; only the
+damaged chunks should be fetched again.
+
+Usage:
+    python benchmark_download.py
+    python benchmark_download.py --size-mb 256 --bandwidth 20 --connections 1 4 16
+    python benchmark_download.py --corrupt 0.1
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import os
+import re
+import resource
+import tempfile
+import time
+
+from downloader import create_session, download_file
+from local_server import start_server
+
+
+def make_file(file_path, size):
+    """Write size bytes of random data, one megabyte at a time."""
+    with open(file_path, "wb") as file:
+        for _ in range(0, size, 1024 * 1024):
+            file.write(os.urandom(1024 * 1024))
+        file.truncate(size)
+
+
+def file_digest(file_path):
+    """Return the SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Benchmark parallel ranged downloads.")
+    parser.add_argument("--size-mb", type=int, default=64, help="Size of the test file (default: 64)")
+    parser.add_argument("--bandwidth", type=float, default=8,
+                        help="Speed limit per connection in MB/s (default: 8)")
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Connection counts to compare (default: 1 2 4 8)")
+    parser.add_argument("--corrupt", type=float, default=0.0,
+                        help="Fraction of responses the server damages (default: 0)")
+    args = parser.parse_args()
+
+    print("Parallel Download Benchmark")
+    print("===========================")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        served = os.path.join(workdir, "served")
+        os.mkdir(served)
+        make_file(os.path.join(served, "big.bin"), args.size_mb * 1024 * 1024)
+        expected = file_digest(os.path.join(served, "big.bin"))
+        server, url = start_server(served, bandwidth=args.bandwidth * 1024 * 1024, corrupt=args.corrupt, seed=1)
+
+        print(f"{args.size_mb} MB file, {args.bandwidth:g} MB/s per connection\n")
+        print(f"{'Connections':>11} {'Seconds':>8} {'MB/s':>8} {'Speedup':>8} {'Retried':>8}  Verified")
+        baseline = None
+        try:
+            for connections in args.connections:
+                output = os.path.join(workdir, f"big-{connections}.bin")
+                log = io.StringIO()
+                with create_session(connections) as session, contextlib.redirect_stdout(log):
+                    start = time.perf_counter()
+                    ok = download_file(f"{url}/big.bin", output, False, connections, session=session,
+                                       checksum=("sha256", expected))
+                    elapsed = time.perf_counter() - start
+                # Checked again independently of the downloader
+                verified = ok and file_digest(output) == expected
+                retried = re.search(r"again (\d+) time", log.getvalue())
+                baseline = baseline or elapsed
+                print(f"{connections:>11} {elapsed:>8.2f} {args.size_mb / elapsed:>8.1f} "
+                      f"{baseline / elapsed:>7.1f}x {retried.group(1) if retried else '0':>8}  "
+                      f"{'yes' if verified else 'NO'}")
+                os.remove(output)
+        finally:
+            server.shutdown()
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\nPeak memory of this process: {peak_mb:.0f} MB (server included)")
+
+
+if __name__ == "__main__":
+    main()
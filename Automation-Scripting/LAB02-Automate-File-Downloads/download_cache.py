@@ -0,0 +1,263 @@
+"""
+Content-addressed download cache for the LAB02 downloader.
+
+Files are stored once per content, named by their SHA-256, and an index
+remembers for each URL which content it returned and the ETag and
+Last-Modified validators the server sent with it:
+
+    ~/.cache/lab02-downloads/
+        index.sqlite     URL -> content hash and validators; object sizes and last use
+        objects/9f/86d081884c7d...   The contents, by SHA-256
+
+A repeat download sends If-None-Match / If-Modified-Since. When the server
+answers 304 Not Modified, the cached content is put in place with a
+reflink (a copy-on-write clone, where the file system supports it) or a
+hardlink, so no bytes are transferred or copied. Hardlinked files share
+their data with the cache, so don't edit downloaded files in place; a
+cached object whose size or modification time changed is never used.
+
+The least recently used contents are evicted when the cache grows past
+its size limit. The index is an SQLite database and objects are written
+under temporary names and renamed into place, so several processes can
+share one cache safely.
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows: reflinks are skipped, hardlinks still work
+    fcntl = None
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                                 "lab02-downloads")
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+INDEX_FILE = "index.sqlite"
+OBJECTS_DIR = "objects"
+
+# ioctl that clones a whole file on Linux (Btrfs, XFS, bcachefs, ...)
+FICLONE = 0x40049409
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT
+);
+CREATE TABLE IF NOT EXISTS objects (
+    sha256 TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objects_by_use ON objects (last_used);
+"""
+
+
+def reflink(source, destination):
+    """
+    Clone source to destination without copying its data, if the file
+    system supports it.
+
+    Returns:
+        bool: True if the clone was made
+    """
+    if fcntl is None:
+        return False
+    try:
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        try:
+            os.remove(destination)
+        except OSError:
+            pass
+        return False
+
+
+def link_file(source, destination):
+    """
+    Make destination have the contents of source as cheaply as possible:
+    a reflink, else a hardlink, else a copy.
+
+    Returns:
+        str: "reflink", "hardlink" or "copy"
+    """
+    if reflink(source, destination):
+        return "reflink"
+    try:
+        os.link(source, destination)
+        return "hardlink"
+    except OSError:  # Different file systems, or links not supported
+        shutil.copyfile(source, destination)
+        return "copy"
+
+
+class DownloadCache:
+    """
+    Cache of downloaded files, keyed by URL and stored by content hash.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(os.path.join(directory, OBJECTS_DIR), exist_ok=True)
+        # One connection, shared by the threads of this process; other
+        # processes are kept out by SQLite's own locking
+        self._db = sqlite3.connect(os.path.join(directory, INDEX_FILE), timeout=60,
+                                   isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def object_path(self, sha256):
+        return os.path.join(self.directory, OBJECTS_DIR, sha256[:2], sha256)
+
+    def lookup(self, url):
+        """
+        Find the cached content of a URL.
+
+        Returns:
+            dict: "sha256", "etag", "last_modified" and "size", or None if
+                the URL isn't cached or its content is gone or was modified
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT u.sha256, u.etag, u.last_modified, o.size, o.mtime_ns"
+                " FROM urls u JOIN objects o ON o.sha256 = u.sha256 WHERE u.url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        sha256, etag, last_modified, size, mtime_ns = row
+        try:
+            stat = os.stat(self.object_path(sha256))
+        except OSError:
+            return None
+        if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+            return None
+        return {"sha256": sha256, "etag": etag, "last_modified": last_modified, "size": size}
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Request headers that ask the server whether a cached entry is still current."""
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def materialize(self, entry, destination):
+        """
+        Put the cached content of an entry at destination.
+
+        Returns:
+            bool: False if the content was evicted in the meantime
+        """
+        temp_file = f"{destination}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            link_file(self.object_path(entry["sha256"]), temp_file)
+        except FileNotFoundError:
+            return False
+        os.replace(temp_file, destination)
+        with self._lock:
+            self._db.execute("UPDATE objects SET last_used = ? WHERE sha256 = ?", (time.time(), entry["sha256"]))
+        return True
+
+    def store(self, url, file_path, sha256, etag=None, last_modified=None):
+        """
+        Add a downloaded file to the cache (by link where possible) and
+        evict old contents if the cache is now too big.
+
+        Nothing is stored without an ETag or Last-Modified, since the server
+        couldn't be asked whether the file changed.
+
+        Returns:
+            bool: True if the file was stored
+        """
+        if not (etag or last_modified):
+            return False
+        size = os.path.getsize(file_path)
+        if size > self.max_size:
+            return False
+
+        path = self.object_path(sha256)
+        with self._lock:
+            row = self._db.execute("SELECT size, mtime_ns FROM objects WHERE sha256 = ?", (sha256,)).fetchone()
+        try:
+            stat = os.stat(path)
+            intact = row is not None and (stat.st_size, stat.st_mtime_ns) == row
+        except OSError:
+            intact = False
+        if not intact:
+            # Missing, unknown to the index, or edited in place through a
+            # hardlinked download: replace it with the file just verified
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_file = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+            link_file(file_path, temp_file)
+            os.replace(temp_file, path)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:  # Evicted by another process just now
+            return False
+
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?)",
+                                 (sha256, size, mtime_ns, time.time()))
+                self._db.execute("INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?)",
+                                 (url, sha256, etag, last_modified))
+                evicted = self._evict()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        # Files are only removed once the index no longer points to them
+        for old_sha256 in evicted:
+            try:
+                os.remove(self.object_path(old_sha256))
+            except OSError:
+                pass
+        return True
+
+    def _evict(self):
+        """Drop least recently used objects until the cache fits (inside a transaction)."""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        evicted = []
+        if total <= self.max_size:
+            return evicted
+        for sha256, size in self._db.execute("SELECT sha256, size FROM objects ORDER BY last_used").fetchall():
+            if total <= self.max_size:
+                break
+            evicted.append(sha256)
+            total -= size
+        self._db.executemany("DELETE FROM objects WHERE sha256 = ?", [(sha256,) for sha256 in evicted])
+        self._db.executemany("DELETE FROM urls WHERE sha256 = ?", [(sha256,) for sha256 in evicted])
+        return evicted
+
+    def stats(self):
+        """Return the number of URLs and contents cached, and their total size."""
+        with self._lock:
+            urls = self._db.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+            objects, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+        return {"urls": urls, "objects": objects, "size": size}
@@ -5,45 +5,1040 @@ LAB02 - Automate File Downloads with Python
 This script demonstrates how to download files from the internet using the requests library.
 It handles HTTP requests, saves the content to disk, and manages errors.
 
+Responses are streamed to disk, never held in memory. When the server
+accepts byte ranges, a large file is split into chunks that several
+connections fetch in parallel, each writing its bytes straight into place
+in a preallocated file. The chunks already written are recorded in a
+manifest next to the file, so an interrupted download resumes where it
+stopped. Memory use is bounded by the read buffer of each connection,
+whatever the size of the file.
+
+Files are hashed while they are written, never read back afterwards. When
+the server sends a Content-Digest with each range, every chunk is checked
+as soon as it arrives, and only a chunk that doesn't match is fetched
+again.
+
+Bulk mode downloads every file listed in a manifest (URL, destination and
+optional checksum per line) with a pool of workers that share keep-alive
+connections, at most --per-host at a time from any one host. The asyncio
+backend (--backend asyncio, see async_downloader.py) runs them on one event
+loop instead, which scales to thousands of files at once.
+
+With --cache, downloaded files are kept in a local cache (see
+download_cache.py) and repeat downloads only ask the server whether the
+file changed.
+
 Usage:
     python downloader.py
+    python downloader.py --url https://example.com/sample.txt --output sample.txt
+    python downloader.py --url https://example.com/big.iso --output big.iso --connections 8
+    python downloader.py --url https://example.com/big.iso --output big.iso --checksum sha256:<hex>
+    python downloader.py --manifest artifacts.txt --workers 32 --per-host 8
+    python downloader.py --manifest artifacts.txt --cache
+    python downloader.py --manifest artifacts.txt --backend asyncio --workers 2000 --bandwidth 50
 """
 
-# TODO: Import the requests library
-# You'll need to install this first with: pip install requests
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 
+import requests
+from requests.adapters import HTTPAdapter
 
-# TODO: Create a function to download a file from a URL
-# The function should:
-# - Accept a URL and a filename as parameters
-# - Make an HTTP GET request to the URL
-# - Check if the response status code is 200 (OK)
-# - If successful, save the content to a file
-# - Print a success or failure message
+from download_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_SIZE, DownloadCache
 
 
-# TODO: Add error handling
-# What if the connection fails?
-# What if the file can't be written?
-# Use try-except blocks to handle potential errors
+DEFAULT_URL = "https://raw.githubusercontent.com/python/cpython/master/README.rst"
+USER_AGENT = "LAB02-downloader/1.0"
 
+# (connect, read) timeouts in seconds
+TIMEOUT = (10, 60)
 
-# TODO: BONUS - Add command-line arguments
-# Use argparse to accept a URL and filename from the command line
+# Parallel connections for ranged downloads
+DEFAULT_CONNECTIONS = 4
 
-# TODO: BONUS - Add a progress indicator
-# For larger files, it's nice to show download progress
-# You could use the tqdm library or implement a simple percentage display
+# Ranged downloads are split into chunks of at most this size. Each chunk
+# is fetched with one request and recorded in the manifest once written.
+CHUNK_SIZE = 8 * 1024 * 1024
 
+# Smaller files are downloaded with a single request
+MIN_RANGED_SIZE = 1024 * 1024
+
+# Bytes read from a connection at a time; this bounds memory use
+BUFFER_SIZE = 64 * 1024
+
+# Attempts per chunk before the download is given up (and left resumable)
+RETRIES = 3
+
+# The file being downloaded, and the manifest of its finished chunks
+PART_SUFFIX = ".part"
+MANIFEST_SUFFIX = ".part.json"
+MANIFEST_VERSION = 1
+
+# Bulk downloads: files downloaded at once, and at most this many per host
+DEFAULT_WORKERS = 16
+DEFAULT_PER_HOST = 8
+
+# Checksums given as bare hex digests are identified by their length
+CHECKSUM_LENGTHS = {32: "md5", 40: "sha1", 64: "sha256", 128: "sha512"}
+
+# Content-Digest (RFC 9530) algorithm names, and the one asked for
+DIGEST_ALGORITHMS = {"sha-256": "sha256", "sha-512": "sha512", "md5": "md5", "sha": "sha1"}
+WANT_CONTENT_DIGEST = "sha-256=10, sha-512=5"
+
+
+class DownloadError(Exception):
+    """A download failed in a way that retrying the same request won't fix."""
+
+
+class RangesNotSupported(DownloadError):
+    """The server ignored a Range request (or the file changed under it)."""
+
+
+class DigestMismatch(DownloadError):
+    """The bytes received don't match the digest the server sent with them."""
+
+
+def format_size(size):
+    """Format a byte count for display, e.g. 1536 -> "1.5 KB"."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class Progress:
+    """
+    Thread-safe progress display: bytes done, percentage and speed, and
+    files done when it covers several files.
+    """
+
+    def __init__(self, total=None, label="", enabled=True, interval=0.2, files=None):
+        self.total = total
+        self.label = label
+        self.enabled = enabled
+        self.interval = interval
+        self.files = files
+        self.files_done = 0
+        self.done = 0
+        self.started = time.perf_counter()
+        self._shown = self.started
+        self._lock = threading.Lock()
+
+    def update(self, count):
+        """Add count bytes (negative to take back the bytes of a failed attempt)."""
+        with self._lock:
+            self.done += count
+            now = time.perf_counter()
+            if self.enabled and now - self._shown >= self.interval:
+                self._shown = now
+                self._show(now)
+
+    def file_done(self):
+        """Count one more finished file."""
+        with self._lock:
+            self.files_done += 1
+
+    def _show(self, now, end="\r"):
+        speed = self.done / max(now - self.started, 1e-9)
+        text = format_size(self.done)
+        if self.files:
+            text = f"{self.files_done}/{self.files} files, {text}"
+        if self.total:
+            text += f" of {format_size(self.total)} ({100 * self.done / self.total:.0f}%)"
+        print(f"{self.label}: {text} at {format_size(speed)}/s   ", end=end, flush=True)
+
+    def close(self):
+        """Show the final state and end the line."""
+        if self.enabled:
+            self._show(time.perf_counter(), end="\n")
+
+
+def create_session(connections=DEFAULT_CONNECTIONS, hosts=10):
+    """
+    Create a requests session that keeps up to `connections` connections
+    per host alive for reuse.
+
+    Args:
+        connections (int): Connections the session may use at once per host
+        hosts (int): Hosts whose connections are kept
+
+    Returns:
+        requests.Session: The session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max(hosts, 1), pool_maxsize=max(connections, 1))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def probe(session, url, headers=None):
+    """
+    Find out the size of a remote file and whether it can be fetched in ranges.
+
+    Args:
+        session (requests.Session): Session to use
+        url (str): URL of the file
+        headers (dict, optional): Extra request headers, such as the
+            conditional headers of a cached copy
+
+    Returns:
+        dict: "url" (after redirects), "size" (None if unknown), "ranges",
+            "etag" and "last_modified" (None if not sent), and
+            "not_modified" (True if the server answered 304)
+    """
+    remote = {"url": url, "size": None, "ranges": False, "etag": None, "last_modified": None,
+              "not_modified": False}
+    response = session.head(url, headers=headers, allow_redirects=True, timeout=TIMEOUT)
+    if response.status_code == 304:
+        remote["not_modified"] = True
+        return remote
+    if response.status_code >= 400:
+        # Some servers don't implement HEAD; the download itself will tell
+        return remote
+
+    headers = response.headers
+    remote["url"] = response.url
+    if headers.get("Content-Length", "").isdigit() and "Content-Encoding" not in headers:
+        remote["size"] = int(headers["Content-Length"])
+    remote["ranges"] = headers.get("Accept-Ranges", "").strip().lower() == "bytes"
+    remote["etag"], remote["last_modified"] = validators(headers)
+    return remote
+
+
+def validators(headers):
+    """
+    Return the ETag and Last-Modified of a response, or (None, None) if the
+    server asked for it not to be stored.
+    """
+    if "no-store" in headers.get("Cache-Control", "").lower():
+        return None, None
+    return headers.get("ETag"), headers.get("Last-Modified")
+
+
+# Serializes seek-and-write where os.pwrite() is not available
+_WRITE_LOCK = threading.Lock()
+
+
+def write_at(fd, data, offset):
+    """
+    Write all of data at offset in an open file.
+
+    os.pwrite() doesn't use (or move) the shared file position, so several
+    threads can write to different parts of the same file at once.
+    """
+    view = memoryview(data)
+    while view:
+        if hasattr(os, "pwrite"):
+            written = os.pwrite(fd, view, offset)
+        else:  # Windows has no pwrite(); serialize seek and write instead
+            with _WRITE_LOCK:
+                os.lseek(fd, offset, os.SEEK_SET)
+                written = os.write(fd, view)
+        view = view[written:]
+        offset += written
+
+
+def read_at(fd, size, offset):
+    """Read up to size bytes at offset in an open file (see write_at())."""
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, offset)
+    with _WRITE_LOCK:
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, size)
+
+
+def content_digest(headers):
+    """
+    Parse the Content-Digest header of a response (RFC 9530).
+
+    Returns:
+        tuple: (hashlib algorithm name, expected digest bytes) for the first
+            supported algorithm, or None if there is none
+    """
+    for member in headers.get("Content-Digest", "").split(","):
+        name, _, value = member.strip().partition("=")
+        algorithm = DIGEST_ALGORITHMS.get(name.strip().lower())
+        value = value.strip()
+        if algorithm and len(value) > 2 and value[0] == value[-1] == ":":
+            try:
+                return algorithm, base64.b64decode(value[1:-1], validate=True)
+            except ValueError:
+                continue
+    return None
+
+
+class OrderedHasher:
+    """
+    Computes whole-file digests of a file that is downloaded as parallel
+    chunks, without reading it back when the download is done.
+
+    SHA-256 and MD5 can only consume bytes in order, and chunk digests
+    can't be combined into a file digest. So bytes arriving at the hashing
+    position are hashed straight from the network. When that chunk is
+    complete, the hasher moves on to the next one: whatever part of it
+    another connection has already written, only moments ago and still
+    in the page cache, is read back once, and the rest is again hashed as
+    it arrives. The position only moves past a chunk once the chunk is
+    verified, so a chunk that is fetched again can be rolled back.
+    """
+
+    def __init__(self, fd, chunks, algorithms, done=()):
+        self.fd = fd
+        self.digests = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+        self.ends = dict(chunks)
+        self.size = chunks[-1][1] if chunks else 0
+        # Bytes written so far at the start of each chunk
+        self.filled = {start: (end - start if index in done else 0)
+                       for index, (start, end) in enumerate(chunks)}
+        self.verified = {start for index, (start, _) in enumerate(chunks) if index in done}
+        self.position = 0
+        self.read_back = 0   # Bytes hashed from the file rather than the network
+        self._current = 0    # Start of the chunk the position is in
+        self._snapshot = self._copy()
+        self._lock = threading.Lock()
+        with self._lock:
+            self._catch_up()
+
+    def _copy(self):
+        return {algorithm: digest.copy() for algorithm, digest in self.digests.items()}
+
+    def feed(self, chunk_start, offset, data):
+        """Account for data just written at offset, within the chunk at chunk_start."""
+        with self._lock:
+            self.filled[chunk_start] = offset + len(data) - chunk_start
+            if offset == self.position:
+                for digest in self.digests.values():
+                    digest.update(data)
+                self.position += len(data)
+            self._catch_up()
+
+    def _catch_up(self):
+        """Hash what other connections have already written beyond the position."""
+        while self.position < self.size:
+            start = self._current
+            if self.position == self.ends[start]:
+                if start not in self.verified:
+                    return
+                # Next chunk: remember the state, in case that chunk is retried
+                self._current = self.position
+                self._snapshot = self._copy()
+                continue
+            available = start + self.filled[start]
+            if self.position >= available:
+                return
+            while self.position < available:
+                data = read_at(self.fd, min(BUFFER_SIZE * 16, available - self.position), self.position)
+                if not data:
+                    raise DownloadError("Part file is shorter than the bytes written to it")
+                for digest in self.digests.values():
+                    digest.update(data)
+                self.position += len(data)
+                self.read_back += len(data)
+
+    def verify(self, chunk_start):
+        """Mark a chunk as complete and checked."""
+        with self._lock:
+            self.verified.add(chunk_start)
+            self._catch_up()
+
+    def rollback(self, chunk_start):
+        """Forget the bytes of a chunk that is going to be fetched again."""
+        with self._lock:
+            self.filled[chunk_start] = 0
+            if self._current == chunk_start:
+                self.position = chunk_start
+                self.digests = self._snapshot
+                self._snapshot = self._copy()
+
+    def hexdigests(self):
+        """
+        Returns:
+            dict: Hex digest of the whole file for each algorithm
+        """
+        if self.position != self.size:
+            raise DownloadError("Not all chunks were hashed")
+        return {algorithm: digest.hexdigest() for algorithm, digest in self.digests.items()}
+
+
+def preallocate(file_path, size):
+    """Create file_path with its full size reserved on disk up front."""
+    with open(file_path, "wb") as file:
+        try:
+            if size and hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(file.fileno(), 0, size)
+                return
+        except OSError:  # Not supported by this file system
+            pass
+        file.truncate(size)
+
+
+def plan_chunks(size, chunk_size):
+    """Split size bytes into (start, end) ranges of at most chunk_size bytes."""
+    return [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+
+
+def load_manifest(filename, remote):
+    """
+    Load the manifest of an interrupted download of the same remote file.
+
+    The download is only resumed if the server identified the file with an
+    ETag or Last-Modified date, and it is still the same.
+
+    Returns:
+        dict: The manifest, or None if there is nothing to resume
+    """
+    try:
+        with open(filename + MANIFEST_SUFFIX) as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get("version") != MANIFEST_VERSION or not (remote["etag"] or remote["last_modified"]):
+        return None
+    if any(manifest.get(key) != remote[key] for key in ("url", "size", "etag", "last_modified")):
+        return None
+    try:
+        if os.path.getsize(filename + PART_SUFFIX) != remote["size"]:
+            return None
+    except OSError:
+        return None
+    return manifest
+
+
+def save_manifest(filename, manifest):
+    """Save the manifest atomically, so an interruption never leaves it half-written."""
+    temp_file = filename + MANIFEST_SUFFIX + ".tmp"
+    with open(temp_file, "w") as file:
+        json.dump(manifest, file)
+    os.replace(temp_file, filename + MANIFEST_SUFFIX)
+
+
+def remove_files(*paths):
+    """Delete files, ignoring those that don't exist."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def fetch_range(session, remote, fd, start, end, progress, abort, hasher=None):
+    """
+    Download bytes [start, end) of a remote file into the same place of an
+    open file, checking them against the server's Content-Digest if any.
+
+    Raises:
+        RangesNotSupported: If the server answered with the whole file
+        DigestMismatch: If the bytes don't match the Content-Digest
+        DownloadError: If the transfer was aborted or cut short
+    """
+    headers = {"Range": f"bytes={start}-{end - 1}", "Want-Content-Digest": WANT_CONTENT_DIGEST}
+    validator = remote["etag"] or remote["last_modified"]
+    if validator:
+        # If the file changed, the server sends all of it instead of a range
+        headers["If-Range"] = validator
+
+    offset = start
+    try:
+        with session.get(remote["url"], headers=headers, stream=True, timeout=TIMEOUT) as response:
+            if response.status_code == 200:
+                raise RangesNotSupported(f"{remote['url']} did not return a partial response")
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise DownloadError(f"Unexpected status {response.status_code} for a range request")
+            expected = content_digest(response.headers)
+            digest = hashlib.new(expected[0]) if expected else None
+
+            for data in response.iter_content(BUFFER_SIZE):
+                if abort.is_set():
+                    raise DownloadError("Download aborted")
+                if offset + len(data) > end:
+                    raise DownloadError(f"Server sent more than bytes {start}-{end - 1}")
+                write_at(fd, data, offset)
+                if digest:
+                    digest.update(data)
+                if hasher:
+                    hasher.feed(start, offset, data)
+                offset += len(data)
+                progress.update(len(data))
+        if offset != end:
+            raise DownloadError(f"Connection closed after {offset - start} of {end - start} bytes")
+        if digest and digest.digest() != expected[1]:
+            raise DigestMismatch(f"Bytes {start}-{end - 1} don't match their {expected[0]} Content-Digest")
+        if hasher:
+            hasher.verify(start)
+    except BaseException:
+        progress.update(start - offset)
+        if hasher:
+            hasher.rollback(start)
+        raise
+
+
+def is_transient(error):
+    """Whether a failed request is worth retrying: network trouble or a 5xx."""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code >= 500
+
+
+def fetch_chunk(session, remote, fd, chunk, progress, abort, hasher=None, retries=RETRIES):
+    """
+    Fetch one chunk, retrying network errors and digest mismatches with
+    exponential backoff.
+
+    Returns:
+        int: Attempts that failed because the bytes didn't match their digest
+    """
+    start, end = chunk
+    mismatches = 0
+    for attempt in range(retries):
+        try:
+            fetch_range(session, remote, fd, start, end, progress, abort, hasher)
+            return mismatches
+        except RangesNotSupported:
+            raise
+        except (requests.exceptions.RequestException, DownloadError) as e:
+            mismatches += isinstance(e, DigestMismatch)
+            transient = isinstance(e, DownloadError) or is_transient(e)
+            if abort.is_set() or attempt == retries - 1 or not transient:
+                raise
+            if not isinstance(e, DigestMismatch):
+                time.sleep(0.5 * 2 ** attempt)
+
+
+def download_ranges(session, remote, filename, connections, chunk_size, progress, algorithms=()):
+    """
+    Download a file as parallel byte ranges, resuming a previous attempt.
+
+    Args:
+        session (requests.Session): Session to use
+        remote (dict): The file, as returned by probe()
+        filename (str): Where to save the file
+        connections (int): Ranges fetched at once
+        chunk_size (int): Largest range fetched with one request
+        progress (Progress): Progress display
+        algorithms (iterable): hashlib algorithms to compute whole-file digests with
+
+    Returns:
+        dict: "resumed" (bytes already there from an interrupted download),
+            "digests" (hex digest for each algorithm) and "retried" (chunks
+            fetched again because they didn't match their digest) and
+            "read_back" (bytes hashed from the file rather than the network)
+    """
+    part_file = filename + PART_SUFFIX
+    manifest = load_manifest(filename, remote)
+    if manifest is None:
+        # Use at least one chunk per connection, even for medium-sized files
+        per_connection = -(-remote["size"] // max(connections, 1))
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "url": remote["url"],
+            "size": remote["size"],
+            "etag": remote["etag"],
+            "last_modified": remote["last_modified"],
+            "chunk_size": max(min(chunk_size, per_connection), BUFFER_SIZE),
+            "done": [],
+        }
+        preallocate(part_file, remote["size"])
+        save_manifest(filename, manifest)
+
+    chunks = plan_chunks(remote["size"], manifest["chunk_size"])
+    done = set(manifest["done"])
+    resumed = sum(end - start for index, (start, end) in enumerate(chunks) if index in done)
+    progress.update(resumed)
+
+    lock = threading.Lock()
+    abort = threading.Event()
+    retried = []
+
+    def fetch(index):
+        mismatches = fetch_chunk(session, remote, fd, chunks[index], progress, abort, hasher)
+        with lock:
+            retried.extend([index] * mismatches)
+            manifest["done"].append(index)
+            manifest["done"].sort()
+            save_manifest(filename, manifest)
+
+    fd = os.open(part_file, os.O_RDWR | getattr(os, "O_BINARY", 0))
+    try:
+        hasher = OrderedHasher(fd, chunks, algorithms, done) if algorithms else None
+        with ThreadPoolExecutor(max(connections, 1)) as pool:
+            futures = [pool.submit(fetch, index) for index in range(len(chunks)) if index not in done]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                # Stop the other chunks quickly; the manifest keeps what's done
+                abort.set()
+                for future in futures:
+                    future.cancel()
+                raise
+        digests = hasher.hexdigests() if hasher else {}
+    finally:
+        os.close(fd)
+
+    os.replace(part_file, filename)
+    remove_files(filename + MANIFEST_SUFFIX)
+    return {"resumed": resumed, "digests": digests, "retried": len(retried),
+            "read_back": hasher.read_back if hasher else 0}
+
+
+def download_stream(session, url, filename, progress, digests=(), headers=None):
+    """
+    Download a file with a single streamed request, checking it against
+    the server's Content-Digest if any.
+
+    Args:
+        session (requests.Session): Session to use
+        url (str): URL of the file
+        filename (str): Where to save the file
+        progress (Progress): Progress display
+        digests (iterable): hashlib hashes updated with the bytes as they arrive
+        headers (dict, optional): Extra request headers
+
+    Returns:
+        requests.Response: The (closed) response; nothing is written if its
+            status is 304 Not Modified
+
+    Raises:
+        DigestMismatch: If the file doesn't match the Content-Digest
+    """
+    part_file = filename + PART_SUFFIX
+    written = 0
+    try:
+        headers = dict(headers or {}, **{"Want-Content-Digest": WANT_CONTENT_DIGEST})
+        with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+            response.raise_for_status()
+            if response.status_code == 304:
+                return response
+            # Content-Digest covers the encoded body, so only check it when
+            # the body isn't compressed (iter_content() decompresses it)
+            expected = None if "Content-Encoding" in response.headers else content_digest(response.headers)
+            digests = list(digests) + ([hashlib.new(expected[0])] if expected else [])
+            with open(part_file, "wb") as file:
+                for data in response.iter_content(BUFFER_SIZE):
+                    file.write(data)
+                    for digest in digests:
+                        digest.update(data)
+                    written += len(data)
+                    progress.update(len(data))
+        if expected and digests[-1].digest() != expected[1]:
+            remove_files(part_file)
+            raise DigestMismatch(f"{url} doesn't match its {expected[0]} Content-Digest")
+    except BaseException:
+        progress.update(-written)
+        raise
+    os.replace(part_file, filename)
+    return response
+
+
+def download_file(url, filename, show_progress=True, connections=DEFAULT_CONNECTIONS,
+                  chunk_size=CHUNK_SIZE, session=None, cache=None, checksum=None):
+    """
+    Download a file from a URL and save it to disk.
+
+    Files of MIN_RANGED_SIZE or more are fetched as parallel byte ranges
+    when the server supports them, and resume after an interruption.
+    With a cache, a copy the server reports as unchanged is linked into
+    place instead of being downloaded again. The file is hashed while it
+    is written, so verifying a checksum costs no extra read.
+
+    Args:
+        url (str): The URL to download from
+        filename (str): The name to save the file as
+        show_progress (bool): Whether to display progress
+        connections (int): Parallel connections for ranged downloads
+        chunk_size (int): Largest byte range fetched with one request
+        session (requests.Session, optional): Session to reuse
+        cache (DownloadCache, optional): Cache to use
+        checksum (tuple, optional): Expected (algorithm, hex digest), as
+            returned by parse_checksum()
+
+    Returns:
+        bool: True if download succeeded, False otherwise
+    """
+    own_session = session is None
+    session = session or create_session(connections)
+    progress = None
+    try:
+        print(f"Downloading {url}...")
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # With a cached copy, the probe is conditional: 304 means it's current
+        cached = cache.lookup(url) if cache else None
+        remote = probe(session, url, DownloadCache.conditional_headers(cached))
+        if remote["not_modified"]:
+            if cache.materialize(cached, filename):
+                print(f"Not modified; linked {format_size(cached['size'])} from the cache")
+                print(f"File saved as: {os.path.abspath(filename)}")
+                return True
+            remote = probe(session, url)
+        progress = Progress(remote["size"], os.path.basename(filename), show_progress)
+        started = time.perf_counter()
+        algorithms = ({checksum[0]} if checksum else set()) | ({"sha256"} if cache else set())
+        result = {"resumed": 0, "digests": {}, "retried": 0, "read_back": 0}
+
+        ranged = remote["ranges"] and (remote["size"] or 0) >= MIN_RANGED_SIZE
+        if ranged:
+            try:
+                result = download_ranges(session, remote, filename, connections, chunk_size, progress,
+                                         algorithms)
+            except RangesNotSupported:
+                remove_files(filename + PART_SUFFIX, filename + MANIFEST_SUFFIX)
+                progress.update(-progress.done)
+                ranged = False
+        for attempt in range(RETRIES if not ranged else 0):
+            digests = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+            try:
+                response = download_stream(session, remote["url"], filename, progress, digests.values())
+            except DigestMismatch:
+                if attempt == RETRIES - 1:
+                    raise
+                result["retried"] += 1
+                continue
+            remote["etag"], remote["last_modified"] = validators(response.headers)
+            result["digests"] = {algorithm: digest.hexdigest() for algorithm, digest in digests.items()}
+            break
+        progress.close()
+
+        if checksum and result["digests"][checksum[0]] != checksum[1]:
+            remove_files(filename)
+            raise DownloadError(f"{checksum[0]} mismatch: expected {checksum[1]}, "
+                                f"got {result['digests'][checksum[0]]}")
+        if cache:
+            cache.store(url, filename, result["digests"]["sha256"], remote["etag"], remote["last_modified"])
+
+        elapsed = time.perf_counter() - started
+        resumed = result["resumed"]
+        how = f"{connections} connections" if ranged and connections > 1 else "1 connection"
+        print(f"Downloaded {format_size(progress.done - resumed)} in {elapsed:.1f}s over {how}"
+              + (f" (resumed, {format_size(resumed)} already done)" if resumed else ""))
+        if result["retried"]:
+            print(f"Fetched {'chunks' if ranged else 'the file'} again {result['retried']} time(s) "
+                  "after a Content-Digest mismatch")
+        if checksum:
+            print(f"Verified {checksum[0]}: {checksum[1]}")
+        print(f"File saved as: {os.path.abspath(filename)}")
+        return True
+
+    except requests.exceptions.RequestException as e:
+        print(f"\nError during request: {e}")
+    except DownloadError as e:
+        print(f"\nDownload failed: {e}")
+    except OSError as e:
+        print(f"\nError saving file: {e}")
+    finally:
+        if own_session:
+            session.close()
+
+    if os.path.exists(filename + MANIFEST_SUFFIX):
+        print("Run the same command again to resume the download.")
+    return False
+
+
+def parse_checksum(text):
+    """
+    Parse an expected checksum such as "sha256:<hex>" or "md5:<hex>". A bare
+    hex digest is identified by its length.
+
+    Returns:
+        tuple: (hashlib algorithm name, lowercase hex digest)
+
+    Raises:
+        ValueError: If the algorithm is unknown
+    """
+    algorithm, _, digest = text.strip().rpartition(":")
+    digest = digest.lower()
+    algorithm = algorithm.lower() or CHECKSUM_LENGTHS.get(len(digest))
+    if algorithm not in hashlib.algorithms_available:
+        raise ValueError(f"Unrecognized checksum '{text}'")
+    return algorithm, digest
+
+
+def read_manifest(manifest_file):
+    """
+    Read a bulk download manifest.
+
+    Each line holds a URL, a destination path and optionally the expected
+    checksum and a priority=N (lower starts sooner, default 0), separated by
+    whitespace. Blank lines and lines starting with # are skipped.
+
+    Args:
+        manifest_file (str): Path to the manifest ("-" for stdin)
+
+    Returns:
+        list: Dicts with "url", "destination", "checksum" (None, or the
+            (algorithm, digest) pair returned by parse_checksum()) and
+            "priority"
+
+    Raises:
+        ValueError: If a line is malformed
+    """
+    file = sys.stdin if manifest_file == "-" else open(manifest_file)
+    entries = []
+    with file:
+        for number, line in enumerate(file, 1):
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            priority = 0
+            if len(fields) > 2 and fields[-1].startswith("priority="):
+                try:
+                    priority = int(fields.pop()[len("priority="):])
+                except ValueError:
+                    raise ValueError(f"{manifest_file}:{number}: priority must be an integer") from None
+            if len(fields) not in (2, 3):
+                raise ValueError(f"{manifest_file}:{number}: expected URL, destination, "
+                                 "optional checksum and optional priority=N")
+            try:
+                checksum = parse_checksum(fields[2]) if len(fields) == 3 else None
+            except ValueError as e:
+                raise ValueError(f"{manifest_file}:{number}: {e}") from None
+            entries.append({"url": fields[0], "destination": fields[1], "checksum": checksum,
+                            "priority": priority})
+    return entries
+
+
+class HostScheduler:
+    """
+    Hands manifest entries to workers, never more than per_host at a time
+    for the same host. Entries of one host are handed out by priority, then
+    in manifest order.
+    """
+
+    def __init__(self, entries, per_host=DEFAULT_PER_HOST):
+        self.per_host = max(per_host, 1)
+        self.pending = {}
+        for entry in sorted(entries, key=lambda entry: entry.get("priority", 0)):
+            self.pending.setdefault(self.host(entry), deque()).append(entry)
+        self.active = Counter()
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def host(entry):
+        return urllib.parse.urlsplit(entry["url"]).netloc.lower()
+
+    def take(self):
+        """
+        Wait until an entry may start and return it.
+
+        Returns:
+            dict: The next entry, or None when there are none left
+        """
+        with self._condition:
+            while self.pending:
+                for host, entries in self.pending.items():
+                    if self.active[host] < self.per_host:
+                        entry = entries.popleft()
+                        if not entries:
+                            del self.pending[host]
+                        self.active[host] += 1
+                        return entry
+                self._condition.wait()
+            return None
+
+    def finish(self, entry):
+        """Free the host slot of an entry taken with take()."""
+        with self._condition:
+            self.active[self.host(entry)] -= 1
+            self._condition.notify_all()
+
+    def cancel(self):
+        """Drop the entries that haven't started."""
+        with self._condition:
+            self.pending.clear()
+            self._condition.notify_all()
+
+
+def download_entry(session, entry, progress, retries=RETRIES, cache=None):
+    """
+    Download one manifest entry, verifying its checksum as it is written.
+
+    Returns:
+        bool: True if the file came from the cache
+
+    Raises:
+        DownloadError: If the checksum doesn't match
+        requests.exceptions.RequestException: If every attempt failed
+    """
+    url, destination, checksum = entry["url"], entry["destination"], entry["checksum"]
+    directory = os.path.dirname(destination)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    cached = cache.lookup(url) if cache else None
+    if cached and checksum and checksum[0] == "sha256" and checksum[1] != cached["sha256"]:
+        cached = None  # The manifest wants different content; don't even ask
+    for attempt in range(retries):
+        digests = {checksum[0]: hashlib.new(checksum[0])} if checksum else {}
+        if cache:
+            digests.setdefault("sha256", hashlib.sha256())
+        try:
+            response = download_stream(session, url, destination, progress, digests.values(),
+                                       DownloadCache.conditional_headers(cached))
+            if response.status_code != 304:
+                break
+            if cache.materialize(cached, destination):
+                return True
+            cached = None  # Evicted meanwhile: download it after all
+        except (requests.exceptions.RequestException, DigestMismatch) as e:
+            if attempt == retries - 1 or not (isinstance(e, DigestMismatch) or is_transient(e)):
+                remove_files(destination + PART_SUFFIX)
+                raise
+            time.sleep(0.5 * 2 ** attempt)
+
+    if checksum and digests[checksum[0]].hexdigest() != checksum[1]:
+        remove_files(destination)
+        raise DownloadError(f"{checksum[0]} mismatch: expected {checksum[1]}, "
+                            f"got {digests[checksum[0]].hexdigest()}")
+    if cache:
+        cache.store(url, destination, digests["sha256"].hexdigest(), *validators(response.headers))
+    return False
+
+
+def download_many(entries, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST, show_progress=True,
+                  session=None, cache=None):
+    """
+    Download many files at once with a bounded pool of workers.
+
+    The workers share one session, so connections to each host are kept
+    alive and reused from one file to the next.
+
+    Args:
+        entries (list): Entries as returned by read_manifest()
+        workers (int): Files downloaded at once
+        per_host (int): Files downloaded at once from the same host
+        show_progress (bool): Whether to display progress
+        session (requests.Session, optional): Session to reuse
+        cache (DownloadCache, optional): Cache to use
+
+    Returns:
+        bool: True if every file was downloaded (and verified)
+    """
+    workers = max(min(workers, len(entries)), 1)
+    scheduler = HostScheduler(entries, per_host)
+    own_session = session is None
+    session = session or create_session(min(per_host, workers), hosts=len(scheduler.pending))
+    progress = Progress(label="Bulk download", enabled=show_progress, files=len(entries))
+    failures = []
+    hits = []
+    lock = threading.Lock()
+
+    def work():
+        while True:
+            entry = scheduler.take()
+            if entry is None:
+                return
+            try:
+                if download_entry(session, entry, progress, cache=cache):
+                    hits.append(entry)
+            except (requests.exceptions.RequestException, DownloadError, OSError) as e:
+                with lock:
+                    failures.append((entry, e))
+            finally:
+                scheduler.finish(entry)
+                progress.file_done()
+
+    print(f"Downloading {len(entries)} files with {workers} workers (at most {per_host} per host)...")
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(workers) as pool:
+            futures = [pool.submit(work) for _ in range(workers)]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                scheduler.cancel()
+                raise
+    finally:
+        if own_session:
+            session.close()
+    progress.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Downloaded {len(entries) - len(failures)} of {len(entries)} files "
+          f"({format_size(progress.done)}) in {elapsed:.1f}s"
+          + (f", {len(hits)} unchanged and linked from the cache" if cache else ""))
+    for entry, error in failures:
+        print(f"  Failed: {entry['url']} -> {entry['destination']}: {error}")
+    return not failures
+
+
+def main():
+    """Parse command-line arguments and download the file."""
+    parser = argparse.ArgumentParser(description="Download files from the internet")
+    parser.add_argument("--url", default=DEFAULT_URL, help="URL to download from")
+    parser.add_argument("--output", default="downloaded_file.txt", help="Name to save the file as")
+    parser.add_argument("--no-progress", action="store_true", help="Disable progress display")
+    parser.add_argument("--checksum", type=parse_checksum,
+                        help="Expected checksum of the file, e.g. sha256:<hex> or md5:<hex>")
+    parser.add_argument("-c", "--connections", type=int, default=DEFAULT_CONNECTIONS,
+                        help=f"Parallel connections for large files (default: {DEFAULT_CONNECTIONS})")
+    parser.add_argument("--chunk-size", type=float, default=CHUNK_SIZE / (1024 * 1024),
+                        help=f"Largest byte range per request, in MB (default: {CHUNK_SIZE // (1024 * 1024)})")
+    parser.add_argument("--manifest",
+                        help="Download every 'URL DESTINATION [CHECKSUM]' line of this file ('-' for stdin)")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Files downloaded at once with --manifest (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST,
+                        help=f"Files downloaded at once from one host (default: {DEFAULT_PER_HOST})")
+    parser.add_argument("--backend", choices=("threads", "asyncio"), default="threads",
+                        help="How --manifest downloads run: a thread per worker, or one event loop that "
+                             "scales to thousands of files at once (default: threads)")
+    parser.add_argument("--bandwidth", type=float,
+                        help="Total speed limit of --backend asyncio, in MB/s")
+    parser.add_argument("--cache", action="store_true",
+                        help="Keep downloads in a local cache and only re-download files that changed")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"Cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-size", type=float, default=DEFAULT_MAX_SIZE / (1024 * 1024),
+                        help=f"Cache size limit in MB (default: {DEFAULT_MAX_SIZE // (1024 * 1024)})")
+    args = parser.parse_args()
+    if args.bandwidth and args.backend != "asyncio":
+        parser.error("--bandwidth requires --backend asyncio")
 
-if __name__ == "__main__":
-    # TODO: Call your download function with an example URL
-    # Some example URLs you can use:
-    # - https://raw.githubusercontent.com/python/cpython/master/README.rst (Text file)
-    # - https://www.python.org/static/img/python-logo.png (Small image)
-    
     print("File Download Script")
     print("====================")
 
-    print("\nRemember to install the required dependencies:")
-    print("pip install requests") 
\ No newline at end of file
+    cache = DownloadCache(args.cache_dir, int(args.cache_size * 1024 * 1024)) if args.cache else None
+    try:
+        if args.manifest:
+            try:
+                entries = read_manifest(args.manifest)
+            except (OSError, ValueError) as e:
+                print(f"Error reading manifest: {e}")
+                sys.exit(1)
+            if args.backend == "asyncio":
+                # Imported here: the asyncio backend builds on this module
+                from async_downloader import download_many_async
+                bandwidth = args.bandwidth * 1024 * 1024 if args.bandwidth else None
+                success = download_many_async(entries, args.workers, args.per_host, not args.no_progress,
+                                              bandwidth, cache)
+            else:
+                success = download_many(entries, args.workers, args.per_host, not args.no_progress, cache=cache)
+        else:
+            success = download_file(args.url, args.output, not args.no_progress, args.connections,
+                                    int(args.chunk_size * 1024 * 1024), cache=cache, checksum=args.checksum)
+    except KeyboardInterrupt:
+        print("\nInterrupted. Run the same command again to resume the download.")
+        sys.exit(130)
+
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+LAB02 - Local Test Server
+
+A small HTTP/1.1 file server for trying out downloader.py without the
+internet. Unlike `python -m http.server`, it keeps connections alive and
+supports what the downloader relies on:
+
+- HEAD requests with Content-Length, Accept-Ranges, ETag and Last-Modified
+- Single byte ranges (Range, If-Range) answered with 206 Partial Content
+- Conditional requests (If-None-Match, If-Modified-Since) answered with
+  304 Not Modified
+- Content-Digest (RFC 9530) of the full or partial body, when the request
+  has a Want-Content-Digest header
+
+It can also simulate a slow network: --bandwidth caps the speed of each
+connection (the way one TCP stream is often capped by distance or a busy
+server) and --latency delays every response. --corrupt flips a byte in
+a fraction of the responses, after their digest is computed, to exercise
+the downloader's verification.
+
+Usage:
+    python local_server.py files/
+    python local_server.py files/ --port 8000 --bandwidth 10 --latency 0.02
+    python local_server.py files/ --corrupt 0.1
+"""
+
+import argparse
+import base64
+import email.utils
+import hashlib
+import os
+import posixpath
+import random
+import re
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Bytes sent at a time
+BLOCK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class FileRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the files of server.directory, with byte ranges and keep-alive.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; don't let Nagle hold them back
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        """Stay quiet unless the server was started with verbose=True."""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_HEAD(self):
+        self.send_file(head=True)
+
+    def do_GET(self):
+        self.send_file(head=False)
+
+    def translate_path(self):
+        """Map the request path to a file inside the served directory."""
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        parts = [part for part in posixpath.normpath(path).split("/") if part not in ("", ".", "..")]
+        return os.path.join(self.server.directory, *parts)
+
+    def send_file(self, head):
+        with self.server.lock:
+            self.server.active += 1
+            self.server.peak_active = max(self.server.peak_active, self.server.active)
+        try:
+            self._send_file(head)
+        finally:
+            with self.server.lock:
+                self.server.active -= 1
+
+    def _send_file(self, head):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        file_path = self.translate_path()
+        try:
+            file = open(file_path, "rb")
+        except OSError:
+            self.send_error(404, "File not found")
+            return
+
+        with file:
+            stat = os.fstat(file.fileno())
+            size = stat.st_size
+            etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+            last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+
+            if self.not_modified(etag, stat.st_mtime):
+                self.send_response(304)
+                self.send_header("Last-Modified", last_modified)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            start, end = 0, size
+            status = 200
+            match = _RANGE.match(self.headers.get("Range", ""))
+            if_range = self.headers.get("If-Range")
+            if match and self.server.ranges and if_range in (None, etag, last_modified):
+                first, last = match.groups()
+                if first:
+                    start = int(first)
+                    end = min(int(last) + 1, size) if last else size
+                elif last:
+                    start = max(size - int(last), 0)
+                if start >= size or start >= end:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                status = 206
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(end - start))
+            self.send_header("Last-Modified", last_modified)
+            self.send_header("ETag", etag)
+            if self.server.ranges:
+                self.send_header("Accept-Ranges", "bytes")
+            if status == 206:
+                self.send_header("Content-Range", f"bytes {start}-{end - 1}/{size}")
+            if "Want-Content-Digest" in self.headers and not head:
+                digest = base64.b64encode(self.body_digest(file, start, end)).decode()
+                self.send_header("Content-Digest", f"sha-256=:{digest}:")
+            self.end_headers()
+            if not head:
+                self.send_body(file, start, end)
+
+    def not_modified(self, etag, mtime):
+        """Whether the client's cached copy, as described by its conditional headers, is current."""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            # If-None-Match takes precedence over If-Modified-Since
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(mtime) <= since
+        return False
+
+    def body_digest(self, file, start, end):
+        """SHA-256 of bytes [start, end) of file."""
+        digest = hashlib.sha256()
+        file.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = file.read(min(BLOCK_SIZE * 16, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+        return digest.digest()
+
+    def send_body(self, file, start, end):
+        """Send bytes [start, end) of file, no faster than server.bandwidth."""
+        bandwidth = self.server.bandwidth
+        with self.server.lock:
+            corrupt = self.server.random.random() < self.server.corrupt
+        started = time.perf_counter()
+        file.seek(start)
+        sent = 0
+        while sent < end - start:
+            block = file.read(min(BLOCK_SIZE, end - start - sent))
+            if not block:
+                break
+            if corrupt:
+                block = bytes([block[0] ^ 0xFF]) + block[1:]
+                corrupt = False
+            self.wfile.write(block)
+            sent += len(block)
+            if bandwidth:
+                ahead = sent / bandwidth - (time.perf_counter() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+
+class FileServer(ThreadingHTTPServer):
+    """A threaded server that also accepts thousands of connections at once."""
+
+    daemon_threads = True
+    # Listen backlog; the default of 5 drops connections when many arrive together
+    request_queue_size = 4096
+
+    def handle_error(self, request, client_address):
+        """Clients that hang up mid-response are normal; don't print those."""
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_server(directory, port=0, bandwidth=None, latency=0.0, ranges=True, verbose=False,
+                 corrupt=0.0, seed=None):
+    """
+    Serve a directory from a background thread.
+
+    Args:
+        directory (str): Directory to serve
+        port (int): Port on 127.0.0.1 (0 picks a free one)
+        bandwidth (float, optional): Bytes per second per connection
+        latency (float): Seconds to wait before each response
+        ranges (bool): Whether to honor Range requests
+        verbose (bool): Log every request
+        corrupt (float): Fraction of responses to damage (one flipped byte)
+        seed (int, optional): Seed choosing which responses are damaged
+
+    Returns:
+        tuple: (server, base URL); call server.shutdown() to stop it.
+            server.peak_active is the most responses it sent at once
+    """
+    server = FileServer(("127.0.0.1", port), FileRequestHandler)
+    server.directory = os.path.abspath(directory)
+    server.bandwidth = bandwidth
+    server.latency = latency
+    server.ranges = ranges
+    server.verbose = verbose
+    server.corrupt = corrupt
+    server.random = random.Random(seed)
+    server.lock = threading.Lock()
+    server.active = server.peak_active = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    """Serve a directory until Ctrl+C."""
+    parser = argparse.ArgumentParser(description="Serve files locally for testing the downloader")
+    parser.add_argument("directory", nargs="?", default=".", help="Directory to serve (default: .)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--bandwidth", type=float, help="Speed limit per connection, in MB/s")
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay before each response, in seconds")
+    parser.add_argument("--no-ranges", action="store_true", help="Ignore Range requests")
+    parser.add_argument("--corrupt", type=float, default=0.0,
+                        help="Fraction of responses to damage with a flipped byte (default: 0)")
+    args = parser.parse_args()
+
+    bandwidth = args.bandwidth * 1024 * 1024 if args.bandwidth else None
+    server, url = start_server(args.directory, args.port, bandwidth, args.latency,
+                               not args.no_ranges, verbose=True, corrupt=args.corrupt)
+    print(f"Serving {os.path.abspath(args.directory)} at {url}/ (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+LAB03 - Columnar Cache Benchmark
+
+Compares generating a report by parsing the log text with generating it
+from the columnar cache (parser.py --cache), and shows the one-off cost of
+compiling the cache. Both reports are checked to contain the same results.
+
+Usage:
+    python benchmark_cache.py                  # logs.txt repeated to ~100 MB
+    python benchmark_cache.py /var/log/app.log
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from benchmark_compressed import build_sample, log_parser
+
+
+def best_time(function, repeat):
+    """Return the best wall time of calling function, and its last result."""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Benchmark reports from text vs the columnar cache.")
+    parser.add_argument("log_file", nargs="?", help="Log file to benchmark (default: logs.txt scaled up)")
+    parser.add_argument("--size-mb", type=int, default=100,
+                        help="Size of the sample built from logs.txt (default: 100)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode, best is kept (default: 3)")
+    args = parser.parse_args()
+
+    print("Columnar Cache Benchmark")
+    print("========================")
+    if log_parser.numpy is None:
+        print("NumPy is not installed; the columnar cache needs it (pip install numpy)")
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        log_file = os.path.join(workdir, "sample.log")
+        if args.log_file:
+            shutil.copyfile(args.log_file, log_file)
+        else:
+            here = os.path.dirname(os.path.abspath(__file__))
+            build_sample(os.path.join(here, "logs.txt"), log_file, args.size_mb)
+        size_mb = os.path.getsize(log_file) / (1024 * 1024)
+
+        parse_time, parsed = best_time(lambda: log_parser.analyze_file(log_file), args.repeat)
+        compile_time, _ = best_time(lambda: log_parser.compile_log(log_file), 1)
+        cache_time, cached = best_time(lambda: log_parser.analyze_cache(log_file), args.repeat)
+
+        # Level counts are the same, only collected in a different order
+        for key in parsed:
+            if parsed[key] != cached[key]:
+                print(f"Warning: '{key}' differs between the parsed and cached reports")
+
+        cache_mb = sum(entry.stat().st_size for entry in os.scandir(log_file + log_parser.CACHE_SUFFIX))
+        cache_mb /= 1024 * 1024
+
+        print(f"{'Mode':<16} {'Seconds':>8} {'MB/s':>9} {'vs parse':>9}")
+        print(f"{'parse text':<16} {parse_time:>8.3f} {size_mb / parse_time:>9.1f} {1:>8.1f}x")
+        print(f"{'compile (once)':<16} {compile_time:>8.3f} {size_mb / compile_time:>9.1f} "
+              f"{parse_time / compile_time:>8.1f}x")
+        print(f"{'from cache':<16} {cache_time:>8.3f} {size_mb / cache_time:>9.1f} "
+              f"{parse_time / cache_time:>8.1f}x")
+
+        print(f"\n{parsed['total_entries']} entries, {size_mb:.1f} MB log, {cache_mb:.1f} MB cache")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+LAB03 - Error Classifier Benchmark
+
+Compares the per-message cost of the compiled ErrorClassifier in parser.py
+with the naive approach (one keyword check per category per message) as the
+number of error categories grows.
+
+Usage:
+    python benchmark_classifier.py
+    python benchmark_classifier.py --categories 5 50 500 --messages 20000
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import string
+import time
+
+
+def load_parser_module():
+    """
+    Import parser.py from this lab folder.
+
+    On Python < 3.10 "import parser" would pick up the built-in module of the
+    same name, so the lab's parser.py is loaded by path instead.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parser.py")
+    spec = importlib.util.spec_from_file_location("log_parser", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+log_parser = load_parser_module()
+ERROR_CATEGORIES = log_parser.ERROR_CATEGORIES
+ErrorClassifier = log_parser.ErrorClassifier
+
+
+def make_categories(count, keywords_per_category=3, seed=42):
+    """
+    Build synthetic error categories on top of the real ones.
+
+    Args:
+        count (int): Total number of categories
+        keywords_per_category (int): Keywords for each synthetic category
+        seed (int): Random seed, so runs are comparable
+
+    Returns:
+        list: (name, keywords) pairs in priority order
+    """
+    rng = random.Random(seed)
+    categories = list(ERROR_CATEGORIES[:count])
+    while len(categories) < count:
+        keywords = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10)))
+                    for _ in range(keywords_per_category)]
+        categories.append((f"Category {len(categories)}", keywords))
+    return categories
+
+
+def make_messages(count, seed=42):
+    """
+    Build error messages similar to the ones in logs.txt.
+
+    Args:
+        count (int): Number of messages
+        seed (int): Random seed, so runs are comparable
+
+    Returns:
+        list: Error messages
+    """
+    rng = random.Random(seed)
+    templates = [
+        "Failed to connect to database - Connection timeout",
+        "Permission denied when accessing /etc/restricted/config.json",
+        "Deployment failed - Missing dependency: libcrypto.so.1.1",
+        "Out of memory error in worker process #{n}",
+        "Service unavailable - Authentication service not responding",
+        "Unhandled exception in request handler {n}",
+        "Checksum mismatch for artifact build-{n}.tar.gz",
+    ]
+    return [rng.choice(templates).format(n=rng.randint(1, 99999)) for _ in range(count)]
+
+
+def naive_classify(message, categories, default="Other errors"):
+    """Classify a message with one keyword check per category."""
+    message = message.lower()
+    for name, keywords in categories:
+        if any(keyword in message for keyword in keywords):
+            return name
+    return default
+
+
+def time_per_message(classify, messages):
+    """Return the average time per message in microseconds."""
+    start = time.perf_counter()
+    for message in messages:
+        classify(message)
+    return (time.perf_counter() - start) / len(messages) * 1e6
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Benchmark the error classifier.")
+    parser.add_argument("--categories", type=int, nargs="+", default=[5, 50, 500],
+                        help="Category counts to benchmark (default: 5 50 500)")
+    parser.add_argument("--messages", type=int, default=20000,
+                        help="Messages to classify per run (default: 20000)")
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages)
+
+    print("Error Classifier Benchmark")
+    print("==========================")
+    print(f"{'Categories':>10}  {'Naive (us/msg)':>15}  {'Compiled (us/msg)':>18}")
+
+    for count in args.categories:
+        categories = make_categories(count)
+        classifier = ErrorClassifier(categories)
+
+        for message in messages[:100]:
+            assert classifier.classify(message) == naive_classify(message, categories)
+
+        naive = time_per_message(lambda message: naive_classify(message, categories), messages)
+        compiled = time_per_message(classifier.classify, messages)
+        print(f"{count:>10}  {naive:>15.2f}  {compiled:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
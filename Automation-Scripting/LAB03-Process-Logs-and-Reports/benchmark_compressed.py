@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+LAB03 - Compressed Log Benchmark
+
+Measures how fast parser.py analyzes the same log stored as plain text,
+gzip and zstd (if the zstandard package is installed). Throughput is given
+in uncompressed MB/s so the numbers are directly comparable.
+
+Usage:
+    python benchmark_compressed.py                  # logs.txt repeated to ~100 MB
+    python benchmark_compressed.py /var/log/app.log
+"""
+
+import argparse
+import gzip
+import importlib.util
+import os
+import shutil
+import tempfile
+import time
+
+
+def load_parser_module():
+    """
+    Import parser.py from this lab folder.
+
+    On Python < 3.10 "import parser" would pick up the built-in module of the
+    same name, so the lab's parser.py is loaded by path instead.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parser.py")
+    spec = importlib.util.spec_from_file_location("log_parser", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+log_parser = load_parser_module()
+
+
+def build_sample(source, target, size_mb):
+    """Repeat a log file until the target file is about size_mb megabytes."""
+    with open(source, "rb") as file:
+        block = file.read().rstrip(b"\n") + b"\n"
+    repeats = max(1, size_mb * 1024 * 1024 // len(block))
+    with open(target, "wb") as file:
+        for _ in range(repeats):
+            file.write(block)
+
+
+def compress_copies(plain_file):
+    """Write .gz (and .zst when available) copies of a log file."""
+    copies = {"plain": plain_file}
+
+    gz_file = plain_file + ".gz"
+    with open(plain_file, "rb") as source, gzip.open(gz_file, "wb", compresslevel=6) as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+    copies["gzip"] = gz_file
+
+    if log_parser.zstandard is not None:
+        zst_file = plain_file + ".zst"
+        with open(plain_file, "rb") as source, open(zst_file, "wb") as target:
+            log_parser.zstandard.ZstdCompressor(level=3).copy_stream(source, target)
+        copies["zstd"] = zst_file
+    return copies
+
+
+def time_analysis(file_path, repeat=3):
+    """Return the best wall time of analyzing a segment, and its entry count."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = log_parser.analyze_segments([file_path])
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results["total_entries"]
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Benchmark plain vs compressed log analysis.")
+    parser.add_argument("log_file", nargs="?", help="Log file to benchmark (default: logs.txt scaled up)")
+    parser.add_argument("--size-mb", type=int, default=100,
+                        help="Size of the sample built from logs.txt (default: 100)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per format, best is kept (default: 3)")
+    args = parser.parse_args()
+
+    print("Compressed Log Benchmark")
+    print("========================")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        plain_file = os.path.join(workdir, "sample.log")
+        if args.log_file:
+            shutil.copyfile(args.log_file, plain_file)
+        else:
+            here = os.path.dirname(os.path.abspath(__file__))
+            build_sample(os.path.join(here, "logs.txt"), plain_file, args.size_mb)
+
+        size_mb = os.path.getsize(plain_file) / (1024 * 1024)
+        copies = compress_copies(plain_file)
+        if "zstd" not in copies:
+            print("zstandard is not installed; skipping zstd (pip install zstandard)")
+
+        print(f"{'Format':<7} {'File MB':>8} {'Seconds':>8} {'MB/s':>8} {'vs plain':>9}")
+        baseline = None
+        for name, path in copies.items():
+            elapsed, entries = time_analysis(path, args.repeat)
+            baseline = baseline or elapsed
+            file_mb = os.path.getsize(path) / (1024 * 1024)
+            print(f"{name:<7} {file_mb:>8.1f} {elapsed:>8.2f} {size_mb / elapsed:>8.1f} "
+                  f"{elapsed / baseline:>8.2f}x")
+
+        print(f"\n{entries} entries, {size_mb:.1f} MB uncompressed")
+
+
+if __name__ == "__main__":
+    main()
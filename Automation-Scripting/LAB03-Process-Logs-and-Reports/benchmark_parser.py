@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+LAB03 - Parser Benchmark Suite
+
+Runs parser.py in each of its modes on the same log and reports, per mode,
+lines/s, MB/s, peak memory and how long each phase took. Every mode runs
+in a fresh process, so peak RSS is measured for that mode alone (for -j,
+it is that of the largest single process). Results are saved as JSON and
+can be compared with an earlier run.
+
+By default a 1M-line log is generated with generate_logs.py; pass --log to
+benchmark a real one. Sidecar files (index, cache, checkpoint, gzip copy)
+are written to a temporary directory, never next to the log.
+
+Usage:
+    python benchmark_parser.py
+    python benchmark_parser.py --lines 10000000 --modes serial parallel cache
+    python benchmark_parser.py --log /var/log/app.log --json app-results.json
+    python benchmark_parser.py --baseline benchmark_results.json
+"""
+
+import argparse
+import contextlib
+import datetime
+import gzip
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmark_compressed import log_parser
+from generate_logs import generate_log
+
+
+MODES = ["serial", "parallel", "sketches", "trends", "index", "incremental", "gzip", "cache"]
+
+
+def run_mode(mode, log_file, workdir, workers):
+    """
+    Run one parser mode and time its phases (runs in the child process).
+
+    Args:
+        mode (str): One of MODES
+        log_file (str): Log to analyze (inside workdir)
+        workdir (str): Directory for reports and sidecar files
+        workers (int): Worker processes for the parallel mode
+
+    Returns:
+        dict: Phase timings and the number of entries analyzed
+    """
+    phases = {}
+
+    def timed(phase, function, *args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        phases[phase] = time.perf_counter() - start
+        return result
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "serial":
+            results = timed("analyze", log_parser.analyze_file, log_file)
+        elif mode == "parallel":
+            results = timed("analyze", log_parser.analyze_file, log_file, workers)
+        elif mode == "sketches":
+            results = timed("analyze", log_parser.analyze_file, log_file, sketches=True)
+        elif mode == "trends":
+            results = timed("analyze", log_parser.analyze_file, log_file, trends=True)
+        elif mode == "index":
+            index = timed("build_index", log_parser.load_index, log_file)
+            middle = index.minutes[len(index.minutes) // 2] if index.minutes else 0
+            since, until = log_parser._minute_text(middle), log_parser._minute_text(middle + 60)
+            results = timed("query_hour", log_parser.analyze_time_range, log_file, since, until)
+        elif mode == "incremental":
+            checkpoint = os.path.join(workdir, "checkpoint.json")
+            timed("first_run", log_parser.analyze_incremental, log_file, checkpoint)
+            results = timed("rerun", log_parser.analyze_incremental, log_file, checkpoint)
+        elif mode == "gzip":
+            results = timed("analyze", log_parser.analyze_segments, [log_file + ".gz"])
+        elif mode == "cache":
+            if log_parser.numpy is None:
+                return {"skipped": "NumPy is not installed"}
+            timed("compile", log_parser.compile_log, log_file)
+            results = timed("query", log_parser.analyze_cache, log_file)
+        else:
+            raise ValueError(f"Unknown mode: {mode}")
+
+        if results is None:
+            return {"skipped": "analysis failed"}
+        timed("report", log_parser.generate_report, results, os.path.join(workdir, f"{mode}-report.txt"))
+
+    return {"phases": phases, "entries": results["total_entries"]}
+
+
+def measure_mode(mode, log_file, workdir, workers):
+    """
+    Run a mode in a child process and measure its peak memory.
+
+    Returns:
+        dict: The child's results plus "peak_rss_mb" (None if unavailable)
+    """
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode, log_file, workdir, str(workers)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
+    output = process.stdout.read()
+    process.stdout.close()
+
+    peak_rss = None
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(process.pid, 0)
+        # As subprocess reports it: the exit code, or minus the signal that killed it
+        # (os.waitstatus_to_exitcode() does this, but only from Python 3.9)
+        process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak_rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    else:
+        process.wait()
+
+    if process.returncode != 0:
+        return {"skipped": f"exited with status {process.returncode}"}
+    result = json.loads(output)
+    result["peak_rss_mb"] = round(peak_rss, 1) if peak_rss is not None else None
+    return result
+
+
+def count_lines(file_path):
+    """Count the lines of a file without decoding it."""
+    lines = 0
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(8 * 1024 * 1024), b""):
+            lines += block.count(b"\n")
+    return lines
+
+
+def prepare_log(args, workdir):
+    """
+    Put the log to benchmark into workdir, generating it if needed.
+
+    Returns:
+        tuple: (path of the log in workdir, description of where it came from)
+    """
+    log_file = os.path.join(workdir, "bench.log")
+    if args.log:
+        try:
+            os.symlink(os.path.abspath(args.log), log_file)
+        except OSError:
+            shutil.copyfile(args.log, log_file)
+        return log_file, {"source": os.path.abspath(args.log)}
+
+    print(f"Generating {args.lines} lines (seed {args.seed}, {args.bursts} bursts)...")
+    generate_log(log_file, args.lines, bursts=args.bursts, seed=args.seed)
+    return log_file, {"generated": {"lines": args.lines, "bursts": args.bursts, "seed": args.seed}}
+
+
+def main():
+    """Run the benchmark suite, print a table and save the results."""
+    if len(sys.argv) == 6 and sys.argv[1] == "--child":
+        _, _, mode, log_file, workdir, workers = sys.argv
+        print(json.dumps(run_mode(mode, log_file, workdir, int(workers))))
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark parser.py in each of its modes.")
+    parser.add_argument("--log", help="Log file to benchmark (default: generate one)")
+    parser.add_argument("--lines", type=int, default=1000000, help="Lines to generate (default: 1000000)")
+    parser.add_argument("--bursts", type=int, default=5, help="Error bursts in the generated log (default: 5)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the generated log (default: 42)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES,
+                        help="Modes to run (default: all)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for the parallel mode (default: one per CPU)")
+    parser.add_argument("--json", default="benchmark_results.json",
+                        help="Where to save the results (default: benchmark_results.json)")
+    parser.add_argument("--baseline", help="Results of an earlier run to compare with")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file).get("modes", {})
+
+    print("Parser Benchmark Suite")
+    print("======================")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        log_file, origin = prepare_log(args, workdir)
+        size = os.path.getsize(log_file)
+        lines = count_lines(log_file)
+        size_mb = size / (1024 * 1024)
+        print(f"Log: {lines} lines, {size_mb:.1f} MB\n")
+
+        if "gzip" in args.modes:
+            with open(log_file, "rb") as source, gzip.open(log_file + ".gz", "wb", compresslevel=6) as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+
+        header = f"{'Mode':<12} {'Seconds':>8} {'Lines/s':>11} {'MB/s':>8} {'Peak MB':>8}"
+        print(header + ("  vs baseline" if baseline else "") + "  Phases")
+
+        modes = {}
+        for mode in args.modes:
+            result = measure_mode(mode, log_file, workdir, args.workers)
+            if "skipped" in result:
+                print(f"{mode:<12} skipped: {result['skipped']}")
+                modes[mode] = result
+                continue
+
+            seconds = sum(result["phases"].values())
+            result.update({
+                "seconds": round(seconds, 4),
+                "lines_per_sec": round(lines / seconds),
+                "mb_per_sec": round(size_mb / seconds, 2),
+                "phases": {phase: round(elapsed, 4) for phase, elapsed in result["phases"].items()},
+            })
+            modes[mode] = result
+
+            peak = f"{result['peak_rss_mb']:.1f}" if result["peak_rss_mb"] is not None else "n/a"
+            row = f"{mode:<12} {seconds:>8.2f} {result['lines_per_sec']:>11,} {result['mb_per_sec']:>8.1f} {peak:>8}"
+            if baseline:
+                before = baseline.get(mode, {}).get("seconds")
+                row += f"  {before / seconds:>10.2f}x" if before else f"  {'-':>11}"
+            phases = ", ".join(f"{phase} {elapsed:.2f}s" for phase, elapsed in result["phases"].items())
+            print(f"{row}  {phases}")
+
+    summary = {
+        "generated": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "workers": args.workers,
+        "log": dict(origin, lines=lines, bytes=size),
+        "modes": modes,
+    }
+    with open(args.json, "w") as file:
+        json.dump(summary, file, indent=2)
+    print(f"\nResults saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
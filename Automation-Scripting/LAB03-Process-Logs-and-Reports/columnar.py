@@ -0,0 +1,292 @@
+"""
+Columnar cache of parsed log entries for the LAB03 log analyzer.
+
+Parsing the text of a log is the expensive part of every report. A log can
+instead be compiled once into a directory of flat column files, which
+NumPy memory-maps so that reports become vectorized aggregations:
+
+    logs.txt.cols/
+        meta.json        Source file, bytes compiled, row counts, level names
+        timestamps.i64   Entry time in seconds since the epoch (int64)
+        levels.u8        Index into the level names in meta.json (uint8)
+        messages.u32     Index into the string table (uint32)
+        strings.bin      Each distinct message once, UTF-8, back to back
+        strings.end      Offset in strings.bin where each message ends (int64)
+        strings.tags     Caller-defined facts about each message (uint32)
+
+All numbers are little-endian. Compiling only needs the standard library;
+reading the columns needs NumPy. The cache is append-only: when the log
+grows, only the new lines are compiled and appended. A last line without
+a newline is compiled too, but replaced on the next append, since it may
+still be being written.
+"""
+
+import calendar
+import itertools
+import json
+import mmap
+import operator
+import os
+import sys
+import time
+from array import array
+
+try:
+    import numpy
+except ImportError:  # Optional: only needed to read the cache
+    numpy = None
+
+
+CACHE_SUFFIX = ".cols"
+CACHE_VERSION = 1
+META_FILE = "meta.json"
+
+# Column name: (file name, array typecode, NumPy dtype)
+COLUMNS = {
+    "timestamps": ("timestamps.i64", "q", "<i8"),
+    "levels": ("levels.u8", "B", "u1"),
+    "messages": ("messages.u32", "I", "<u4"),
+    "string_ends": ("strings.end", "q", "<i8"),
+    "string_tags": ("strings.tags", "I", "<u4"),
+}
+STRING_COLUMNS = ("string_ends", "string_tags")
+STRINGS_FILE = "strings.bin"
+
+# "YYYY-MM-DD HH:MM" and "SS" of a "YYYY-MM-DD HH:MM:SS" timestamp
+_MINUTE = operator.itemgetter(slice(0, 16))
+_SECOND = operator.itemgetter(slice(17, 19))
+
+
+class ColumnarCache:
+    """
+    A compiled log: one row per entry, messages interned in a string table.
+    """
+
+    def __init__(self, directory, device=0, inode=0, tag_signature=""):
+        self.directory = directory
+        self.device = device
+        self.inode = inode
+        self.tag_signature = tag_signature
+        self.offset = 0          # Bytes of complete lines compiled so far
+        self.size = 0            # Bytes compiled, including a partial last line
+        self.rows = 0
+        self.strings = 0
+        self.string_bytes = 0
+        self.levels = []
+        self.committed = (0, 0, 0)   # rows, strings, string_bytes up to offset
+        self._blob = None
+
+    @classmethod
+    def open(cls, directory):
+        """
+        Open an existing cache.
+
+        Args:
+            directory (str): Path to the cache directory
+
+        Returns:
+            ColumnarCache: The cache, or None if it is missing or unreadable
+        """
+        try:
+            with open(os.path.join(directory, META_FILE)) as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != CACHE_VERSION:
+            return None
+
+        cache = cls(directory, meta["device"], meta["inode"], meta["tag_signature"])
+        cache.offset = meta["offset"]
+        cache.size = meta["size"]
+        cache.committed = tuple(meta["committed"])
+        cache.rows = meta["rows"]
+        cache.strings = meta["strings"]
+        cache.string_bytes = meta["string_bytes"]
+        cache.levels = meta["levels"]
+        return cache
+
+    @classmethod
+    def create(cls, directory, device, inode, tag_signature=""):
+        """
+        Create an empty cache, replacing any existing one.
+
+        Args:
+            directory (str): Path to the cache directory
+            device (int): Device of the log file
+            inode (int): Inode of the log file
+            tag_signature (str): Identifies how message tags are computed;
+                a cache with different tags has to be rebuilt
+
+        Returns:
+            ColumnarCache: The empty cache
+        """
+        os.makedirs(directory, exist_ok=True)
+        cache = cls(directory, device, inode, tag_signature)
+        for name in [STRINGS_FILE] + [column[0] for column in COLUMNS.values()]:
+            open(os.path.join(directory, name), "wb").close()
+        cache._save_meta()
+        return cache
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _save_meta(self):
+        meta = {
+            "version": CACHE_VERSION,
+            "device": self.device,
+            "inode": self.inode,
+            "tag_signature": self.tag_signature,
+            "offset": self.offset,
+            "size": self.size,
+            "committed": list(self.committed),
+            "rows": self.rows,
+            "strings": self.strings,
+            "string_bytes": self.string_bytes,
+            "levels": self.levels,
+        }
+        temp_file = self._path(META_FILE + ".tmp")
+        with open(temp_file, "w") as file:
+            json.dump(meta, file)
+        os.replace(temp_file, self._path(META_FILE))
+
+    def _load_string_ids(self):
+        """Map every message already in the string table to its index."""
+        ends = array("q")
+        with open(self._path(COLUMNS["string_ends"][0]), "rb") as file:
+            ends.fromfile(file, self.strings)
+        if sys.byteorder == "big":
+            ends.byteswap()
+        with open(self._path(STRINGS_FILE), "rb") as file:
+            blob = file.read(self.string_bytes)
+
+        string_ids, start = {}, 0
+        for string_id, end in enumerate(ends):
+            string_ids[blob[start:end]] = string_id
+            start = end
+        return string_ids
+
+    def extend(self, batches, offset, partial=False, tag=None):
+        """
+        Append parsed entries to the cache.
+
+        Only ``meta.json`` says how much of each column is valid, and it is
+        replaced last, so an interrupted append leaves the cache as it was.
+
+        Args:
+            batches (iterable): Lists of (timestamp, level, message) tuples of
+                bytes, in log order, as returned by a regex findall()
+            offset (int): Byte offset of the log up to which these entries go
+            partial (bool): True if the entries end with an unterminated line,
+                which the next call will replace
+            tag (callable, optional): Computes the tags of a list of new
+                messages (bytes) as ints; messages are tagged 0 without it
+        """
+        # Drop the partial last line of the previous call, and whatever an
+        # interrupted append left behind
+        self.rows, self.strings, self.string_bytes = self.committed
+        for name, (file_name, typecode, _) in COLUMNS.items():
+            count = self.strings if name in STRING_COLUMNS else self.rows
+            os.truncate(self._path(file_name), count * array(typecode).itemsize)
+        os.truncate(self._path(STRINGS_FILE), self.string_bytes)
+
+        string_ids = self._load_string_ids()
+        level_codes = {level.encode(): code for code, level in enumerate(self.levels)}
+        minute_seconds = {}
+        files = {name: open(self._path(file_name), "ab") for name, (file_name, _, _) in COLUMNS.items()}
+        files[STRINGS_FILE] = open(self._path(STRINGS_FILE), "ab")
+
+        try:
+            for batch in batches:
+                if not batch:
+                    continue
+                columns = {name: array(typecode) for name, (_, typecode, _) in COLUMNS.items()}
+                # Columns are built with map() over the whole batch, which keeps
+                # the per-entry work out of the interpreter loop
+                stamps, level_names, texts = zip(*batch)
+
+                minutes = list(map(_MINUTE, stamps))
+                for minute in set(minutes).difference(minute_seconds):
+                    minute_seconds[minute] = calendar.timegm(time.strptime(minute.decode(), "%Y-%m-%d %H:%M"))
+                columns["timestamps"].extend(map(operator.add, map(minute_seconds.__getitem__, minutes),
+                                                 map(int, map(_SECOND, stamps))))
+
+                for level in set(level_names).difference(level_codes):
+                    if len(self.levels) > 255:
+                        raise ValueError("Too many distinct log levels for the columnar cache")
+                    level_codes[level] = len(self.levels)
+                    self.levels.append(level.decode(errors="replace"))
+                columns["levels"].extend(map(level_codes.__getitem__, level_names))
+
+                new_strings = list(dict.fromkeys(text for text in texts if text not in string_ids))
+                string_ids.update(zip(new_strings, range(len(string_ids), len(string_ids) + len(new_strings))))
+                columns["messages"].extend(map(string_ids.__getitem__, texts))
+                columns["string_ends"].extend(
+                    itertools.accumulate(map(len, new_strings), initial=self.string_bytes))
+                columns["string_ends"].pop(0)
+                self.string_bytes = columns["string_ends"][-1] if new_strings else self.string_bytes
+
+                columns["string_tags"].extend(tag(new_strings) if tag else [0] * len(new_strings))
+                for name, column in columns.items():
+                    if sys.byteorder == "big":
+                        column.byteswap()
+                    column.tofile(files[name])
+                files[STRINGS_FILE].write(b"".join(new_strings))
+                self.rows += len(batch)
+        finally:
+            for file in files.values():
+                file.close()
+
+        self.strings = len(string_ids)
+        self.size = offset
+        if not partial:
+            self.offset = offset
+            self.committed = (self.rows, self.strings, self.string_bytes)
+        self._blob = None
+        self._save_meta()
+
+    def column(self, name):
+        """
+        Memory-map a column as a read-only NumPy array.
+
+        Args:
+            name (str): A key of COLUMNS
+
+        Returns:
+            numpy.ndarray: The column
+        """
+        if numpy is None:
+            raise RuntimeError("Reading the columnar cache requires NumPy (pip install numpy)")
+        file_name, _, dtype = COLUMNS[name]
+        count = self.strings if name in STRING_COLUMNS else self.rows
+        if count == 0:
+            return numpy.zeros(0, dtype=dtype)
+        return numpy.memmap(self._path(file_name), dtype=dtype, mode="r", shape=(count,))
+
+    def level_code(self, level):
+        """Return the code of a level name, or -1 if it never occurs."""
+        return self.levels.index(level) if level in self.levels else -1
+
+    def _string_blob(self):
+        if self._blob is None:
+            if self.string_bytes == 0:
+                self._blob = b""
+            else:
+                with open(self._path(STRINGS_FILE), "rb") as file:
+                    self._blob = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._blob
+
+    def message(self, string_id, string_ends=None):
+        """
+        Look up a message in the string table.
+
+        Args:
+            string_id (int): Index of the message
+            string_ends (numpy.ndarray, optional): The "string_ends" column,
+                to avoid mapping it again for every lookup
+
+        Returns:
+            str: The message
+        """
+        ends = self.column("string_ends") if string_ends is None else string_ends
+        start = int(ends[string_id - 1]) if string_id else 0
+        return self._string_blob()[start:int(ends[string_id])].decode(errors="replace")
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+LAB03 - Synthetic Log Generator
+
+Writes logs in the same format as logs.txt, of any size, for testing and
+benchmarking parser.py. The output depends only on the options and the
+seed, so the same command always produces the same file.
+
+- The level mix and the mix of error categories are configurable.
+- Bursts are error storms: for a few minutes, errors are many times more
+  likely than usual (what --trends reports as rate spikes).
+- Entries arrive at a steady rate, in chronological order.
+
+Usage:
+    python generate_logs.py -n 1000000 -o big.log
+    python generate_logs.py -n 10000000 -o huge.log --levels INFO=60,DEBUG=20,WARNING=12,ERROR=8
+    python generate_logs.py -n 500000 --categories connection=5,memory=1 --bursts 10 --burst-factor 20
+"""
+
+import argparse
+import datetime
+import os
+import random
+import time
+
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+LEVELS = ("INFO", "DEBUG", "WARNING", "ERROR")
+DEFAULT_LEVEL_MIX = "INFO=70,DEBUG=15,WARNING=10,ERROR=5"
+DEFAULT_CATEGORY_MIX = "connection=4,permission=2,deployment=1,memory=2,service=2,other=1"
+
+# Lines generated (and written) at a time
+BLOCK_LINES = 50000
+
+USERS = ["john.doe", "jane.smith", "admin", "svc-backup", "m.garcia", "l.chen", "a.kumar", "ops"]
+SERVICES = ["Authentication", "Payment", "Search", "Notification", "Inventory", "Billing"]
+HOSTS = ["web-01", "web-02", "db-01", "cache-01", "worker-03", "api-02"]
+
+# Message templates take a random 32-bit integer and return a message
+MESSAGES = {
+    "INFO": [
+        lambda r: f"User {USERS[r % len(USERS)]} logged in from 192.168.{r >> 8 & 255}.{r >> 16 & 255}",
+        lambda r: f"Batch job #{r % 100000} completed, processed {r >> 17 & 4095} records",
+        lambda r: f"Request completed in {r % 900 + 12}ms for /api/v1/items/{r >> 10 & 65535}",
+        lambda r: f"Cache cleanup removed {r % 500}MB of stale data",
+        lambda r: f"Backup completed and verified (size: {r % 9 + 1}.{r >> 4 & 7}GB)",
+        lambda r: f"{SERVICES[r % len(SERVICES)]} service health check passed",
+        lambda r: f"Deploying application update v2.{r % 10}.{r >> 4 & 15}",
+        lambda r: f"Rollback to v2.{r % 10}.{r >> 4 & 15} initiated",
+    ],
+    "DEBUG": [
+        lambda r: f"Processing batch job #{r % 100000}",
+        lambda r: f"Connection pool initialized with {r % 50 + 1} connections",
+        lambda r: f"Cache lookup for key item:{r >> 4 & 65535} took {r % 40}us",
+        lambda r: f"System monitoring heartbeat check on {HOSTS[r % len(HOSTS)]}",
+        lambda r: "Background task scheduler checking for pending jobs",
+    ],
+    "WARNING": [
+        lambda r: f"High memory usage detected ({r % 15 + 80}%)",
+        lambda r: f"Disk space on /var/log below {r % 20 + 5}%",
+        lambda r: f"{SERVICES[r % len(SERVICES)]} service response time exceeded threshold ({r % 5 + 1}.{r >> 3 & 7}s)",
+        lambda r: f"API rate limit approaching ({r % 15 + 80}% of quota used)",
+        lambda r: f"Failed login attempt for user {USERS[r % len(USERS)]} from 203.0.113.{r >> 8 & 255}",
+        lambda r: f"Slow query on orders table ({r % 3000 + 500}ms)",
+    ],
+}
+
+# Error templates by category (see ERROR_CATEGORIES in parser.py)
+ERROR_MESSAGES = {
+    "connection": [
+        lambda r: "Failed to connect to database - Connection timeout",
+        lambda r: f"Upstream host {HOSTS[r % len(HOSTS)]} unreachable after {r >> 4 & 7} retries",
+    ],
+    "permission": [
+        lambda r: f"Permission denied when accessing /etc/restricted/config-{r % 100}.json",
+        lambda r: f"Access denied for user {USERS[r % len(USERS)]} on /admin",
+    ],
+    "deployment": [
+        lambda r: f"Deployment failed - Missing dependency: libcrypto.so.1.{r % 3}",
+        lambda r: f"Package installation aborted on {HOSTS[r % len(HOSTS)]}",
+    ],
+    "memory": [
+        lambda r: f"Out of memory error in worker process #{r % 32}",
+        lambda r: f"Buffer allocation of {r % 512 + 1}MB failed",
+    ],
+    "service": [
+        lambda r: f"Service unavailable - {SERVICES[r % len(SERVICES)]} service not responding",
+    ],
+    "other": [
+        lambda r: f"Unhandled exception in request handler {r % 1000}",
+        lambda r: f"Checksum mismatch for artifact build-{r % 100000}.tar.gz",
+    ],
+}
+
+
+def parse_mix(text, names):
+    """
+    Parse a weight list such as "INFO=70,ERROR=5".
+
+    Args:
+        text (str): Comma-separated name=weight pairs
+        names (iterable): Allowed names (matched case-insensitively)
+
+    Returns:
+        dict: Weight for each name given
+    """
+    allowed = {name.lower(): name for name in names}
+    weights = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        key = allowed.get(name.strip().lower())
+        if key is None:
+            raise argparse.ArgumentTypeError(f"unknown name '{name}' (choose from {', '.join(names)})")
+        weights[key] = float(weight or 1)
+    if not any(weights.values()):
+        raise argparse.ArgumentTypeError("at least one weight must be positive")
+    return weights
+
+
+def plan_bursts(rng, lines, count, length):
+    """
+    Choose where the error bursts go.
+
+    Returns:
+        list: Sorted (first line, end line) ranges, merged where they overlap
+    """
+    ranges = sorted((start, start + length) for start in (rng.randrange(lines) for _ in range(count)))
+    merged = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def generate_levels(rng, count, first_line, bursts, weights, burst_weights):
+    """Return the levels of the next count lines, using burst weights inside bursts."""
+    levels, line, end = [], first_line, first_line + count
+    for burst_start, burst_end in bursts:
+        if burst_end <= line or burst_start >= end:
+            continue
+        if burst_start > line:
+            levels += rng.choices(LEVELS, weights, k=burst_start - line)
+            line = burst_start
+        stop = min(burst_end, end)
+        levels += rng.choices(LEVELS, burst_weights, k=stop - line)
+        line = stop
+    levels += rng.choices(LEVELS, weights, k=end - line)
+    return levels
+
+
+def generate_log(output_file, lines, levels=DEFAULT_LEVEL_MIX, categories=DEFAULT_CATEGORY_MIX,
+                 bursts=0, burst_minutes=5, burst_factor=10.0, rate=600,
+                 start="2023-05-15 00:00:00", seed=42):
+    """
+    Write a synthetic log file.
+
+    Args:
+        output_file (str): Path of the log to write
+        lines (int): Number of log entries
+        levels (str): Level mix, e.g. "INFO=70,DEBUG=15,WARNING=10,ERROR=5"
+        categories (str): Error category mix, e.g. "connection=4,memory=1"
+        bursts (int): Number of error bursts
+        burst_minutes (int): Length of each burst in minutes
+        burst_factor (float): How much more likely errors are during a burst
+        rate (int): Entries per minute
+        start (str): Timestamp of the first entry
+        seed (int): Random seed
+
+    Returns:
+        int: Size of the written file in bytes
+    """
+    rng = random.Random(seed)
+    level_mix = parse_mix(levels, LEVELS)
+    weights = [level_mix.get(level, 0) for level in LEVELS]
+    burst_weights = list(weights)
+    burst_weights[LEVELS.index("ERROR")] = max(weights[LEVELS.index("ERROR")], 1) * burst_factor
+
+    category_mix = parse_mix(categories, ERROR_MESSAGES)
+    error_templates, error_weights = [], []
+    for category, weight in category_mix.items():
+        for template in ERROR_MESSAGES[category]:
+            error_templates.append(template)
+            error_weights.append(weight / len(ERROR_MESSAGES[category]))
+    templates = dict(MESSAGES)
+
+    burst_ranges = plan_bursts(rng, lines, bursts, burst_minutes * rate)
+    first_second = datetime.datetime.strptime(start, TIMESTAMP_FORMAT)
+    stamps = {}
+
+    with open(output_file, "w", encoding="utf-8", newline="\n") as log:
+        for first_line in range(0, lines, BLOCK_LINES):
+            count = min(BLOCK_LINES, lines - first_line)
+            block_levels = generate_levels(rng, count, first_line, burst_ranges, weights, burst_weights)
+            numbers = [rng.getrandbits(32) for _ in range(count)]
+
+            picks = {level: iter(rng.choices(templates[level], k=block_levels.count(level)))
+                     for level in ("INFO", "DEBUG", "WARNING")}
+            picks["ERROR"] = iter(rng.choices(error_templates, error_weights, k=block_levels.count("ERROR")))
+
+            output = []
+            for offset, (level, number) in enumerate(zip(block_levels, numbers)):
+                second = (first_line + offset) * 60 // rate
+                stamp = stamps.get(second)
+                if stamp is None:
+                    if len(stamps) > 4096:
+                        stamps.clear()
+                    stamp = (first_second + datetime.timedelta(seconds=second)).strftime(TIMESTAMP_FORMAT)
+                    stamps[second] = stamp
+                output.append(f"[{stamp}] {level}: {next(picks[level])(number)}\n")
+            log.write("".join(output))
+
+    return os.path.getsize(output_file)
+
+
+def main():
+    """Parse the command line and write the log."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic log in the logs.txt format.")
+    parser.add_argument("-n", "--lines", type=int, default=1000000, help="Number of entries (default: 1000000)")
+    parser.add_argument("-o", "--output", default="synthetic.log", help="Log file to write (default: synthetic.log)")
+    parser.add_argument("--levels", default=DEFAULT_LEVEL_MIX,
+                        help=f"Level weights (default: {DEFAULT_LEVEL_MIX})")
+    parser.add_argument("--categories", default=DEFAULT_CATEGORY_MIX,
+                        help=f"Error category weights (default: {DEFAULT_CATEGORY_MIX})")
+    parser.add_argument("--bursts", type=int, default=0, help="Number of error bursts (default: 0)")
+    parser.add_argument("--burst-minutes", type=int, default=5, help="Length of each burst (default: 5)")
+    parser.add_argument("--burst-factor", type=float, default=10.0,
+                        help="How many times more likely errors are in a burst (default: 10)")
+    parser.add_argument("--rate", type=int, default=600, help="Entries per minute (default: 600)")
+    parser.add_argument("--start", default="2023-05-15 00:00:00",
+                        help="Timestamp of the first entry (default: 2023-05-15 00:00:00)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        size = generate_log(args.output, args.lines, args.levels, args.categories, args.bursts,
+                            args.burst_minutes, args.burst_factor, args.rate, args.start, args.seed)
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {args.lines} entries ({size / (1024 * 1024):.1f} MB) to {args.output} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,50 +5,1734 @@ LAB03 - Process Logs and Generate Reports
 This script analyzes log files, extracts meaningful information,
 and generates summary reports based on the findings.
 
+The log file is streamed through a memory-mapped buffer in newline-aligned
+chunks and analyzed in a single pass, so memory use stays constant no
+matter how large the log is.
+
 Usage:
     python parser.py
+    python parser.py /var/log/app.log --output app-report.txt
+    python parser.py /var/log/app.log --index
+    python parser.py /var/log/app.log --since 09:00 --until 09:15
+    python parser.py /var/log/app.log --rotated
+    python parser.py "/var/log/app.log*"
+    python parser.py /var/log/app.log --incremental
+    python parser.py /var/log/app.log --follow --interval 300
+    python parser.py /var/log/app.log --trends
+    python parser.py /var/log/app.log --cache
 """
 
-# TODO: Define a function to read the log file
-# The function should:
-# - Open the log file
-# - Read all lines
-# - Return the content as a list of lines
+import argparse
+import bisect
+import calendar
+import datetime
+import glob
+import gzip
+import json
+import mmap
+import os
+import queue
+import re
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
+from columnar import CACHE_SUFFIX, ColumnarCache
+from sketches import LogSketches
+from trends import ERROR, RECOVERY_TERMS, TOTAL, WARNING, TrendDetector
 
-# TODO: Define a function to analyze the logs
-# The function should:
-# - Count occurrences of different log levels (ERROR, WARNING, INFO, DEBUG)
-# - Identify the time range of the logs (first and last timestamp)
-# - Optionally: Extract specific types of events (e.g., failed logins, service errors)
+try:
+    import zstandard
+except ImportError:  # Optional: only needed for .zst log segments
+    zstandard = None
 
+try:
+    import numpy
+except ImportError:  # Optional: only needed for reports from the columnar cache
+    numpy = None
 
-# TODO: Define a function to generate a report
-# The function should:
-# - Create a new file called "report.txt"
-# - Write a summary of the findings
-# - Include counts, percentages, and notable events
 
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
 
-# TODO: BONUS - Add more advanced analysis
-# Some ideas:
-# - Group errors by type or service
-# - Detect patterns or trends (e.g., increasing error rates)
-# - Calculate time between related events
-# - Identify peak activity periods
+# Bytes handed to the analyzer at a time; this bounds memory use
+CHUNK_SIZE = 8 * 1024 * 1024
 
+# Compressed log segments are decompressed on a background thread
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+PREFETCH_DEPTH = 4
+
+# Rotated segments: logs.txt.1, logs.txt.2.gz, logs.txt.3.zst, ...
+_ROTATION_SUFFIX = r"(?:\.\d+)?(?:\.gz|\.zst)?"
+
+# Files the analyzer writes next to a log, never part of a rotation set
+_SIDE_FILES = (".idx", ".tmp")
+
+# Where incremental runs remember how far each log has been analyzed
+CHECKPOINT_FILE = "parser_checkpoint.json"
+CHECKPOINT_VERSION = 1
+
+# Sidecar index of minute buckets: header, then minutes, offsets and counts
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"LOGIDX01"
+INDEX_LEVELS = ("ERROR", "WARNING", "INFO", "DEBUG")
+MINUTE_FORMAT = "%Y-%m-%d %H:%M"
+_INDEX_HEADER = struct.Struct("<8sQQQQ")
+_INDEX_SLOTS = len(INDEX_LEVELS) + 1
+_EMPTY_SLOTS = array("q", [0] * _INDEX_SLOTS)
+
+# Upper bound on the notable events kept in memory (and listed in the report)
+MAX_NOTABLE_EVENTS = 100
+
+# [YYYY-MM-DD HH:MM:SS] LEVEL: Message
+_ENTRY = re.compile(rb"\[(.{19})\] (\w+): ([^\r\n]*)")
+
+# The same, for every line of a chunk that is a log entry
+_ENTRY_LINE = re.compile(rb"^\[(.{19})\] (\w+): ([^\r\n]*)", re.MULTILINE)
+
+# The level of every entry in a chunk that has been prefixed with a newline
+_LEVEL_TOKEN = re.compile(rb"\n\[.{19}\] (\w+): ")
+
+# The minute and level of every entry in a chunk prefixed with a newline
+_MINUTE_TOKEN = re.compile(rb"\n\[(\d{4}-\d\d-\d\d \d\d:\d\d):\d\d\] (\w+): ")
+
+# A run of consecutive entries from the same minute
+_MINUTE_RUN = re.compile(rb"\n\[(\d{4}-\d\d-\d\d \d\d:\d\d):\d\d\] [^\n]*(?:\n\[\1:\d\d\] [^\n]*)*")
+
+# Entries at these levels always need a closer look
+_ERROR_OR_WARNING = re.compile(rb"\] (?:ERROR|WARNING): ")
+
+# Lower-cased terms that can make an entry at any level notable
+_NOTABLE_TERMS = (b"deploy", b"rollback", b"service")
+
+# Lower-cased terms that make a WARNING entry notable
+NOTABLE_WARNING_TERMS = ["failed", "unusual", "high", "limit"]
+
+# Error categories in priority order: a message belongs to the first
+# category that has one of its keywords in the (lower-cased) message
+ERROR_CATEGORIES = [
+    ("Connection/timeout issues", ["connect", "timeout", "unreachable"]),
+    ("Permission problems", ["permission", "access", "denied"]),
+    ("Deployment failures", ["deploy", "installation"]),
+    ("Out of memory errors", ["memory", "allocation", "overflow"]),
+    ("Service availability issues", ["service", "unavailable", "responding"]),
+]
+DEFAULT_ERROR_CATEGORY = "Other errors"
+
+
+def iter_log_chunks(file_path, start=0, end=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield newline-aligned chunks of a memory-mapped log file.
+
+    Every chunk ends on a line boundary, so no log entry is ever split
+    between two chunks. Only one chunk is held in memory at a time.
+
+    Args:
+        file_path (str): Path to the log file
+        start (int): Byte offset to start reading from
+        end (int, optional): Byte offset to stop at (defaults to end of file)
+        chunk_size (int): Approximate number of bytes per chunk
+
+    Yields:
+        bytes: A block of complete log lines
+    """
+    with open(file_path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            end = size if end is None else min(end, size)
+            position = start
+            while position < end:
+                stop = min(position + chunk_size, end)
+                if stop < end:
+                    newline = buffer.rfind(b"\n", position, stop)
+                    if newline < 0:
+                        newline = buffer.find(b"\n", stop, end)
+                    stop = end if newline < 0 else newline + 1
+                yield buffer[position:stop]
+                position = stop
+
+
+def split_log_line(line):
+    """
+    Split a raw log line into its timestamp, level and message.
+
+    Args:
+        line (bytes): A single raw log line
+
+    Returns:
+        tuple: (timestamp, level, message) as bytes, or None if malformed
+    """
+    match = _ENTRY.match(line)
+    return match.groups() if match else None
+
+
+def _trie_pattern(words):
+    """
+    Build a regex that matches any of the words, shaped like a prefix trie.
+
+    Words sharing a prefix share a branch (e.g. "connect" and "conflict"
+    become "con(?:flict|nect)"), so the regex engine only explores branches
+    that agree with the text, instead of trying every word in turn. Where one
+    word is a prefix of another, the longer one is tried first.
+
+    Args:
+        words (iterable): Literal words to match
+
+    Returns:
+        str: The regex pattern
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class ErrorClassifier:
+    """
+    Classify error messages into categories with a single scan per message.
+
+    All category keywords are compiled into one trie-shaped regex wrapped in
+    a lookahead, so every keyword occurrence in the message is found in one
+    pass no matter how many categories there are. As with a chain of
+    if/elif checks, the earliest category with a keyword in the message wins.
+    """
+
+    def __init__(self, categories=ERROR_CATEGORIES, default=DEFAULT_ERROR_CATEGORY):
+        """
+        Args:
+            categories (list): (name, keywords) pairs in priority order
+            default (str): Category for messages that match no keyword
+        """
+        self.names = [name for name, _ in categories]
+        self.default = default
+
+        # Priority of each keyword, taking into account the keywords it starts
+        # with: the regex reports only the longest keyword at each position
+        priority = {}
+        for index, (_, keywords) in enumerate(categories):
+            for keyword in keywords:
+                priority.setdefault(keyword.lower(), index)
+        self._priority = {
+            keyword: min(rank for other, rank in priority.items() if keyword.startswith(other))
+            for keyword in priority
+        }
+        self._regex = re.compile(f"(?=({_trie_pattern(priority)}))") if priority else None
+
+    def classify(self, message):
+        """
+        Return the category of an error message.
+
+        Args:
+            message (str): Error message
+
+        Returns:
+            str: Error category
+        """
+        if self._regex is None:
+            return self.default
+
+        best = None
+        for match in self._regex.finditer(message.lower()):
+            rank = self._priority[match.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return self.default if best is None else self.names[best]
+
+
+_error_classifier = ErrorClassifier()
+
+
+def categorize_error(message):
+    """
+    Categorize error messages into types.
+
+    Args:
+        message (str): Error message
+
+    Returns:
+        str: Error category
+    """
+    return _error_classifier.classify(message)
+
+
+def is_notable_event(entry):
+    """
+    Determine if a log entry represents a notable event.
+
+    Args:
+        entry (dict): Parsed log entry
+
+    Returns:
+        bool: True if the entry is a notable event
+    """
+    level = entry["level"]
+    message = entry["message"].lower()
+
+    # Consider errors as notable
+    if level == "ERROR":
+        return True
+
+    # Consider certain warnings as notable
+    if level == "WARNING" and any(term in message for term in NOTABLE_WARNING_TERMS):
+        return True
+
+    # Consider specific service events as notable
+    if "service" in message and any(term in message for term in ["restart", "down", "unavailable"]):
+        return True
+
+    # Consider deployment or rollback events as notable
+    if any(term in message for term in ["deploy", "rollback"]):
+        return True
+
+    return False
+
+
+class LogAnalysis:
+    """
+    Running aggregates for a stream of log entries.
+
+    Everything kept here is bounded: counters are keyed by log level and
+    error category, the time range is a single pair of timestamps, and at
+    most ``max_events`` notable events are retained. In sketch mode,
+    fixed-size sketches also track the top messages and services and the
+    number of distinct users, IP addresses and services. In trend mode, a
+    TrendDetector looks for rate spikes, gaps and outages.
+    """
+
+    def __init__(self, max_events=MAX_NOTABLE_EVENTS, sketches=False, trends=False):
+        self.max_events = max_events
+        self.sketches = LogSketches() if sketches else None
+        self.trends = TrendDetector(max_findings=max_events) if trends else None
+        self.total_entries = 0
+        self.level_counts = Counter()
+        self.error_type_counts = Counter()
+        self.start_time = None
+        self.end_time = None
+        self.notable_events = []
+        self.notable_total = 0
+
+    def add_entry(self, timestamp, level, message):
+        """
+        Record the error type and notable event for a single entry.
+
+        Level counts and the time range are accumulated per chunk by
+        analyze_chunk(), so they are not touched here.
+
+        Args:
+            timestamp (str): Timestamp in TIMESTAMP_FORMAT
+            level (str): Log level
+            message (str): Log message
+        """
+        if level == "ERROR":
+            self.error_type_counts[categorize_error(message)] += 1
+
+        if self.sketches is not None and level in ("ERROR", "WARNING"):
+            self.sketches.add_message(message)
+
+        if self.trends is not None:
+            self.trends.add_event(timestamp, level, message)
+
+        if is_notable_event({"level": level, "message": message}):
+            self.notable_total += 1
+            if len(self.notable_events) < self.max_events:
+                self.notable_events.append((timestamp, level, message))
+
+    def update_time_range(self, start, end):
+        """
+        Widen the tracked time range to include [start, end].
+
+        Args:
+            start (str): Earliest timestamp seen
+            end (str): Latest timestamp seen
+        """
+        # Timestamps are fixed-width, so string order is chronological order
+        if self.start_time is None or start < self.start_time:
+            self.start_time = start
+        if self.end_time is None or end > self.end_time:
+            self.end_time = end
+
+    def merge(self, other):
+        """
+        Fold the aggregates of a later part of the log into this one.
+
+        Merging the shards of a file in order gives exactly the same
+        aggregates as analyzing the whole file serially.
+
+        Args:
+            other (LogAnalysis): Aggregates for the data following this one
+
+        Returns:
+            LogAnalysis: self, to allow chaining
+        """
+        self.total_entries += other.total_entries
+        self.level_counts.update(other.level_counts)
+        self.error_type_counts.update(other.error_type_counts)
+        if other.start_time is not None:
+            self.update_time_range(other.start_time, other.end_time)
+
+        self.notable_total += other.notable_total
+        room = self.max_events - len(self.notable_events)
+        if room > 0:
+            self.notable_events.extend(other.notable_events[:room])
+
+        if other.sketches is not None:
+            if self.sketches is None:
+                self.sketches = LogSketches()
+            self.sketches.merge(other.sketches)
+
+        if other.trends is not None:
+            if self.trends is None:
+                self.trends = TrendDetector(max_findings=self.max_events)
+            self.trends.merge(other.trends)
+        return self
+
+    def to_dict(self):
+        """
+        Serialize the aggregates to JSON-compatible data.
+
+        Returns:
+            dict: The aggregates, restorable with from_dict()
+        """
+        return {
+            "max_events": self.max_events,
+            "total_entries": self.total_entries,
+            "level_counts": dict(self.level_counts),
+            "error_type_counts": dict(self.error_type_counts),
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "notable_events": [list(event) for event in self.notable_events],
+            "notable_total": self.notable_total,
+            "sketches": self.sketches.to_dict() if self.sketches is not None else None,
+            "trends": self.trends.to_dict() if self.trends is not None else None
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Restore aggregates saved with to_dict().
+
+        Args:
+            data (dict): Serialized aggregates
+
+        Returns:
+            LogAnalysis: The restored aggregates
+        """
+        analysis = cls(data["max_events"])
+        analysis.total_entries = data["total_entries"]
+        analysis.level_counts.update(data["level_counts"])
+        analysis.error_type_counts.update(data["error_type_counts"])
+        analysis.start_time = data["start_time"]
+        analysis.end_time = data["end_time"]
+        analysis.notable_events = [tuple(event) for event in data["notable_events"]]
+        analysis.notable_total = data["notable_total"]
+        if data.get("sketches"):
+            analysis.sketches = LogSketches.from_dict(data["sketches"])
+        if data.get("trends"):
+            analysis.trends = TrendDetector.from_dict(data["trends"])
+        return analysis
+
+    def to_results(self):
+        """
+        Convert the aggregates into the results dictionary used for reporting.
+
+        Returns:
+            dict: Analysis results including counts, time range, and events
+        """
+        def to_datetime(timestamp):
+            return datetime.datetime.strptime(timestamp, TIMESTAMP_FORMAT) if timestamp else None
+
+        return {
+            "total_entries": self.total_entries,
+            "level_counts": dict(self.level_counts),
+            "start_time": to_datetime(self.start_time),
+            "end_time": to_datetime(self.end_time),
+            "error_type_counts": Counter(self.error_type_counts),
+            "notable_events": [
+                {"timestamp": to_datetime(timestamp), "level": level, "message": message}
+                for timestamp, level, message in self.notable_events
+            ],
+            "notable_total": self.notable_total,
+            "sketches": self.sketches,
+            "trends": self.trends
+        }
+
+
+def _line_start(chunk, position):
+    """Return the offset of the start of the line containing position."""
+    return chunk.rfind(b"\n", 0, position) + 1
+
+
+def _last_timestamp(chunk):
+    """Return the timestamp of the last well-formed entry in a chunk."""
+    end = len(chunk)
+    while end > 0:
+        start = _line_start(chunk, end - 1)
+        match = _ENTRY.match(chunk, start, end)
+        if match:
+            return match.group(1)
+        end = start
+    return None
+
+
+def analyze_chunk(chunk, analysis):
+    """
+    Analyze a block of complete log lines.
+
+    Level counts are taken with a single regex scan of the whole chunk, and
+    the time range from its first and last entries (log files are written
+    in chronological order). Only lines that can affect error types or
+    notable events - ERROR and WARNING entries, and entries mentioning a
+    notable term - are parsed individually. In trend mode, entries are
+    also counted per minute, and recovery messages are parsed too.
+
+    Args:
+        chunk (bytes): Newline-aligned block of log lines
+        analysis (LogAnalysis): Aggregates to update in place
+    """
+    # The leading newline lets the first line match like all the others
+    block = b"\n" + chunk
+    levels = _LEVEL_TOKEN.findall(block)
+    if not levels:
+        return
+
+    analysis.total_entries += len(levels)
+    if analysis.sketches is not None:
+        analysis.sketches.add_chunk(chunk)
+    for level in set(levels):
+        analysis.level_counts[level.decode()] += levels.count(level)
+
+    first = _LEVEL_TOKEN.search(block).start()
+    analysis.update_time_range(block[first + 2:first + 21].decode(), _last_timestamp(chunk).decode())
+
+    if analysis.trends is not None:
+        add_minute_counts(block, analysis.trends)
+
+    starts = {_line_start(chunk, match.start()) for match in _ERROR_OR_WARNING.finditer(chunk)}
+    lowered = chunk.lower()
+    terms = _NOTABLE_TERMS + RECOVERY_TERMS if analysis.trends is not None else _NOTABLE_TERMS
+    for term in terms:
+        position = lowered.find(term)
+        while position >= 0:
+            starts.add(_line_start(chunk, position))
+            position = lowered.find(term, position + len(term))
+
+    for start in sorted(starts):
+        match = _ENTRY.match(chunk, start)
+        if match:
+            timestamp, level, message = (part.decode(errors="replace") for part in match.groups())
+            analysis.add_entry(timestamp, level, message)
+
+
+def add_minute_counts(block, trends):
+    """
+    Feed the per-minute entry counts of a block of lines to a TrendDetector.
+
+    Each regex match covers a whole run of consecutive entries from the same
+    minute, whose levels are then counted with bytes.count().
+
+    Args:
+        block (bytes): Newline-aligned lines, prefixed with a newline
+        trends (TrendDetector): Detector to update
+    """
+    minutes = {}
+    for run in _MINUTE_RUN.finditer(block):
+        start, end = run.span()
+        counts = minutes.setdefault(run.group(1), [0, 0, 0])
+        counts[ERROR] += block.count(b"] ERROR: ", start, end)
+        counts[WARNING] += block.count(b"] WARNING: ", start, end)
+        counts[TOTAL] += block.count(b"\n[", start, end)
+    for minute in sorted(minutes):
+        trends.add_minute(_minute_number(minute.decode()), minutes[minute])
+
+
+def split_log_file(file_path, shards, start=0, end=None):
+    """
+    Split a log file into newline-aligned byte ranges of roughly equal size.
+
+    Args:
+        file_path (str): Path to the log file
+        shards (int): Number of ranges to produce (fewer for small files)
+        start (int): Byte offset where the first range begins
+        end (int, optional): Byte offset where the last range ends
+
+    Returns:
+        list: (start, end) byte offsets, in file order
+    """
+    with open(file_path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        end = size if end is None else min(end, size)
+        if start >= end:
+            return []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            bounds = [start]
+            for shard in range(1, shards):
+                target = start + (end - start) * shard // shards
+                newline = buffer.find(b"\n", max(target, bounds[-1]), end)
+                if newline < 0 or newline + 1 >= end:
+                    break
+                if newline + 1 > bounds[-1]:
+                    bounds.append(newline + 1)
+            bounds.append(end)
+
+    return list(zip(bounds, bounds[1:]))
+
+
+def analyze_range(file_path, start=0, end=None, **options):
+    """
+    Analyze one byte range of a log file in the current process.
+
+    Args:
+        file_path (str): Path to the log file
+        start (int): Byte offset of the first line in the range
+        end (int, optional): Byte offset just past the last line
+        **options: LogAnalysis settings (max_events, sketches, trends)
+
+    Returns:
+        LogAnalysis: Aggregates for the range
+    """
+    analysis = LogAnalysis(**options)
+    for chunk in iter_log_chunks(file_path, start, end):
+        analyze_chunk(chunk, analysis)
+    return analysis
+
+
+def _analyze_shard(shard):
+    """Process pool entry point: analyze_range() with packed arguments."""
+    file_path, start, end, options = shard
+    return analyze_range(file_path, start, end, **options)
+
+
+def analyze_log(file_path, start=0, end=None, workers=1, **options):
+    """
+    Analyze a byte range of a log file, optionally across several processes.
+
+    With more than one worker, the range is split into newline-aligned
+    shards that are analyzed in a process pool; the partial results are
+    merged in file order, so the outcome is identical to a serial run.
+
+    Args:
+        file_path (str): Path to the log file
+        start (int): Byte offset of the first line to analyze
+        end (int, optional): Byte offset just past the last line
+        workers (int): Number of worker processes (1 analyzes serially)
+        **options: LogAnalysis settings (max_events, sketches, trends)
+
+    Returns:
+        LogAnalysis: Aggregates for the range
+    """
+    if workers <= 1:
+        return analyze_range(file_path, start, end, **options)
+
+    shards = [(file_path, shard_start, shard_end, options)
+              for shard_start, shard_end in split_log_file(file_path, workers, start, end)]
+    analysis = LogAnalysis(**options)
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards) or 1)) as pool:
+        for partial in pool.map(_analyze_shard, shards):
+            analysis.merge(partial)
+    return analysis
+
+
+def analyze_file(file_path, workers=1, **options):
+    """
+    Stream a whole log file through the analyzer.
+
+    Args:
+        file_path (str): Path to the log file
+        workers (int): Number of worker processes (1 analyzes serially)
+        **options: LogAnalysis settings (max_events, sketches, trends)
+
+    Returns:
+        dict: Analysis results, or None if the file could not be read
+    """
+    try:
+        analysis = analyze_log(file_path, workers=workers, **options)
+    except FileNotFoundError:
+        print(f"Error: Log file '{file_path}' not found.")
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Error reading log file: {e}")
+        return None
+
+    return analysis.to_results()
+
+
+def is_compressed(file_path):
+    """Return True if the log segment is gzip or zstd compressed."""
+    return file_path.endswith(COMPRESSED_SUFFIXES)
+
+
+def open_log_segment(file_path):
+    """
+    Open a plain, gzip or zstd log segment for streaming binary reads.
+
+    Args:
+        file_path (str): Path to the segment
+
+    Returns:
+        file object: A readable binary stream of the decompressed log
+    """
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, "rb")
+    if file_path.endswith(".zst"):
+        if zstandard is None:
+            raise OSError(f"Reading {file_path} requires the zstandard package (pip install zstandard)")
+        return zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), closefd=True)
+    return open(file_path, "rb")
+
+
+def iter_stream_chunks(stream, chunk_size=CHUNK_SIZE):
+    """
+    Yield newline-aligned chunks from a binary stream.
+
+    Args:
+        stream (file object): Readable binary stream
+        chunk_size (int): Number of bytes to read at a time
+
+    Yields:
+        bytes: A block of complete log lines
+    """
+    remainder = b""
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        if remainder:
+            data = remainder + data
+        newline = data.rfind(b"\n")
+        if newline < 0:
+            remainder = data
+            continue
+        remainder = data[newline + 1:]
+        yield data[:newline + 1]
+    if remainder:
+        yield remainder
+
+
+def iter_segment_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Yield newline-aligned chunks of a plain or compressed log segment.
+
+    Args:
+        file_path (str): Path to the segment
+        chunk_size (int): Approximate number of bytes per chunk
+
+    Yields:
+        bytes: A block of complete log lines
+    """
+    if not is_compressed(file_path):
+        yield from iter_log_chunks(file_path, chunk_size=chunk_size)
+        return
+    with open_log_segment(file_path) as stream:
+        yield from iter_stream_chunks(stream, chunk_size)
+
+
+def prefetch(chunks, depth=PREFETCH_DEPTH):
+    """
+    Produce chunks on a background thread while the caller consumes them.
+
+    Decompression (zlib and zstd release the GIL) and disk reads then
+    overlap with parsing. At most ``depth`` chunks wait in the queue, so
+    memory stays bounded.
+
+    Args:
+        chunks (iterable): The chunks to produce
+        depth (int): Maximum number of chunks buffered ahead
+
+    Yields:
+        bytes: The chunks, in order
+    """
+    buffer = queue.Queue(maxsize=depth)
+    done = object()
+
+    def produce():
+        try:
+            for chunk in chunks:
+                buffer.put(chunk)
+        except Exception as e:
+            buffer.put(e)
+        buffer.put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = buffer.get()
+        if item is done:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+def _first_timestamp(file_path):
+    """Return the first timestamp in a log segment ("" if there is none)."""
+    with open_log_segment(file_path) as stream:
+        match = _ENTRY.search(stream.read(64 * 1024))
+    return match.group(1).decode() if match else ""
+
+
+def find_log_segments(pattern, rotated=False):
+    """
+    Resolve the log files to analyze, oldest first.
+
+    Args:
+        pattern (str): A log file path or a glob pattern (e.g. "logs.txt*")
+        rotated (bool): Also include rotated segments of the log file,
+            such as logs.txt.1 and logs.txt.2.gz
+
+    Returns:
+        list: Segment paths sorted by their first timestamp
+    """
+    if glob.has_magic(pattern):
+        paths = glob.glob(pattern)
+    else:
+        paths = [pattern]
+        if rotated:
+            directory = os.path.dirname(pattern)
+            rotation = re.compile(re.escape(os.path.basename(pattern)) + _ROTATION_SUFFIX)
+            paths += [os.path.join(directory, name) for name in os.listdir(directory or ".")
+                      if rotation.fullmatch(name)]
+
+    segments = {os.path.normpath(path) for path in paths
+                if os.path.isfile(path) and not path.endswith(_SIDE_FILES)}
+    return sorted(segments, key=lambda path: (_first_timestamp(path), path))
+
+
+def analyze_segment(file_path, options):
+    """
+    Analyze one plain or compressed log segment, prefetching its chunks.
+
+    Args:
+        file_path (str): Path to the segment
+        options (dict): LogAnalysis settings (max_events, sketches, trends)
+
+    Returns:
+        LogAnalysis: Aggregates for the segment
+    """
+    analysis = LogAnalysis(**options)
+    for chunk in prefetch(iter_segment_chunks(file_path)):
+        analyze_chunk(chunk, analysis)
+    return analysis
+
+
+def analyze_segments(file_paths, workers=1, **options):
+    """
+    Analyze a set of log segments as one continuous log.
+
+    Segments are merged in the given (chronological) order. With more than
+    one worker, segments are analyzed in parallel, one per process.
+
+    Args:
+        file_paths (list): Segment paths, oldest first
+        workers (int): Number of worker processes
+        **options: LogAnalysis settings (max_events, sketches, trends)
+
+    Returns:
+        dict: Analysis results, or None if a segment could not be read
+    """
+    analysis = LogAnalysis(**options)
+    try:
+        if workers <= 1 or len(file_paths) == 1:
+            partials = (analyze_segment(path, options) for path in file_paths)
+            for partial in partials:
+                analysis.merge(partial)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(file_paths))) as pool:
+                for partial in pool.map(analyze_segment, file_paths, [options] * len(file_paths)):
+                    analysis.merge(partial)
+    except (OSError, EOFError, ValueError) as e:
+        print(f"Error reading log segments: {e}")
+        return None
+
+    return analysis.to_results()
+
+
+def load_checkpoint(checkpoint_file):
+    """
+    Load the incremental-analysis checkpoint.
+
+    Args:
+        checkpoint_file (str): Path to the checkpoint JSON file
+
+    Returns:
+        dict: Checkpoint data keyed by absolute log path (empty if missing)
+    """
+    try:
+        with open(checkpoint_file, "r") as file:
+            return json.load(file).get("files", {})
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable checkpoint '{checkpoint_file}': {e}")
+        return {}
+
+
+def save_checkpoint(checkpoint_file, files):
+    """
+    Atomically write the incremental-analysis checkpoint.
+
+    Args:
+        checkpoint_file (str): Path to the checkpoint JSON file
+        files (dict): Checkpoint data keyed by absolute log path
+    """
+    temp_file = f"{checkpoint_file}.tmp"
+    with open(temp_file, "w") as file:
+        json.dump({"version": CHECKPOINT_VERSION, "files": files}, file)
+    os.replace(temp_file, checkpoint_file)
+
+
+def _complete_lines_end(file_path, start):
+    """Return the offset just past the last newline at or after start."""
+    with open(file_path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size <= start:
+            return start
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return buffer.rfind(b"\n", start) + 1 or start
+
+
+def _find_rotated_file(file_path, inode, device):
+    """Find the file a log was rotated to (same inode, e.g. logs.txt.1)."""
+    directory = os.path.dirname(file_path)
+    prefix = os.path.basename(file_path) + "."
+    for name in sorted(os.listdir(directory or ".")):
+        if not name.startswith(prefix):
+            continue
+        candidate = os.path.join(directory, name)
+        try:
+            info = os.stat(candidate)
+        except OSError:
+            continue
+        if info.st_ino == inode and info.st_dev == device:
+            return candidate
+    return None
+
+
+def analyze_incremental(file_path, checkpoint_file=CHECKPOINT_FILE, workers=1, **options):
+    """
+    Analyze only the bytes appended to a log file since the last run.
+
+    The checkpoint records, per log file, its inode, the byte offset up to
+    which it has been analyzed, and the running aggregates. Each run picks
+    up from that offset, so its cost depends on the new data only:
+
+    - If the inode changed, the log was rotated: the rest of the old file
+      is read from its rotated name (if it can be found) and the new file
+      is analyzed from the start.
+    - If the file shrank below the offset, it was truncated in place and
+      is analyzed again from the start.
+    - A trailing line without a newline is left for the next run, since
+      it may still be being written.
+
+    Args:
+        file_path (str): Path to the log file
+        checkpoint_file (str): Path to the checkpoint JSON file
+        workers (int): Number of worker processes for the new data
+        **options: LogAnalysis settings (max_events, sketches, trends)
+
+    Returns:
+        dict: Analysis results for everything seen so far, or None on error
+    """
+    key = os.path.abspath(file_path)
+    files = load_checkpoint(checkpoint_file)
+    state = files.get(key)
+
+    try:
+        info = os.stat(file_path)
+        if state is None:
+            analysis, offset = LogAnalysis(**options), 0
+        else:
+            analysis, offset = LogAnalysis.from_dict(state["analysis"]), state["offset"]
+            if options.get("sketches") and analysis.sketches is None:
+                analysis.sketches = LogSketches()
+            if options.get("trends") and analysis.trends is None:
+                analysis.trends = TrendDetector(max_findings=analysis.max_events)
+            if (info.st_ino, info.st_dev) != (state["inode"], state["device"]):
+                rotated = _find_rotated_file(file_path, state["inode"], state["device"])
+                if rotated:
+                    print(f"Log was rotated; finishing {rotated} from byte {offset}")
+                    end = _complete_lines_end(rotated, offset)
+                    analysis.merge(analyze_log(rotated, offset, end, workers, **options))
+                else:
+                    print("Log was rotated; the previous file could not be found")
+                offset = 0
+            elif info.st_size < offset:
+                print("Log was truncated; analyzing it from the start")
+                offset = 0
+
+        end = _complete_lines_end(file_path, offset)
+        if end > offset:
+            print(f"Analyzing {end - offset} new bytes from offset {offset}")
+            analysis.merge(analyze_log(file_path, offset, end, workers, **options))
+        else:
+            print("No new log entries since the last run")
+    except FileNotFoundError:
+        print(f"Error: Log file '{file_path}' not found.")
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Error reading log file: {e}")
+        return None
+
+    files[key] = {
+        "inode": info.st_ino,
+        "device": info.st_dev,
+        "offset": end,
+        "analysis": analysis.to_dict()
+    }
+    save_checkpoint(checkpoint_file, files)
+
+    return analysis.to_results()
+
+
+class LogIndex:
+    """
+    Sidecar index mapping each minute of a log file to where it starts.
+
+    For every minute that has entries, the index keeps the byte offset of
+    the minute's first line and its entry counts per level. Time-range
+    queries look up the byte range in the index and only read that part of
+    the log; activity statistics come from the index alone.
+
+    The index is stored next to the log (``<log>.idx``) as a small header
+    followed by three packed arrays, and is extended in place as the log
+    grows. Like the rest of the analyzer, it assumes the log is written in
+    chronological order.
+    """
+
+    def __init__(self, device=0, inode=0):
+        self.device = device
+        self.inode = inode
+        self.indexed_offset = 0
+        self.minutes = array("q")   # Minutes since the epoch
+        self.offsets = array("q")   # Byte offset of each minute's first line
+        self.counts = array("q")    # len(INDEX_LEVELS) + 1 counts per minute
+
+    @classmethod
+    def load(cls, index_file):
+        """
+        Read an index from disk.
+
+        Args:
+            index_file (str): Path to the index file
+
+        Returns:
+            LogIndex: The index, or None if it is missing or unreadable
+        """
+        try:
+            with open(index_file, "rb") as file:
+                magic, device, inode, indexed_offset, buckets = _INDEX_HEADER.unpack(
+                    file.read(_INDEX_HEADER.size))
+                if magic != INDEX_MAGIC:
+                    return None
+                index = cls(device, inode)
+                index.indexed_offset = indexed_offset
+                index.minutes.fromfile(file, buckets)
+                index.offsets.fromfile(file, buckets)
+                index.counts.fromfile(file, buckets * _INDEX_SLOTS)
+        except (OSError, EOFError, struct.error):
+            return None
+
+        if sys.byteorder != "little":
+            for values in (index.minutes, index.offsets, index.counts):
+                values.byteswap()
+        return index
+
+    def save(self, index_file):
+        """
+        Atomically write the index to disk.
+
+        Args:
+            index_file (str): Path to the index file
+        """
+        arrays = [array("q", values) for values in (self.minutes, self.offsets, self.counts)]
+        if sys.byteorder != "little":
+            for values in arrays:
+                values.byteswap()
+
+        temp_file = f"{index_file}.tmp"
+        with open(temp_file, "wb") as file:
+            file.write(_INDEX_HEADER.pack(INDEX_MAGIC, self.device, self.inode,
+                                          self.indexed_offset, len(self.minutes)))
+            for values in arrays:
+                values.tofile(file)
+        os.replace(temp_file, index_file)
+
+    def update(self, file_path):
+        """
+        Index the complete lines appended to the log since the last update.
+
+        Args:
+            file_path (str): Path to the log file
+
+        Returns:
+            int: Number of bytes indexed
+        """
+        start = self.indexed_offset
+        end = _complete_lines_end(file_path, start)
+        slot = {level.encode(): position for position, level in enumerate(INDEX_LEVELS)}
+        other = len(INDEX_LEVELS)
+
+        current = _minute_text(self.minutes[-1]).encode() if self.minutes else None
+        base = len(self.counts) - _INDEX_SLOTS
+
+        for chunk_start, chunk in _iter_positioned_chunks(file_path, start, end):
+            for match in _MINUTE_TOKEN.finditer(b"\n" + chunk):
+                minute = match.group(1)
+                if minute != current:
+                    current = minute
+                    self.minutes.append(_minute_number(minute.decode()))
+                    self.offsets.append(chunk_start + match.start())
+                    self.counts.extend(_EMPTY_SLOTS)
+                    base = len(self.counts) - _INDEX_SLOTS
+                self.counts[base + slot.get(match.group(2), other)] += 1
+
+        self.indexed_offset = end
+        return end - start
+
+    def byte_range(self, since=None, until=None):
+        """
+        Find the bytes holding the entries of a time range.
+
+        Args:
+            since (int, optional): First minute to include (minutes since epoch)
+            until (int, optional): First minute to exclude (minutes since epoch)
+
+        Returns:
+            tuple: (start, end) byte offsets of the range in the log; end is
+            None when the range runs to the end of the file
+        """
+        def offset_of(minute):
+            position = bisect.bisect_left(self.minutes, minute)
+            return self.offsets[position] if position < len(self.offsets) else None
+
+        start = 0 if since is None else offset_of(since)
+        if start is None:
+            start = self.indexed_offset
+        end = None if until is None else offset_of(until)
+        return start, end if end is None else max(start, end)
+
+    def peak_periods(self, window=60, top=3, since=None, until=None):
+        """
+        Find the busiest periods of the log, using only the index.
+
+        Args:
+            window (int): Period length in minutes (periods align to it)
+            top (int): Number of periods to return
+            since (int, optional): First minute to consider
+            until (int, optional): First minute to exclude
+
+        Returns:
+            list: Dicts with start, end, entries and errors, busiest first
+        """
+        first = 0 if since is None else bisect.bisect_left(self.minutes, since)
+        last = len(self.minutes) if until is None else bisect.bisect_left(self.minutes, until)
+        error_slot = INDEX_LEVELS.index("ERROR")
+
+        periods = {}
+        for position in range(first, last):
+            counts = self.counts[position * _INDEX_SLOTS:(position + 1) * _INDEX_SLOTS]
+            totals = periods.setdefault(self.minutes[position] // window, [0, 0])
+            totals[0] += sum(counts)
+            totals[1] += counts[error_slot]
+
+        busiest = sorted(periods.items(), key=lambda item: (-item[1][0], item[0]))[:top]
+        return [
+            {
+                "start": _minute_datetime(period * window),
+                "end": _minute_datetime((period + 1) * window),
+                "entries": entries,
+                "errors": errors
+            }
+            for period, (entries, errors) in busiest
+        ]
+
+
+def _minute_number(text):
+    """Convert "YYYY-MM-DD HH:MM" into minutes since the epoch."""
+    return calendar.timegm(time.strptime(text, MINUTE_FORMAT)) // 60
+
+
+def _minute_datetime(minute):
+    """Convert minutes since the epoch into a datetime."""
+    return datetime.datetime(1970, 1, 1) + datetime.timedelta(minutes=minute)
+
+
+def _minute_text(minute):
+    """Convert minutes since the epoch into "YYYY-MM-DD HH:MM"."""
+    return _minute_datetime(minute).strftime(MINUTE_FORMAT)
+
+
+def _iter_positioned_chunks(file_path, start, end):
+    """Yield (offset, chunk) pairs for iter_log_chunks()."""
+    for chunk in iter_log_chunks(file_path, start, end):
+        yield start, chunk
+        start += len(chunk)
+
+
+def load_index(file_path, index_file=None):
+    """
+    Load the sidecar index of a log file, building or extending it as needed.
+
+    The index is rebuilt from scratch if the log was replaced (different
+    inode) or truncated, and extended if the log has grown.
+
+    Args:
+        file_path (str): Path to the log file
+        index_file (str, optional): Path to the index (defaults to <log>.idx)
+
+    Returns:
+        LogIndex: An index covering all complete lines of the log
+    """
+    index_file = index_file or f"{file_path}{INDEX_SUFFIX}"
+    info = os.stat(file_path)
+    index = LogIndex.load(index_file)
+
+    if (index is None or (index.device, index.inode) != (info.st_dev, info.st_ino)
+            or index.indexed_offset > info.st_size):
+        index = LogIndex(info.st_dev, info.st_ino)
+
+    if index.indexed_offset < info.st_size and index.update(file_path):
+        index.save(index_file)
+    return index
+
+
+def parse_time_bound(text, first_minute=None):
+    """
+    Parse a --since/--until value into minutes since the epoch.
+
+    Accepts "YYYY-MM-DD HH:MM[:SS]" or just "HH:MM[:SS]", which refers to
+    the day of the first entry in the log. Seconds are ignored: ranges
+    cover whole minutes.
+
+    Args:
+        text (str): The time given on the command line
+        first_minute (int, optional): Minute of the first entry in the log
+
+    Returns:
+        int: Minutes since the epoch, or None if text is empty
+    """
+    if not text:
+        return None
+    text = text.strip()
+    if len(text) <= 8:
+        day = _minute_text(first_minute)[:10] if first_minute is not None else "1970-01-01"
+        text = f"{day} {text}"
+    return _minute_number(text[:16])
+
+
+def analyze_time_range(file_path, since=None, until=None, workers=1, peak_window=60, **options):
+    """
+    Analyze only the entries between two times, using the sidecar index.
+
+    Args:
+        file_path (str): Path to the log file
+        since (str, optional): Start of the range (inclusive)
+        until (str, optional): End of the range (exclusive)
+        workers (int): Number of worker processes
+        peak_window (int): Length in minutes of the peak activity periods
+        **options: LogAnalysis settings (max_events, sketches, trends)
+
+    Returns:
+        dict: Analysis results for the range, or None on error
+    """
+    try:
+        index = load_index(file_path)
+        first_minute = index.minutes[0] if index.minutes else None
+        since, until = parse_time_bound(since, first_minute), parse_time_bound(until, first_minute)
+        start, end = index.byte_range(since, until)
+        print(f"Index maps the time range to bytes {start}-{'end' if end is None else end}")
+        analysis = analyze_log(file_path, start, end, workers, **options)
+    except FileNotFoundError:
+        print(f"Error: Log file '{file_path}' not found.")
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Error reading log file: {e}")
+        return None
+
+    results = analysis.to_results()
+    results["peak_periods"] = index.peak_periods(peak_window, since=since, until=until)
+    return results
+
+
+# Tags of each message in the columnar cache: its error category (an index
+# into CACHE_CATEGORIES), and whether it is notable at WARNING level and at
+# levels other than ERROR and WARNING (ERROR entries are always notable)
+CACHE_CATEGORIES = [name for name, _ in ERROR_CATEGORIES] + [DEFAULT_ERROR_CATEGORY]
+_TAG_CATEGORY = 0xFFFF
+_TAG_NOTABLE_WARNING = 1 << 16
+_TAG_NOTABLE_OTHER = 1 << 17
+_TAG_SIGNATURE = json.dumps([ERROR_CATEGORIES, DEFAULT_ERROR_CATEGORY])
+_CATEGORY_CODES = {name: code for code, name in enumerate(CACHE_CATEGORIES)}
+
+
+# A message without any of these terms is in the default error category and
+# only notable at ERROR level
+_TAG_TERMS = sorted({keyword.encode() for _, keywords in ERROR_CATEGORIES for keyword in keywords}
+                    | {term.encode() for term in NOTABLE_WARNING_TERMS} | set(_NOTABLE_TERMS))
+
+
+def message_tags(message):
+    """
+    Work out what the analyzer needs to know about a message.
+
+    Args:
+        message (str): Log message
+
+    Returns:
+        int: The message tags for the columnar cache
+    """
+    tags = _CATEGORY_CODES[categorize_error(message)]
+    if is_notable_event({"level": "WARNING", "message": message}):
+        tags |= _TAG_NOTABLE_WARNING
+    if is_notable_event({"level": "INFO", "message": message}):
+        tags |= _TAG_NOTABLE_OTHER
+    return tags
+
+
+def tag_messages(messages):
+    """
+    Compute the tags of a batch of new messages for the columnar cache.
+
+    Most messages contain none of the terms that categories and notable
+    events depend on, so the batch is searched for those terms as one
+    lower-cased block, and only the messages they occur in are examined.
+
+    Args:
+        messages (list): New messages, as bytes
+
+    Returns:
+        list: The tags of each message
+    """
+    default = _CATEGORY_CODES[DEFAULT_ERROR_CATEGORY]
+    tags = [default] * len(messages)
+    block = b"\n".join(messages).lower()
+
+    starts, position = [], 0
+    for message in messages:
+        starts.append(position)
+        position += len(message) + 1
+
+    candidates = set()
+    for term in _TAG_TERMS:
+        position = block.find(term)
+        while position >= 0:
+            candidates.add(bisect.bisect_right(starts, position) - 1)
+            position = block.find(term, position + len(term))
+
+    for index in candidates:
+        tags[index] = message_tags(messages[index].decode(errors="replace"))
+    return tags
+
+
+def compile_log(file_path, cache_dir=None):
+    """
+    Compile a log file into its columnar cache, or bring the cache up to date.
+
+    The cache is rebuilt from scratch if the log was replaced (different
+    inode) or truncated, or if the error categories have changed, and
+    extended if the log has grown.
+
+    Args:
+        file_path (str): Path to the log file
+        cache_dir (str, optional): Path to the cache (defaults to <log>.cols)
+
+    Returns:
+        ColumnarCache: A cache covering the whole log
+    """
+    cache_dir = cache_dir or f"{file_path}{CACHE_SUFFIX}"
+    info = os.stat(file_path)
+    cache = ColumnarCache.open(cache_dir)
+
+    if (cache is None or (cache.device, cache.inode) != (info.st_dev, info.st_ino)
+            or cache.size > info.st_size or cache.tag_signature != _TAG_SIGNATURE):
+        cache = ColumnarCache.create(cache_dir, info.st_dev, info.st_ino, _TAG_SIGNATURE)
+
+    if cache.size < info.st_size:
+        print(f"Compiling bytes {cache.offset}-{info.st_size} into {cache_dir}")
+        complete = min(_complete_lines_end(file_path, cache.offset), info.st_size)
+        if complete > cache.offset:
+            chunks = iter_log_chunks(file_path, cache.offset, complete)
+            cache.extend((_ENTRY_LINE.findall(chunk) for chunk in chunks), complete, tag=tag_messages)
+        if complete < info.st_size:
+            chunks = iter_log_chunks(file_path, complete, info.st_size)
+            cache.extend((_ENTRY_LINE.findall(chunk) for chunk in chunks), info.st_size,
+                         partial=True, tag=tag_messages)
+    return cache
+
+
+def _timestamp_text(seconds):
+    """Convert seconds since the epoch into a TIMESTAMP_FORMAT string."""
+    return time.strftime(TIMESTAMP_FORMAT, time.gmtime(int(seconds)))
+
+
+def analyze_columns(cache, start=0, end=None, max_events=MAX_NOTABLE_EVENTS):
+    """
+    Aggregate rows of a columnar cache, with the results of analyze_log().
+
+    Everything is computed with NumPy over whole columns: the message tags
+    saved at compile time are gathered per row, so no message text is
+    looked at except for the notable events that are listed.
+
+    Args:
+        cache (ColumnarCache): The compiled log
+        start (int): First row to include
+        end (int, optional): Row to stop at (defaults to the last row)
+        max_events (int): Maximum number of notable events to keep
+
+    Returns:
+        LogAnalysis: The aggregates for the rows
+    """
+    timestamps = cache.column("timestamps")[start:end]
+    levels = cache.column("levels")[start:end]
+    messages = cache.column("messages")[start:end]
+    string_ends = cache.column("string_ends")
+
+    analysis = LogAnalysis(max_events)
+    if not len(timestamps):
+        return analysis
+
+    analysis.total_entries = len(timestamps)
+    for code, count in enumerate(numpy.bincount(levels, minlength=len(cache.levels)).tolist()):
+        if count:
+            analysis.level_counts[cache.levels[code]] += count
+    analysis.update_time_range(_timestamp_text(timestamps.min()), _timestamp_text(timestamps.max()))
+
+    def is_level(level):
+        code = cache.level_code(level)
+        return levels == code if code >= 0 else numpy.zeros(len(levels), dtype=bool)
+
+    tags = cache.column("string_tags")[messages]
+    is_error, is_warning = is_level("ERROR"), is_level("WARNING")
+
+    # Categories are added in order of first appearance, as analyze_log() does
+    categories, first_rows, counts = numpy.unique(tags[is_error] & _TAG_CATEGORY,
+                                                  return_index=True, return_counts=True)
+    for position in numpy.argsort(first_rows, kind="stable").tolist():
+        analysis.error_type_counts[CACHE_CATEGORIES[categories[position]]] += int(counts[position])
+
+    notable = (is_error
+               | (is_warning & (tags & _TAG_NOTABLE_WARNING != 0))
+               | (~is_error & ~is_warning & (tags & _TAG_NOTABLE_OTHER != 0)))
+    notable_rows = numpy.flatnonzero(notable)
+
+    analysis.notable_total = len(notable_rows)
+    for row in notable_rows[:max_events].tolist():
+        analysis.notable_events.append((_timestamp_text(timestamps[row]), cache.levels[levels[row]],
+                                        cache.message(messages[row], string_ends)))
+    return analysis
+
+
+def analyze_cache(file_path, since=None, until=None, max_events=MAX_NOTABLE_EVENTS):
+    """
+    Analyze a log from its columnar cache, compiling only what is new.
+
+    Args:
+        file_path (str): Path to the log file
+        since (str, optional): Start of the range (inclusive)
+        until (str, optional): End of the range (exclusive)
+        max_events (int): Maximum number of notable events to keep
+
+    Returns:
+        dict: Analysis results, or None on error
+    """
+    if numpy is None:
+        print("Error: Reports from the columnar cache require NumPy (pip install numpy).")
+        return None
+
+    try:
+        cache = compile_log(file_path)
+        timestamps = cache.column("timestamps")
+        start, end = 0, None
+        if since or until:
+            first_minute = int(timestamps[0]) // 60 if len(timestamps) else None
+            since, until = parse_time_bound(since, first_minute), parse_time_bound(until, first_minute)
+            # Rows are in log order, which is chronological
+            if since is not None:
+                start = int(numpy.searchsorted(timestamps, since * 60))
+            if until is not None:
+                end = int(numpy.searchsorted(timestamps, until * 60))
+        analysis = analyze_columns(cache, start, end, max_events)
+    except FileNotFoundError:
+        print(f"Error: Log file '{file_path}' not found.")
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Error reading log file: {e}")
+        return None
+
+    return analysis.to_results()
+
+
+def generate_report(results, output_file="report.txt"):
+    """
+    Generate a report file from the analysis results.
+
+    Args:
+        results (dict): Analysis results
+        output_file (str): Path to the output report file
+
+    Returns:
+        bool: True if report was generated successfully
+    """
+    try:
+        with open(output_file, "w") as report:
+            # Header
+            report.write("LOG ANALYSIS REPORT\n")
+            report.write("==================\n")
+            report.write(f"Generated: {datetime.datetime.now().strftime(TIMESTAMP_FORMAT)}\n\n")
+
+            # Summary statistics
+            report.write("SUMMARY STATISTICS\n")
+            report.write("-----------------\n")
+            report.write(f"Total log entries: {results['total_entries']}\n")
+
+            if results["start_time"] and results["end_time"]:
+                start_time_str = results["start_time"].strftime(TIMESTAMP_FORMAT)
+                end_time_str = results["end_time"].strftime(TIMESTAMP_FORMAT)
+                report.write(f"Time range: {start_time_str} to {end_time_str}\n\n")
+
+            # Log level breakdown
+            report.write("LOG LEVEL BREAKDOWN\n")
+            report.write("------------------\n")
+
+            total = results["total_entries"]
+            for level, count in sorted(results["level_counts"].items()):
+                percentage = (count / total) * 100 if total > 0 else 0
+                report.write(f"{level:<7} {count:>3} ({percentage:.1f}%)\n")
+
+            report.write("\n")
+
+            # Top error types
+            if results["error_type_counts"]:
+                report.write("TOP ERROR TYPES\n")
+                report.write("--------------\n")
+
+                for error_type, count in results["error_type_counts"].most_common():
+                    report.write(f"- {error_type}: {count}\n")
+
+                report.write("\n")
+
+            # Notable events
+            if results["notable_events"]:
+                report.write("NOTABLE EVENTS\n")
+                report.write("-------------\n")
+
+                for event in results["notable_events"]:
+                    time_str = event["timestamp"].strftime("%H:%M:%S")
+                    report.write(f"- {event['message']} at {time_str}\n")
+
+                omitted = results.get("notable_total", 0) - len(results["notable_events"])
+                if omitted > 0:
+                    report.write(f"- ... and {omitted} more notable events\n")
+
+            # Approximate statistics (only available in sketch mode)
+            if results.get("sketches") is not None:
+                write_sketch_sections(report, results["sketches"])
+
+            # Trends and anomalies (only available in trend mode)
+            if results.get("trends") is not None:
+                report.write("\nTRENDS AND ANOMALIES\n")
+                report.write("-------------------\n")
+
+                findings = results["trends"].report()
+                for timestamp, description in findings:
+                    report.write(f"- {timestamp}: {description}\n")
+                if not findings:
+                    report.write("- No rate spikes, gaps or outages found\n")
+                omitted = results["trends"].findings_total - len(findings)
+                if omitted > 0:
+                    report.write(f"- ... and {omitted} more findings\n")
+
+            # Peak activity periods (only available with the sidecar index)
+            if results.get("peak_periods"):
+                report.write("\nPEAK ACTIVITY PERIODS\n")
+                report.write("--------------------\n")
+
+                for period in results["peak_periods"]:
+                    start_str = period["start"].strftime(MINUTE_FORMAT)
+                    end_str = period["end"].strftime("%H:%M")
+                    report.write(f"- {start_str} to {end_str}: {period['entries']} entries, "
+                                 f"{period['errors']} errors\n")
+
+        print(f"Report successfully generated: {os.path.abspath(output_file)}")
+        return True
+
+    except Exception as e:
+        print(f"Error generating report: {e}")
+        return False
+
+
+def write_sketch_sections(report, sketches, top=10):
+    """
+    Write the approximate statistics gathered in sketch mode.
+
+    Args:
+        report (file object): The open report file
+        sketches (LogSketches): Sketches for the analyzed log
+        top (int): Number of top message patterns and services to list
+    """
+    report.write("\nTOP MESSAGE PATTERNS (ERROR/WARNING, approximate)\n")
+    report.write("------------------------------------------------\n")
+    for message, count, error in sketches.top_messages.top(top):
+        bound = f" (+/-{error})" if error else ""
+        report.write(f"- {message}: {count}{bound}\n")
+
+    report.write("\nTOP SERVICES (approximate)\n")
+    report.write("-------------------------\n")
+    for service, count, error in sketches.top_services.top(top):
+        bound = f" (+/-{error})" if error else ""
+        report.write(f"- {service}: {count}{bound}\n")
+
+    report.write("\nDISTINCT VALUES (approximate)\n")
+    report.write("----------------------------\n")
+    report.write(f"Users:        ~{sketches.users.count()}\n")
+    report.write(f"IP addresses: ~{sketches.ip_addresses.count()}\n")
+    report.write(f"Services:     ~{sketches.services.count()}\n")
+
+
+def parse_args():
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Analyze a log file and generate a summary report.")
+    parser.add_argument("log_file", nargs="?", default="logs.txt",
+                        help="Log file or glob of plain/.gz/.zst segments to analyze (default: logs.txt)")
+    parser.add_argument("-o", "--output", default="report.txt", help="Report file to write (default: report.txt)")
+    parser.add_argument("--max-events", type=int, default=MAX_NOTABLE_EVENTS,
+                        help=f"Maximum notable events to keep (default: {MAX_NOTABLE_EVENTS})")
+    parser.add_argument("--sketches", action="store_true",
+                        help="Track top messages/services and distinct users, IPs and services in fixed memory")
+    parser.add_argument("--trends", action="store_true",
+                        help="Report error/warning rate spikes, logging gaps and service outages")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Worker processes for parallel analysis (0 = one per CPU, default: 1)")
+    parser.add_argument("--rotated", action="store_true",
+                        help="Also analyze rotated segments such as logs.txt.1 and logs.txt.2.gz")
+    parser.add_argument("--index", action="store_true",
+                        help=f"Build or update the <log>{INDEX_SUFFIX} sidecar index and report peak periods")
+    parser.add_argument("--cache", action="store_true",
+                        help=f"Compile the log into the <log>{CACHE_SUFFIX} columnar cache and report from it "
+                             "(needs NumPy)")
+    parser.add_argument("--since", help="Only analyze entries from this time on (uses the index or cache)")
+    parser.add_argument("--until", help="Only analyze entries before this time (uses the index or cache)")
+    parser.add_argument("--peak-window", type=int, default=60,
+                        help="Length of peak activity periods in minutes (default: 60)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only analyze data appended since the last run (uses the checkpoint)")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE,
+                        help=f"Checkpoint file for incremental runs (default: {CHECKPOINT_FILE})")
+    parser.add_argument("--follow", action="store_true",
+                        help="Keep running incrementally, refreshing the report every --interval seconds")
+    parser.add_argument("--interval", type=float, default=60,
+                        help="Seconds between refreshes in --follow mode (default: 60)")
+    args = parser.parse_args()
+    if args.workers <= 0:
+        args.workers = os.cpu_count() or 1
+    return args
+
+
+def run_analysis(args):
+    """
+    Analyze the log and write the report once.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+    """
+    try:
+        segments = find_log_segments(args.log_file, args.rotated)
+    except OSError as e:
+        print(f"Error reading log segments: {e}")
+        return
+
+    if len(segments) > 1 or (segments and is_compressed(segments[0])):
+        if args.index or args.cache or args.since or args.until or args.incremental or args.follow:
+            print("Error: --index, --cache, --since, --until and --incremental need a single uncompressed log file.")
+            return
+        print(f"Analyzing {len(segments)} log segments: {', '.join(segments)}")
+        results = analyze_segments(segments, args.workers, **analysis_options(args))
+    elif glob.has_magic(args.log_file) and not segments:
+        print(f"Error: No log files match '{args.log_file}'.")
+        return
+    else:
+        log_file = segments[0] if segments else args.log_file
+        print(f"Analyzing log file: {log_file}")
+        results = analyze_single_file(args, log_file)
+
+    if not results or not results["total_entries"]:
+        print("No logs to analyze.")
+        return
+
+    # Generate the report
+    print(f"Generating report for {results['total_entries']} log entries...")
+    generate_report(results, args.output)
+
+    print(f"Analysis complete. Check {args.output} for details.")
+
+
+def analyze_single_file(args, log_file):
+    """
+    Analyze one plain log file in the mode selected on the command line.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+        log_file (str): Path to the log file
+
+    Returns:
+        dict: Analysis results, or None on error
+    """
+    if args.cache:
+        if args.sketches or args.trends or args.index or args.incremental:
+            print("Error: --cache cannot be combined with --sketches, --trends, --index or --incremental.")
+            return None
+        return analyze_cache(log_file, args.since, args.until, args.max_events)
+    if args.index or args.since or args.until:
+        return analyze_time_range(log_file, args.since, args.until, args.workers,
+                                  args.peak_window, **analysis_options(args))
+    if args.incremental or args.follow:
+        return analyze_incremental(log_file, args.checkpoint, args.workers, **analysis_options(args))
+    return analyze_file(log_file, args.workers, **analysis_options(args))
+
+
+def analysis_options(args):
+    """Return the LogAnalysis settings selected on the command line."""
+    return {"max_events": args.max_events, "sketches": args.sketches, "trends": args.trends}
+
+
+def main():
+    """Main function to execute the log analysis workflow."""
+    args = parse_args()
 
-if __name__ == "__main__":
     print("Log Analysis Tool")
     print("================")
-    
-    # TODO: Implement the main program flow
-    # 1. Read the log file
-    # 2. Analyze the logs
-    # 3. Generate the report
 
-    
-    print("Analysis complete. Check report.txt for details.")
+    if not args.follow:
+        run_analysis(args)
+        return
+
+    print(f"Following {args.log_file} every {args.interval:g}s. Press Ctrl+C to stop.")
+    try:
+        while True:
+            run_analysis(args)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\nStopped following.")
+
+
+if __name__ == "__main__":
+    main()
 
 
 # Sample report output format:
@@ -81,4 +1765,4 @@ NOTABLE EVENTS
 - System experienced database connectivity issues at 09:05:43
 - Deployment of v2.3.4 failed at 14:20:41
 - Authentication service downtime for 18 minutes around 23:05:42
-""" 
\ No newline at end of file
+"""
@@ -0,0 +1,314 @@
+"""
+Bounded-memory sketches for the LAB03 log analyzer.
+
+Exact counters grow with the number of distinct values they see, which is
+a problem when log messages contain unique IDs. The sketches in this module
+use a fixed amount of memory instead, trade a small, known error for it,
+and can be merged, so shards and incremental runs can be combined.
+
+- SpaceSaving: approximate top-k counts. With capacity k over a stream of
+  N items, every item seen more than N/k times is guaranteed to be kept,
+  and each reported count overestimates the true count by at most its
+  ``error`` value, which is never more than N/k.
+- HyperLogLog: approximate distinct count. With 2**p registers the
+  standard error is about 1.04 / sqrt(2**p), i.e. 0.81% for the default
+  p = 14, using 16 KB of memory.
+"""
+
+import base64
+import hashlib
+import heapq
+import math
+import re
+
+
+def _hash64(value):
+    """Stable 64-bit hash, identical across processes and runs."""
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "little")
+
+
+class SpaceSaving:
+    """Approximate top-k counter using the Space-Saving algorithm."""
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.total = 0
+        self.counts = {}
+        self.errors = {}
+        self._heap = []
+
+    def add(self, item, count=1):
+        """
+        Count an occurrence of an item.
+
+        Args:
+            item (str): The item
+            count (int): Number of occurrences to add
+        """
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            # Replace the item with the smallest count; the newcomer inherits
+            # that count as its possible overestimate
+            floor, evicted = self._pop_min()
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+        self._push(item)
+
+    def _push(self, item):
+        heapq.heappush(self._heap, (self.counts[item], item))
+        # The heap keeps stale entries for counts that have since grown;
+        # rebuild it before they outnumber the live ones
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, key) for key, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return count, item
+
+    def min_count(self):
+        """Return the count any unseen item could have had (0 unless full)."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def merge(self, other):
+        """
+        Fold another summary into this one.
+
+        Items missing from one summary are assumed to have that summary's
+        min_count(), which keeps the error bounds of both.
+
+        Args:
+            other (SpaceSaving): Summary of another part of the stream
+
+        Returns:
+            SpaceSaving: self, to allow chaining
+        """
+        own_floor, other_floor = self.min_count(), other.min_count()
+        merged = {}
+        for item in set(self.counts) | set(other.counts):
+            count = self.counts.get(item, own_floor) + other.counts.get(item, other_floor)
+            error = (self.errors.get(item, own_floor) + other.errors.get(item, other_floor))
+            merged[item] = (count, error)
+
+        kept = heapq.nlargest(self.capacity, merged.items(), key=lambda entry: entry[1][0])
+        self.counts = {item: count for item, (count, _) in kept}
+        self.errors = {item: error for item, (_, error) in kept}
+        self.total += other.total
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    def top(self, n=10):
+        """
+        Return the n most frequent items.
+
+        Returns:
+            list: (item, count, error) tuples, most frequent first
+        """
+        ranked = sorted(self.counts.items(), key=lambda entry: (-entry[1], entry[0]))[:n]
+        return [(item, count, self.errors[item]) for item, count in ranked]
+
+    def to_dict(self):
+        """Serialize the summary to JSON-compatible data."""
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "items": [[item, count, self.errors[item]] for item, count in self.counts.items()]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore a summary saved with to_dict()."""
+        summary = cls(data["capacity"])
+        summary.total = data["total"]
+        for item, count, error in data["items"]:
+            summary.counts[item] = count
+            summary.errors[item] = error
+        summary._heap = [(count, item) for item, count in summary.counts.items()]
+        heapq.heapify(summary._heap)
+        return summary
+
+
+class HyperLogLog:
+    """Approximate distinct counter using the HyperLogLog algorithm."""
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value):
+        """
+        Add a value to the set.
+
+        Args:
+            value (bytes): The value
+        """
+        self.update((value,))
+
+    def update(self, values):
+        """
+        Add several values to the set.
+
+        Args:
+            values (iterable): The values, as bytes
+        """
+        width = 64 - self.precision
+        mask = (1 << width) - 1
+        registers = self.registers
+        for value in values:
+            hashed = _hash64(value)
+            index = hashed >> width
+            rank = width - (hashed & mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def count(self):
+        """
+        Estimate the number of distinct values added.
+
+        Returns:
+            int: The estimate
+        """
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0 ** -register for register in self.registers)
+
+        # Small cardinalities are estimated more accurately by linear counting
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+    def merge(self, other):
+        """
+        Fold another sketch into this one (a set union).
+
+        Args:
+            other (HyperLogLog): Sketch with the same precision
+
+        Returns:
+            HyperLogLog: self, to allow chaining
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precisions")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def to_dict(self):
+        """Serialize the sketch to JSON-compatible data."""
+        return {
+            "precision": self.precision,
+            "registers": base64.b64encode(self.registers).decode("ascii")
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore a sketch saved with to_dict()."""
+        sketch = cls(data["precision"])
+        sketch.registers = bytearray(base64.b64decode(data["registers"]))
+        return sketch
+
+
+# Values worth counting, found with one regex scan per chunk
+_IP_ADDRESS = re.compile(rb"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b")
+_USER = re.compile(rb"[Uu]ser ([\w.@-]+)")
+_SERVICE = re.compile(rb" ([A-Za-z]+) [Ss]ervice\b")
+
+# Tokens containing a digit (IDs, addresses, sizes, versions) vary between
+# otherwise identical messages
+_VARIABLE_TOKEN = re.compile(r"[\w.:/#-]*\d[\w.:/#-]*")
+
+
+def message_pattern(message):
+    """
+    Reduce a message to its pattern by masking the tokens that contain digits.
+
+    "Request req-7f3a from 10.0.0.7 failed" becomes "Request <*> from <*> failed",
+    so messages that differ only by IDs are counted together.
+
+    Args:
+        message (str): Log message
+
+    Returns:
+        str: The message pattern
+    """
+    return _VARIABLE_TOKEN.sub("<*>", message)
+
+
+class LogSketches:
+    """
+    The fixed-size sketches kept for a log in sketch mode.
+
+    Tracks the most frequent ERROR/WARNING message patterns and services,
+    and the number of distinct users, IP addresses and services.
+    """
+
+    def __init__(self, top_capacity=100, precision=14):
+        self.top_messages = SpaceSaving(top_capacity)
+        self.top_services = SpaceSaving(top_capacity)
+        self.users = HyperLogLog(precision)
+        self.ip_addresses = HyperLogLog(precision)
+        self.services = HyperLogLog(precision)
+
+    def add_chunk(self, chunk):
+        """
+        Update the distinct counters and top services from a block of lines.
+
+        Values are de-duplicated per chunk before hashing, so repeated
+        values cost one set lookup each.
+
+        Args:
+            chunk (bytes): Newline-aligned block of log lines
+        """
+        self.ip_addresses.update(set(_IP_ADDRESS.findall(chunk)))
+        self.users.update(set(_USER.findall(chunk)))
+
+        services = [service.lower() for service in _SERVICE.findall(chunk)]
+        self.services.update(set(services))
+        for service in set(services):
+            self.top_services.add(service.decode(errors="replace"), services.count(service))
+
+    def add_message(self, message):
+        """Count the pattern of an ERROR or WARNING message."""
+        self.top_messages.add(message_pattern(message))
+
+    def merge(self, other):
+        """Fold the sketches of a later part of the log into these."""
+        self.top_messages.merge(other.top_messages)
+        self.top_services.merge(other.top_services)
+        self.users.merge(other.users)
+        self.ip_addresses.merge(other.ip_addresses)
+        self.services.merge(other.services)
+        return self
+
+    def to_dict(self):
+        """Serialize the sketches to JSON-compatible data."""
+        return {name: getattr(self, name).to_dict() for name in _SKETCH_TYPES}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore sketches saved with to_dict()."""
+        sketches = cls()
+        for name, sketch_type in _SKETCH_TYPES.items():
+            setattr(sketches, name, sketch_type.from_dict(data[name]))
+        return sketches
+
+
+_SKETCH_TYPES = {
+    "top_messages": SpaceSaving,
+    "top_services": SpaceSaving,
+    "users": HyperLogLog,
+    "ip_addresses": HyperLogLog,
+    "services": HyperLogLog,
+}
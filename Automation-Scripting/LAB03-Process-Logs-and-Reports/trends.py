@@ -0,0 +1,386 @@
+"""
+Online trend and anomaly detection for the LAB03 log analyzer.
+
+TrendDetector runs inside the streaming pass. It receives per-minute entry
+counts and a few individual events, and keeps only fixed-size state:
+
+- Rate spikes: ERROR and WARNING counts of the last ``baseline`` minutes
+  live in ring buffers, with running sums for several window sizes. When a
+  minute closes, each window is compared with the rate of the rest of the
+  baseline, in O(1) per window. A spike is reported when it starts.
+- Gaps: a silence of at least ``gap_minutes`` is reported if, at the rate
+  seen just before it, ``min_gap_entries`` or more entries were expected.
+- Outages: an ERROR about a service or component (e.g. "Authentication
+  service not responding") opens an outage, and a later recovery message
+  about the same subject ("Authentication service restarted") closes it.
+
+Detectors for consecutive parts of a log merge exactly: the first minutes
+each detector sees are kept and replayed into its predecessor, so sharded
+and incremental runs find the same anomalies as a serial run.
+"""
+
+import datetime
+import re
+
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Counts tracked per minute
+ERROR, WARNING, TOTAL = range(3)
+SLOT_NAMES = ("ERROR", "WARNING")
+
+# "<name> service", a few common components, or a numbered worker
+_SUBJECT = re.compile(
+    r"\b(\w+) service\b|\b(database|cache|queue|network|disk|worker process #?\d+)\b",
+    re.IGNORECASE)
+_RECOVERY = re.compile(r"restart|recover|restor|establish|reconnect|back online", re.IGNORECASE)
+
+# Lower-cased terms of recovery messages, used to pick lines out of a chunk
+RECOVERY_TERMS = (b"restart", b"recover", b"restor", b"establish", b"reconnect", b"back online")
+
+
+def outage_subject(message):
+    """
+    Return what a message is about, for pairing failures with recoveries.
+
+    Args:
+        message (str): Log message
+
+    Returns:
+        str: Lower-cased subject (e.g. "authentication service"), or None
+    """
+    match = _SUBJECT.search(message)
+    if not match:
+        return None
+    if match.group(1):
+        return f"{match.group(1).lower()} service"
+    return match.group(2).lower()
+
+
+class TrendDetector:
+    """Fixed-memory detector for rate spikes, gaps and outages."""
+
+    def __init__(self, windows=(5, 15), baseline=60, spike_factor=3.0, min_spike=5,
+                 gap_minutes=10, min_gap_entries=20, max_findings=100):
+        """
+        Args:
+            windows (tuple): Short window sizes in minutes, checked for spikes
+            baseline (int): Minutes of history the short windows are compared with
+            spike_factor (float): How many times the baseline rate is a spike
+            min_spike (int): Minimum entries in a window to count as a spike
+            gap_minutes (int): Minimum silence, in minutes, to report
+            min_gap_entries (int): Minimum entries expected during a reported gap
+            max_findings (int): Maximum number of findings kept
+        """
+        self.windows = tuple(windows)
+        self.baseline = baseline
+        self.spike_factor = spike_factor
+        self.min_spike = min_spike
+        self.gap_minutes = gap_minutes
+        self.min_gap_entries = min_gap_entries
+        self.max_findings = max_findings
+
+        self.first_minute = None     # First minute of the whole log
+        self.minute = None           # Minute currently being filled
+        self.current = [0, 0, 0]     # Its ERROR, WARNING and total counts
+        self.last_active = None      # Last minute that had entries
+        self.rate_before_gap = 0.0   # Entries per minute when last active
+        self.rings = [[0] * baseline for _ in range(3)]
+        self.sums = [[0] * (len(self.windows) + 1) for _ in range(3)]
+        self.spiking = [[False] * len(self.windows) for _ in SLOT_NAMES]
+
+        # The first minutes of this part of the log, replayed by merge()
+        self.anchor = None
+        self.head = []
+        self.head_findings = 0
+
+        self.open_outages = {}
+        self.first_events = {}
+        self.unmatched_recoveries = []
+
+        self.findings = []
+        self.findings_total = 0
+
+    # -- Per-minute rates ------------------------------------------------
+
+    def add_minute(self, minute, counts):
+        """
+        Add entry counts for one minute.
+
+        Minutes must arrive in order; counts for the same minute may be
+        added several times. Earlier minutes are counted in the current one.
+
+        Args:
+            minute (int): Minutes since the epoch
+            counts (tuple): (errors, warnings, total entries)
+        """
+        if self.anchor is None:
+            self.anchor = minute
+            if self.first_minute is None:
+                self.first_minute = minute
+        if minute < self.anchor + self.baseline + 1:
+            self.head.append((minute, tuple(counts)))
+
+        if self.minute is None:
+            self.minute = minute
+        elif minute > self.minute:
+            self._advance(minute)
+            if self.last_active is not None:
+                self._check_gap(minute)
+
+        for slot in (ERROR, WARNING, TOTAL):
+            self.current[slot] += counts[slot]
+
+    def _advance(self, minute):
+        """Close minutes until ``minute`` is the one being filled."""
+        # After a full baseline of empty minutes every window is empty, so
+        # longer silences can be skipped
+        if minute - self.minute > self.baseline + 1:
+            for _ in range(self.baseline + 1):
+                self._close_minute()
+            self.minute = minute
+            return
+        while self.minute < minute:
+            self._close_minute()
+
+    def _close_minute(self):
+        """Move the current minute into the rings and check for spikes."""
+        minute, counts, size = self.minute, self.current, self.baseline
+        position = minute % size
+
+        if counts[TOTAL]:
+            self.last_active = minute
+
+        for slot in (ERROR, WARNING, TOTAL):
+            ring, sums, value = self.rings[slot], self.sums[slot], counts[slot]
+            for index, window in enumerate(self.windows + (size,)):
+                sums[index] += value - ring[(minute - window) % size]
+            ring[position] = value
+
+        if counts[TOTAL]:
+            self.rate_before_gap = self.sums[TOTAL][-1] / size
+
+        if minute - self.first_minute >= size:
+            self._check_spikes(minute)
+
+        self.minute = minute + 1
+        self.current = [0, 0, 0]
+
+    def _check_spikes(self, minute):
+        size = self.baseline
+        for slot, name in enumerate(SLOT_NAMES):
+            sums = self.sums[slot]
+            for index, window in enumerate(self.windows):
+                recent = sums[index]
+                expected = (sums[-1] - recent) / (size - window) * window
+                spiking = recent >= self.min_spike and recent >= self.spike_factor * max(expected, 1.0)
+                if spiking and not self.spiking[slot][index]:
+                    self._add_finding(minute, "spike", {
+                        "level": name, "window": window,
+                        "count": recent, "expected": round(expected, 1)
+                    })
+                self.spiking[slot][index] = spiking
+
+    def _check_gap(self, minute):
+        silent = minute - self.last_active - 1
+        expected = self.rate_before_gap * silent
+        if (silent >= self.gap_minutes and expected >= self.min_gap_entries
+                and minute - self.first_minute >= self.baseline):
+            self._add_finding(minute, "gap", {
+                "minutes": silent, "expected": round(expected, 1),
+                "start": self.last_active + 1
+            })
+
+    # -- Outages ---------------------------------------------------------
+
+    def add_event(self, timestamp, level, message):
+        """
+        Check a parsed entry for the start or end of an outage.
+
+        Args:
+            timestamp (str): Timestamp in TIMESTAMP_FORMAT
+            level (str): Log level
+            message (str): Log message
+        """
+        subject = outage_subject(message)
+        if subject is None:
+            return
+        if level == "ERROR":
+            self.first_events.setdefault(subject, "open")
+            self.open_outages.setdefault(subject, timestamp)
+        elif _RECOVERY.search(message):
+            started = self.open_outages.pop(subject, None)
+            if started is not None:
+                self._add_outage(subject, started, timestamp)
+            elif subject not in self.first_events:
+                # Only a recovery before any failure can end an outage that
+                # started in an earlier part of the log
+                self.unmatched_recoveries.append((subject, timestamp))
+            self.first_events.setdefault(subject, "close")
+
+    def _add_outage(self, subject, started, ended):
+        self._add_finding(None, "outage", {
+            "subject": subject, "start": started, "end": ended,
+            "seconds": _seconds_between(started, ended)
+        })
+
+    # -- Findings and merging ----------------------------------------------
+
+    def _add_finding(self, minute, kind, details):
+        self.findings_total += 1
+        if minute is not None and self.anchor is not None and minute < self.anchor + self.baseline + 1:
+            self.head_findings += 1
+        self._keep(dict(details, kind=kind, minute=minute))
+
+    def _keep(self, finding):
+        """Keep a finding if it is among the ``max_findings`` earliest."""
+        self.findings.append(finding)
+        # Trimming to the earliest findings, rather than the first ones
+        # found, keeps the same findings however the log was split
+        if len(self.findings) > 2 * self.max_findings:
+            self.findings = sorted(self.findings, key=_finding_key)[:self.max_findings]
+
+    def merge(self, other):
+        """
+        Fold the detector of the following part of the log into this one.
+
+        Args:
+            other (TrendDetector): Detector for the data after this one
+
+        Returns:
+            TrendDetector: self, to allow chaining
+        """
+        self._merge_outages(other)
+        if other.minute is None:
+            return self
+
+        if self.minute is None:
+            self._take_rates(other)
+            self.first_minute = other.first_minute if self.first_minute is None else self.first_minute
+            self.anchor, self.head = other.anchor, list(other.head)
+            self.head_findings = other.head_findings
+            self.findings_total += other.findings_total - _count_outages(other)
+            self._extend_findings(other.findings, other.anchor)
+            return self
+
+        # Findings the other detector made while it still lacked history are
+        # recomputed here, by replaying the minutes it saw first
+        limit = other.anchor + self.baseline + 1
+        for minute, counts in other.head:
+            self.add_minute(minute, counts)
+
+        if other.minute >= limit:
+            self._advance(limit)
+            self._take_rates(other)
+            self.findings_total += other.findings_total - other.head_findings - _count_outages(other)
+            self._extend_findings(other.findings, limit)
+        return self
+
+    def _take_rates(self, other):
+        """Continue from the rate state of another detector."""
+        self.minute = other.minute
+        self.current = list(other.current)
+        self.last_active = other.last_active
+        self.rate_before_gap = other.rate_before_gap
+        self.rings = [list(ring) for ring in other.rings]
+        self.sums = [list(sums) for sums in other.sums]
+        self.spiking = [list(flags) for flags in other.spiking]
+
+    def _extend_findings(self, findings, since):
+        for finding in findings:
+            if finding["kind"] != "outage" and finding["minute"] >= since:
+                self._keep(finding)
+
+    def _merge_outages(self, other):
+        # Outages the other part saw end may have started in this one
+        for subject, timestamp in other.unmatched_recoveries:
+            started = self.open_outages.pop(subject, None)
+            if started is not None:
+                self._add_outage(subject, started, timestamp)
+            elif subject not in self.first_events:
+                self.unmatched_recoveries.append((subject, timestamp))
+
+        for finding in other.findings:
+            if finding["kind"] != "outage":
+                continue
+            subject = finding["subject"]
+            # The first outage of a subject that was already down here
+            # started with this part's failure
+            if subject in self.open_outages and other.first_events.get(subject) == "open":
+                finding = dict(finding, start=self.open_outages.pop(subject))
+                finding["seconds"] = _seconds_between(finding["start"], finding["end"])
+            self.findings_total += 1
+            self._keep(finding)
+
+        for subject, started in other.open_outages.items():
+            self.open_outages.setdefault(subject, started)
+        for subject, event in other.first_events.items():
+            self.first_events.setdefault(subject, event)
+
+    def report(self):
+        """
+        Describe the earliest findings, in the order they happened.
+
+        Returns:
+            list: (timestamp, description) tuples
+        """
+        lines = []
+        for finding in sorted(self.findings, key=_finding_key)[:self.max_findings]:
+            kind = finding["kind"]
+            if kind == "outage":
+                text = (f"{finding['subject'].capitalize()} outage for {finding['seconds'] / 60:.1f} minutes "
+                        f"({finding['start'][11:]} to {finding['end'][11:]})")
+            elif kind == "spike":
+                text = (f"{finding['level']} rate spike: {finding['count']} in {finding['window']} min "
+                        f"(~{finding['expected']} expected)")
+            else:
+                text = (f"No log entries for {finding['minutes']} minutes "
+                        f"(~{finding['expected']} expected)")
+            lines.append((_finding_key(finding)[0], text))
+        return lines
+
+    def to_dict(self):
+        """Serialize the detector to JSON-compatible data."""
+        data = dict(self.__dict__)
+        data["head"] = [[minute, list(counts)] for minute, counts in self.head]
+        data["unmatched_recoveries"] = [list(event) for event in self.unmatched_recoveries]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore a detector saved with to_dict()."""
+        detector = cls()
+        detector.__dict__.update(data)
+        detector.windows = tuple(data["windows"])
+        detector.head = [(minute, tuple(counts)) for minute, counts in data["head"]]
+        detector.unmatched_recoveries = [tuple(event) for event in data["unmatched_recoveries"]]
+        return detector
+
+
+def _finding_key(finding):
+    """Sort findings by when they started, then by what they are."""
+    kind = finding["kind"]
+    if kind == "outage":
+        started = finding["start"]
+    elif kind == "spike":
+        started = _minute_timestamp(finding["minute"] - finding["window"] + 1)
+    else:
+        started = _minute_timestamp(finding["start"])
+    return started, kind, finding.get("level", ""), finding.get("window", 0), finding.get("subject", "")
+
+
+def _count_outages(detector):
+    return sum(1 for finding in detector.findings if finding["kind"] == "outage")
+
+
+def _seconds_between(start, end):
+    """Return the number of seconds between two TIMESTAMP_FORMAT strings."""
+    delta = (datetime.datetime.strptime(end, TIMESTAMP_FORMAT)
+             - datetime.datetime.strptime(start, TIMESTAMP_FORMAT))
+    return int(delta.total_seconds())
+
+
+def _minute_timestamp(minute):
+    """Convert minutes since the epoch into a TIMESTAMP_FORMAT string."""
+    moment = datetime.datetime(1970, 1, 1) + datetime.timedelta(minutes=minute)
+    return moment.strftime(TIMESTAMP_FORMAT)
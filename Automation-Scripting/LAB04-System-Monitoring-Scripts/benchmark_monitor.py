@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+LAB04 - Monitor Benchmark
+
+Three measurements of monitor.py:
+
+1. What one sample costs: ProcSampler, which keeps the /proc files open
+   and reads them into one buffer, against opening and reading them anew
+   each time, and against psutil if it is installed; plus History.add().
+2. Overhead: samples at 10 Hz for --seconds, as monitor.py --interval 0.1
+   does, and reports the CPU time used as a share of one core. The check
+   at the end fails if it is over --max-overhead percent.
+3. Queries: fills a history with synthetic samples and times average(),
+   percentile() and rate() over 1 and 60 minutes, to show they cost the
+   same however many samples the window holds.
+
+Usage:
+    python benchmark_monitor.py
+    python benchmark_monitor.py --seconds 60 --max-overhead 0.5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+from monitor import PROC_MEMINFO, PROC_NET_DEV, PROC_STAT, History, Sample, make_sampler, psutil
+
+
+def reopening_sample(path="/"):
+    """Read the same files the simple way: open, read and close each one."""
+    for name in (PROC_STAT, PROC_MEMINFO, PROC_NET_DEV):
+        with open(name, "rb") as f:
+            f.read().splitlines()
+    os.statvfs(path)
+
+
+def psutil_sample(path="/"):
+    """Take the same readings through psutil."""
+    psutil.cpu_times()
+    psutil.virtual_memory()
+    psutil.disk_usage(path)
+    psutil.net_io_counters()
+
+
+def per_call(func, repeat):
+    """Microseconds per call of func."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def overhead(seconds, interval=0.1):
+    """Sample every interval for seconds; return the CPU time used, in percent of one core."""
+    sampler = make_sampler()
+    history = History(interval)
+    started = time.monotonic()
+    cpu_started = time.process_time()
+    taken = 0
+    while time.monotonic() - started < seconds:
+        history.add(sampler.sample())
+        taken += 1
+        delay = started + taken * interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    sampler.close()
+    return (time.process_time() - cpu_started) / (time.monotonic() - started) * 100, taken
+
+
+def synthetic_history(interval, minutes):
+    """Return a History over (1, minutes) minutes, filled with random samples."""
+    history = History(interval, (1, minutes))
+    busy = total = sent = received = 0
+    for number in range(history.capacity + 100):
+        total += 100
+        busy += random.randint(0, 100)
+        sent += random.randint(0, 10**6)
+        received += random.randint(0, 10**7)
+        history.add(Sample(number * interval, busy, total, 16 << 30, random.randint(4 << 30, 12 << 30),
+                           512 << 30, 300 << 30, 212 << 30, sent, received))
+    return history
+
+
+def main():
+    """Run the three measurements and print their tables."""
+    parser = argparse.ArgumentParser(description="Benchmark the monitor's sampler and history.")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Seconds to sample at 10 Hz (default: 30)")
+    parser.add_argument("--max-overhead", type=float, default=0.5,
+                        help="Most CPU the 10 Hz sampler may use, in percent of one core (default: 0.5)")
+    args = parser.parse_args()
+
+    print("Monitor Benchmark")
+    print("=================")
+
+    sampler = make_sampler()
+    history = History(0.1)
+    print(f"\n1. One sample ({type(sampler).__name__})\n")
+    print(f"{'Method':<36} {'us per sample':>14}")
+    print(f"{'sampler.sample()':<36} {per_call(sampler.sample, 2000):>14.1f}")
+    print(f"{'open/read/close each file':<36} {per_call(reopening_sample, 2000):>14.1f}")
+    if psutil is not None:
+        print(f"{'psutil (4 calls)':<36} {per_call(psutil_sample, 2000):>14.1f}")
+    else:
+        print(f"{'psutil (4 calls)':<36} {'not installed':>14}")
+    sample = sampler.sample()
+    print(f"{'history.add()':<36} {per_call(lambda: history.add(sample), 2000):>14.1f}")
+    sampler.close()
+
+    print(f"\n2. Sampling at 10 Hz for {args.seconds:g} s\n")
+    percent, taken = overhead(args.seconds)
+    print(f"{taken} samples, CPU used: {percent:.3f}% of one core")
+
+    print("\n3. Queries on a history of samples every 0.1 s\n")
+    history = synthetic_history(0.1, 60)
+    print(f"{'Query':<28} {'1 minute (us)':>14} {'60 minutes (us)':>16}")
+    queries = (
+        ("average('cpu')", lambda window: history.average("cpu", window)),
+        ("percentile('cpu', 95)", lambda window: history.percentile("cpu", 95, window)),
+        ("percentile('received', 95)", lambda window: history.percentile("received", 95, window)),
+        ("rate('net_recv')", lambda window: history.rate("net_recv", window)),
+    )
+    for label, query in queries:
+        short = per_call(lambda: query(1), 2000)
+        long = per_call(lambda: query(60), 2000)
+        print(f"{label:<28} {short:>14.1f} {long:>16.1f}")
+    print(f"\nThe 1 minute window holds 600 samples, the 60 minute one {history.capacity - 1}.")
+
+    ok = percent <= args.max_overhead
+    print(f"\nSampler overhead at 10 Hz under {args.max_overhead:g}% of one core: {'yes' if ok else 'NO'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+LAB04 - Process Tracker Benchmark
+
+Builds synthetic /proc trees of 1,000 to 30,000 processes and times a tick
+of the incremental ProcessTracker against a full walk, which reads every
+/proc/<pid>/stat each tick and sorts them all, as a simple `top` does.
+
+In the synthetic tree 1% of the processes are busy, each at its own CPU
+rate, and have been for a while. Every tick, 0.1% of the processes exit
+and as many new ones start, and one in five ticks a busy process goes
+idle while an idle one gets busy. Both trackers see the same tree at the
+same simulated times; the benchmark reports how many of the full walk's
+top 10 by CPU the tracker's top 10 has, on average, and how much of their
+CPU use it shows. Up to FULL_SCAN processes the tracker reads them all
+and should match it; past that, busy processes it hasn't found yet make
+up the difference, as its list lags by up to sqrt(n) / SCAN_FACTOR ticks.
+
+Usage:
+    python benchmark_processes.py
+    python benchmark_processes.py --counts 1000,10000,100000 --ticks 50
+"""
+
+import argparse
+import heapq
+import os
+import random
+import sys
+import tempfile
+import time
+
+from processes import ProcessTracker
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+TOP = 10
+
+
+class SyntheticProc:
+    """A directory that looks like /proc to the trackers: uptime, and <pid>/stat and cmdline."""
+
+    def __init__(self, root, count, busy=0.01, churn=0.001, swaps=0.2, seed=1):
+        self.root = root
+        self.rng = random.Random(seed)
+        self.uptime = 10_000.0
+        self.next_pid = 100
+        self.ticks = {}        # pid -> CPU ticks used
+        self.starts = {}       # pid -> start time, in clock ticks after boot
+        self.rss = {}          # pid -> resident pages
+        self.rates = {}        # pid -> CPU ticks per second, for busy processes
+        self.churn = max(1, int(count * churn))
+        self.swaps = swaps
+        self._write_uptime()
+        for _ in range(count):
+            self.spawn(age=self.rng.uniform(100, 9000))
+        for pid in self.rng.sample(sorted(self.ticks), max(1, int(count * busy))):
+            self.rates[pid] = self.rng.uniform(0.05, 1.0) * CLOCK_TICKS
+            # Busy since it started
+            self.ticks[pid] = int(self.rates[pid] * (self.uptime - self.starts[pid] / CLOCK_TICKS))
+            self._write_stat(pid)
+
+    def _write_uptime(self):
+        with open(os.path.join(self.root, "uptime"), "w") as f:
+            f.write(f"{self.uptime:.2f} 0.00\n")
+
+    def _write_stat(self, pid):
+        fields = ["S", "1", str(pid), str(pid), "0", "-1", "4194560", "100", "0", "0", "0",
+                  str(self.ticks[pid]), "0", "0", "0", "20", "0", "1", "0", str(self.starts[pid]),
+                  "10485760", str(self.rss[pid])] + ["0"] * 28
+        with open(os.path.join(self.root, str(pid), "stat"), "w") as f:
+            f.write(f"{pid} (worker {pid}) {' '.join(fields)}\n")
+
+    def spawn(self, age=0.0):
+        """Start a new idle process, age seconds ago."""
+        pid = self.next_pid
+        self.next_pid += 1
+        os.mkdir(os.path.join(self.root, str(pid)))
+        with open(os.path.join(self.root, str(pid), "cmdline"), "w") as f:
+            f.write(f"/usr/bin/worker\0--id\0{pid}\0")
+        self.ticks[pid] = 0
+        self.starts[pid] = int((self.uptime - age) * CLOCK_TICKS)
+        self.rss[pid] = self.rng.randint(1, 50_000)
+        self._write_stat(pid)
+
+    def exit(self, pid):
+        """End a process."""
+        for name in ("stat", "cmdline"):
+            os.remove(os.path.join(self.root, str(pid), name))
+        os.rmdir(os.path.join(self.root, str(pid)))
+        del self.ticks[pid], self.starts[pid], self.rss[pid]
+        self.rates.pop(pid, None)
+
+    def advance(self, seconds):
+        """Let seconds pass: busy processes use CPU, and some processes come and go."""
+        self.uptime += seconds
+        self._write_uptime()
+        if self.rng.random() < self.swaps:
+            idle = self.rng.choice(sorted(self.ticks.keys() - self.rates.keys()))
+            self.rates[idle] = self.rates.pop(self.rng.choice(sorted(self.rates)))
+        for pid in self.rng.sample(sorted(self.ticks), self.churn):
+            self.exit(pid)
+        for _ in range(self.churn):
+            self.spawn()
+        for pid, rate in self.rates.items():
+            self.ticks[pid] += int(rate * seconds)
+            self._write_stat(pid)
+
+
+class FullWalk:
+    """Reads every process each tick and sorts them all."""
+
+    def __init__(self, proc):
+        self.proc = proc
+        self._last = {}
+
+    def update(self, now):
+        """Return the top processes by CPU since the last update, as (cpu, pid)."""
+        current = {}
+        usage = []
+        for name in os.listdir(self.proc):
+            if not name.isdigit():
+                continue
+            try:
+                with open(os.path.join(self.proc, name, "stat"), "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            fields = data[data.rfind(b")") + 2:].split()
+            ticks = int(fields[11]) + int(fields[12])
+            current[name] = (ticks, now)
+            if name in self._last:
+                last_ticks, last_time = self._last[name]
+                usage.append((100.0 * (ticks - last_ticks) / CLOCK_TICKS / (now - last_time), name))
+        self._last = current
+        return [(cpu, int(name)) for cpu, name in heapq.nlargest(TOP, usage) if cpu > 0]
+
+
+def run(count, ticks):
+    """Time both trackers on a tree of count processes; return their results."""
+    with tempfile.TemporaryDirectory(dir="/dev/shm" if os.path.isdir("/dev/shm") else None) as root:
+        tree = SyntheticProc(root, count)
+        tracker = ProcessTracker(TOP, "cpu", proc=root)
+        walk = FullWalk(root)
+        now = 0.0
+        tracker.update(now)
+        walk.update(now)
+        tracker_time = walk_time = 0.0
+        reads = found = 0
+        shown = total = 0.0
+        for _ in range(ticks):
+            tree.advance(1.0)
+            now += 1.0
+            started = time.perf_counter()
+            tracker.update(now)
+            top = tracker.top()
+            tracker_time += time.perf_counter() - started
+            reads += tracker.reads
+
+            started = time.perf_counter()
+            expected = walk.update(now)
+            walk_time += time.perf_counter() - started
+
+            pids = {info.pid for info in top}
+            found += sum(pid in pids for _, pid in expected)
+            shown += sum(cpu for cpu, pid in expected if pid in pids)
+            total += sum(cpu for cpu, _ in expected)
+    return (walk_time / ticks * 1000, tracker_time / ticks * 1000, reads / ticks,
+            found / ticks, shown / total)
+
+
+def main():
+    """Run the benchmark for each process count and print a table."""
+    parser = argparse.ArgumentParser(description="Benchmark the incremental process tracker.")
+    parser.add_argument("--counts", default="1000,10000,30000",
+                        help="Process counts to try, comma-separated (default: 1000,10000,30000)")
+    parser.add_argument("--ticks", type=int, default=30, help="Ticks timed per count (default: 30)")
+    args = parser.parse_args()
+
+    print("Process Tracker Benchmark")
+    print("=========================")
+    print(f"\nTop {TOP} by CPU, {args.ticks} ticks of 1 s each\n")
+    print(f"{'Processes':>10} {'Full walk (ms)':>15} {'Tracker (ms)':>13} {'Stat reads':>11} "
+          f"{'Top 10 found':>13} {'CPU shown':>10}")
+    ok = True
+    for count in (int(part) for part in args.counts.split(",")):
+        walk_ms, tracker_ms, reads, found, shown = run(count, args.ticks)
+        ok = ok and tracker_ms < walk_ms
+        print(f"{count:>10} {walk_ms:>15.1f} {tracker_ms:>13.1f} {reads:>11.0f} "
+              f"{found:>13.1f} {shown:>10.0%}")
+    print("\nTop 10 found: how many of the full walk's top 10 the tracker's top 10 has, on average.")
+    print("CPU shown: how much of their CPU use that is.")
+    print(f"\nTracker faster than the full walk at every count: {'yes' if ok else 'NO'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
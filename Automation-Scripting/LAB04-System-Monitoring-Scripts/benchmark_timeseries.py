@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+LAB04 - Time-Series Store Benchmark
+
+Writes --days of simulated per-second metrics into a TimeSeriesStore and
+measures:
+
+1. Size: bytes on disk per stored value (one series at one time) and per
+   sample (all five series), rollups included, and how long append() takes.
+2. Queries: an hour of raw samples and a day of 1m rollups, which
+   query() picks for those ranges, the whole range in 1h rollups, and for
+   comparison a day of raw samples.
+3. Correctness: that the raw samples read back are exactly the ones
+   written, as stored (to 0.1% and whole bytes per second).
+
+The simulated host has a daily CPU cycle with noise and bursts, memory
+that creeps up and is freed now and then, a disk that slowly fills, and
+bursty network traffic with idle seconds in between. Timestamps jitter by
+a few milliseconds, as a real sampling loop's do.
+
+Usage:
+    python benchmark_timeseries.py
+    python benchmark_timeseries.py --days 7
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+from timeseries import SCALES, SERIES, TimeSeriesStore
+
+
+def simulate(start, seconds, seed=1):
+    """Yield (time, values) for a simulated host, one sample per second."""
+    rng = random.Random(seed)
+    memory, disk = 40.0, 55.0
+    burst = 0
+    for second in range(seconds):
+        daily = math.sin(2 * math.pi * second / 86400)
+        if burst == 0 and rng.random() < 0.002:
+            burst = rng.randint(5, 120)
+        burst = max(burst - 1, 0)
+        cpu = 25 + 15 * daily + rng.gauss(0, 4) + (50 if burst else 0)
+        if rng.random() < 0.05:
+            memory += rng.uniform(0, 0.3)
+        if memory > 80 or rng.random() < 0.0002:
+            memory = rng.uniform(35, 45)
+        disk += 0.0001
+        idle = rng.random() < 0.4
+        values = {
+            "cpu": min(max(cpu, 0.0), 100.0),
+            "memory": memory,
+            "disk": disk,
+            "sent": 0 if idle else int(rng.lognormvariate(8, 1.5)),
+            "received": 0 if idle else int(rng.lognormvariate(9, 1.5)),
+        }
+        yield start + second + rng.uniform(-0.003, 0.003), values
+
+
+def timed(func, *args):
+    """Run func; return its result and the milliseconds it took."""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    """Fill a store with simulated days, then measure its size and queries."""
+    parser = argparse.ArgumentParser(description="Benchmark the time-series store.")
+    parser.add_argument("--days", type=float, default=2.0, help="Days of per-second samples (default: 2)")
+    parser.add_argument("--max-bytes", type=float, default=2.0,
+                        help="Most bytes each stored value may take (default: 2)")
+    args = parser.parse_args()
+
+    print("Time-Series Store Benchmark")
+    print("===========================")
+
+    seconds = int(args.days * 86400)
+    start = 1_700_000_000 - 1_700_000_000 % 86400
+    end = start + seconds
+    with tempfile.TemporaryDirectory() as workdir:
+        store = TimeSeriesStore(os.path.join(workdir, "metrics"))
+        written = []
+        started = time.perf_counter()
+        for when, values in simulate(start, seconds):
+            store.append(when, values)
+            if round(when * 1000) >= (end - 3600) * 1000:  # As samples() compares them
+                written.append((when, values))
+        append_us = (time.perf_counter() - started) / seconds * 1e6
+        store.close()
+
+        sizes = {name: os.path.getsize(os.path.join(workdir, "metrics", name))
+                 for name in ("raw.tsd", "1m.tsd", "1h.tsd")}
+        total = sum(sizes.values())
+        print(f"\n1. {seconds} samples of {len(SERIES)} series ({args.days:g} days at 1 Hz)\n")
+        for name, size in sizes.items():
+            print(f"{name:<10} {size / 1024:>10.1f} KB")
+        per_value = total / (seconds * len(SERIES))
+        print(f"{'Total':<10} {total / 1024:>10.1f} KB: {per_value:.2f} bytes per value, "
+              f"{total / seconds:.2f} per sample")
+        print(f"append() takes {append_us:.1f} us per sample")
+
+        store = TimeSeriesStore(os.path.join(workdir, "metrics"), readonly=True)
+        print(f"\n2. Queries\n")
+        print(f"{'Range':<26} {'Resolution':>10} {'Rows':>8} {'Time (ms)':>10}")
+        queries = (
+            ("last hour", end - 3600, end, None),
+            ("last day", end - 86400, end, None),
+            (f"all {args.days:g} days", start, end, "1h"),
+            ("last day, every sample", end - 86400, end, "raw"),
+        )
+        for label, low, high, resolution in queries:
+            (used, rows), elapsed = timed(store.query, low, high, resolution)
+            print(f"{label:<26} {used:>10} {len(rows):>8} {elapsed:>10.1f}")
+
+        rows = store.samples(end - 3600, end)
+        store.close()
+        exact = len(rows) == len(written) and all(
+            round(row.time * 1000) == round(when * 1000)
+            and all(value == round(values[name] * SCALES[name]) / SCALES[name]
+                    for name, value in zip(SERIES, row.mean))
+            for row, (when, values) in zip(rows, written))
+        print(f"\n3. The last hour's {len(rows)} samples read back exactly: {'yes' if exact else 'NO'}")
+
+    ok = exact and per_value < args.max_bytes
+    print(f"\nUnder {args.max_bytes:g} bytes per value, and read back exactly: {'yes' if ok else 'NO'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,44 +2,527 @@
 """
 LAB04 - System Monitoring Scripts with Python
 
-This script collects and displays real-time system metrics using the psutil library.
-It provides an overview of CPU, memory, disk, and network usage.
+This script collects and displays real-time system metrics: CPU, memory,
+disk, and network usage.
+
+On Linux it reads /proc/stat, /proc/meminfo, /proc/net/dev and statvfs()
+itself, keeping the files open and reading them into one reused buffer,
+which costs a fraction of the equivalent psutil calls; elsewhere it uses
+psutil. Sampling at 10 Hz takes well under 0.5% of one core.
+
+Every sample also goes into a History: fixed-size ring buffers with
+running sums and sliding histograms, so averages, percentiles and rates
+over the last 1, 5 or 15 minutes cost the same however many samples the
+window holds.
+
+With --store, the samples are also kept on disk, in the compact
+time-series files of timeseries.py, which can be queried later:
+
+    python timeseries.py metrics/ --hours 24
+
+With --processes N, the top N processes by CPU (or --sort rss, by
+memory) are shown too, tracked incrementally by processes.py so that a
+refresh doesn't read every process on the host.
 
 Usage:
-    python monitor.py
+    python monitor.py                          # Sample and refresh every second
+    python monitor.py --interval 0.1           # Sample at 10 Hz, refresh every second
+    python monitor.py --windows 1,10,60        # History over 1, 10 and 60 minutes
+    python monitor.py --path /home --no-loop   # One measurement of /home's disk
+    python monitor.py --store metrics/         # Also keep every sample in metrics/
+    python monitor.py --processes 10           # Also show the top 10 processes by CPU
 """
 
-# TODO: Import the necessary libraries
-# You'll need psutil for system metrics and time for the monitoring loop
+import argparse
+import datetime
+import math
+import os
+import signal
+import sys
+import time
+from array import array
+from collections import namedtuple
 
+from processes import KEYS, ProcessTracker, format_processes
+from timeseries import TimeSeriesStore
 
-# TODO: Define a function to collect system metrics
-# The function should gather:
-# - CPU usage percentage
-# - Memory usage (used, available, percentage)
-# - Disk usage (total, used, free, percentage)
-# - Network I/O statistics (optional)
+try:
+    import psutil
+except ImportError:  # Optional: only needed where /proc is missing (macOS, Windows)
+    psutil = None
 
+# One reading of the counters and gauges. cpu_busy and cpu_total are in
+# clock ticks since boot, net_sent and net_recv in bytes since boot.
+Sample = namedtuple("Sample", "time cpu_busy cpu_total mem_total mem_available "
+                              "disk_total disk_used disk_free net_sent net_recv")
 
-# TODO: Define a function to display the metrics in a readable format
-# Consider using formatting to make the output clear and easy to read
+# What History derives from each pair of samples: percentages, and bytes per second
+METRICS = ("cpu", "memory", "disk", "sent", "received")
+PERCENT_METRICS = ("cpu", "memory", "disk")
 
+PROC_STAT = "/proc/stat"
+PROC_MEMINFO = "/proc/meminfo"
+PROC_NET_DEV = "/proc/net/dev"
 
-# TODO: Implement a continuous monitoring loop (optional)
-# This should:
-# - Call your collection and display functions
-# - Sleep for a specified interval
-# - Allow for clean termination with Ctrl+C
+# Starting size of the read buffer; it grows if a file doesn't fit
+READ_SIZE = 8192
 
+# Histogram resolution: 0.1% steps for percentages, 16 steps per doubling
+# (4.4% apart) for rates, which covers up to 1 PB/s in 801 buckets
+PERCENT_STEPS = 10
+RATE_STEPS = 16
+PERCENT_BUCKETS = 100 * PERCENT_STEPS + 1
+RATE_BUCKETS = 50 * RATE_STEPS + 1
+
+# Windows the history keeps, in minutes
+DEFAULT_WINDOWS = (1, 5, 15)
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_REFRESH = 1.0
+
+# Moves the cursor home and clears the screen, without running `clear`
+CLEAR_SCREEN = "\033[H\033[2J"
+
+
+def get_size(bytes_value, suffix="B"):
+    """
+    Scale bytes to a human-readable format.
+
+    Args:
+        bytes_value (float): Size in bytes
+        suffix (str): Unit suffix to use
+
+    Returns:
+        str: Formatted size string with unit
+    """
+    factor = 1024
+    for unit in ["", "K", "M", "G", "T"]:
+        if abs(bytes_value) < factor:
+            return f"{bytes_value:.1f} {unit}{suffix}"
+        bytes_value /= factor
+    return f"{bytes_value:.1f} P{suffix}"
+
+
+class ProcSampler:
+    """
+    Reads samples from /proc and statvfs() on Linux.
+
+    The /proc files stay open and are re-read from offset 0 with preadv()
+    into the same buffer, so a sample opens nothing and allocates little.
+    """
+
+    def __init__(self, path="/"):
+        self.path = path
+        self._stat = os.open(PROC_STAT, os.O_RDONLY)
+        self._meminfo = os.open(PROC_MEMINFO, os.O_RDONLY)
+        self._net_dev = os.open(PROC_NET_DEV, os.O_RDONLY)
+        self._buffer = bytearray(READ_SIZE)
+
+    def _read(self, fd):
+        """Read a whole /proc file into the buffer; return its length."""
+        while True:
+            length = os.preadv(fd, [self._buffer], 0)
+            if length < len(self._buffer):
+                return length
+            # It may not all have fitted: double the buffer and read again
+            self._buffer.extend(bytes(len(self._buffer)))
+
+    def _meminfo_field(self, key, length):
+        """Return the value of a /proc/meminfo line in bytes, or None if it's missing."""
+        start = self._buffer.find(key, 0, length)
+        if start < 0:
+            return None
+        start += len(key)
+        return int(self._buffer[start:self._buffer.find(b"kB", start, length)]) * 1024
+
+    def sample(self):
+        """Take one Sample."""
+        now = time.monotonic()
+
+        # The first line sums all CPUs: user nice system idle iowait irq softirq steal
+        self._read(self._stat)
+        ticks = [int(field) for field in self._buffer[5:self._buffer.find(b"\n")].split()[:8]]
+        cpu_total = sum(ticks)
+        cpu_busy = cpu_total - ticks[3] - ticks[4]
+
+        length = self._read(self._meminfo)
+        mem_total = self._meminfo_field(b"MemTotal:", length)
+        mem_available = self._meminfo_field(b"MemAvailable:", length)
+        if mem_available is None:  # Kernels before 3.14
+            mem_available = sum(self._meminfo_field(key, length) or 0
+                                for key in (b"MemFree:", b"Buffers:", b"Cached:"))
+
+        disk = os.statvfs(self.path)
+        disk_free = disk.f_bavail * disk.f_frsize
+        disk_used = (disk.f_blocks - disk.f_bfree) * disk.f_frsize
+
+        # Two header lines, then "name: 8 receive counters, 8 transmit counters"
+        length = self._read(self._net_dev)
+        net_sent = net_recv = 0
+        for line in self._buffer[:length].splitlines()[2:]:
+            name, _, counters = line.partition(b":")
+            if name.strip() == b"lo":  # Loopback traffic never leaves the host
+                continue
+            counters = counters.split()
+            net_recv += int(counters[0])
+            net_sent += int(counters[8])
+
+        return Sample(now, cpu_busy, cpu_total, mem_total, mem_available,
+                      disk_used + disk_free, disk_used, disk_free, net_sent, net_recv)
+
+    def close(self):
+        """Close the /proc files."""
+        for fd in (self._stat, self._meminfo, self._net_dev):
+            os.close(fd)
+
+
+class PsutilSampler:
+    """Takes the same samples as ProcSampler through psutil, where there is no /proc."""
+
+    def __init__(self, path="/"):
+        if psutil is None:
+            raise RuntimeError("this system has no /proc: pip install psutil")
+        self.path = path
+
+    def sample(self):
+        """Take one Sample."""
+        now = time.monotonic()
+        cpu = psutil.cpu_times()
+        cpu_idle = cpu.idle + getattr(cpu, "iowait", 0.0)
+        cpu_total = sum(cpu) - getattr(cpu, "guest", 0.0) - getattr(cpu, "guest_nice", 0.0)
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.path)
+        net = psutil.net_io_counters()
+        return Sample(now, cpu_total - cpu_idle, cpu_total, memory.total, memory.available,
+                      disk.used + disk.free, disk.used, disk.free, net.bytes_sent, net.bytes_recv)
+
+    def close(self):
+        """Nothing to close."""
+
+
+def make_sampler(path="/"):
+    """Return a ProcSampler where /proc exists, a PsutilSampler elsewhere."""
+    if os.path.exists(PROC_STAT):
+        return ProcSampler(path)
+    return PsutilSampler(path)
+
+
+def _bucket(metric, value):
+    """The histogram bucket of a metric's value."""
+    if metric in PERCENT_METRICS:
+        return min(int(value * PERCENT_STEPS + 0.5), PERCENT_BUCKETS - 1)
+    if value < 1:
+        return 0
+    return min(int(math.log2(value) * RATE_STEPS) + 1, RATE_BUCKETS - 1)
+
+
+def _bucket_value(metric, bucket):
+    """The value a histogram bucket stands for (the middle of its range)."""
+    if metric in PERCENT_METRICS:
+        return bucket / PERCENT_STEPS
+    if bucket == 0:
+        return 0.0
+    return 2 ** ((bucket - 0.5) / RATE_STEPS)
+
+
+class History:
+    """
+    The last samples in fixed-size ring buffers, with O(1) statistics.
+
+    From each pair of samples it derives METRICS: CPU, memory and disk use
+    in percent, and bytes sent and received per second. Each metric keeps
+    a ring of values and a ring of running totals, so the average over the
+    last k samples is one subtraction. For each window it also keeps a
+    histogram of the values in the window, updated as values come in and
+    drop out, so a percentile is found by walking a fixed number of
+    buckets (to 0.1% for percentages, 4.4% for rates). The raw samples are
+    kept too, so a counter's rate over a window is one subtraction as well.
+    """
+
+    def __init__(self, interval, windows=DEFAULT_WINDOWS):
+        """
+        Args:
+            interval (float): Seconds between samples
+            windows (tuple): Window lengths in minutes
+        """
+        self.interval = interval
+        self.windows = tuple(sorted(windows))
+        # Samples in each window, and room for the longest plus the one before it
+        self._lengths = {window: max(1, round(window * 60 / interval)) for window in self.windows}
+        self.capacity = max(self._lengths.values()) + 1
+        self.count = 0  # Samples added, ever
+        self._raw = {field: array("d", bytes(8 * self.capacity)) for field in Sample._fields}
+        self._values = {metric: array("d", bytes(8 * self.capacity)) for metric in METRICS}
+        self._totals = {metric: array("d", bytes(8 * self.capacity)) for metric in METRICS}
+        self._histograms = {
+            (metric, window): [0] * (PERCENT_BUCKETS if metric in PERCENT_METRICS else RATE_BUCKETS)
+            for metric in METRICS for window in self.windows}
+        self._previous = None
+
+    def add(self, sample):
+        """Add a sample; metrics start with the second one."""
+        previous, self._previous = self._previous, sample
+        if previous is None:
+            return
+        elapsed = (sample.time - previous.time) or 1e-9
+        ticks = sample.cpu_total - previous.cpu_total
+        values = {
+            "cpu": 100.0 * (sample.cpu_busy - previous.cpu_busy) / ticks if ticks > 0 else 0.0,
+            "memory": 100.0 * (sample.mem_total - sample.mem_available) / sample.mem_total,
+            "disk": 100.0 * sample.disk_used / (sample.disk_used + sample.disk_free or 1),
+            # Counters start over if an interface goes away
+            "sent": max(sample.net_sent - previous.net_sent, 0) / elapsed,
+            "received": max(sample.net_recv - previous.net_recv, 0) / elapsed,
+        }
+
+        index = self.count % self.capacity
+        last = (self.count - 1) % self.capacity
+        for field, value in zip(Sample._fields, sample):
+            self._raw[field][index] = value
+        for metric, value in values.items():
+            self._values[metric][index] = value
+            self._totals[metric][index] = value + (self._totals[metric][last] if self.count else 0.0)
+            bucket = _bucket(metric, value)
+            for window, length in self._lengths.items():
+                histogram = self._histograms[metric, window]
+                histogram[bucket] += 1
+                if self.count >= length:  # The value that just left the window
+                    histogram[_bucket(metric, self._values[metric][(self.count - length) % self.capacity])] -= 1
+        self.count += 1
+
+    def _samples(self, minutes):
+        """How many of the last samples the last minutes cover, limited to what's there."""
+        return min(max(1, round(minutes * 60 / self.interval)), self.count, self.capacity - 1)
+
+    def latest(self, metric):
+        """Return a metric's latest value (None before the second sample)."""
+        if not self.count:
+            return None
+        return self._values[metric][(self.count - 1) % self.capacity]
+
+    def average(self, metric, minutes):
+        """Return a metric's average over the last minutes (None before the second sample)."""
+        if not self.count:
+            return None
+        samples = self._samples(minutes)
+        totals = self._totals[metric]
+        end = totals[(self.count - 1) % self.capacity]
+        start = totals[(self.count - 1 - samples) % self.capacity] if self.count > samples else 0.0
+        return (end - start) / samples
+
+    def percentile(self, metric, percent, window):
+        """
+        Return a metric's percentile over one of the windows.
+
+        Args:
+            metric (str): One of METRICS
+            percent (float): The percentile, from 0 to 100
+            window (int): One of the windows, in minutes
+
+        Returns:
+            float: The value, or None before the second sample
+
+        Raises:
+            KeyError: If window isn't one of the windows
+        """
+        histogram = self._histograms[metric, window]
+        samples = min(self.count, self._lengths[window])
+        if not samples:
+            return None
+        rank = max(1, math.ceil(percent / 100 * samples))
+        seen = 0
+        for bucket, count in enumerate(histogram):
+            seen += count
+            if seen >= rank:
+                return _bucket_value(metric, bucket)
+        return _bucket_value(metric, len(histogram) - 1)
+
+    def rate(self, field, minutes):
+        """Return how fast a Sample field grew per second over the last minutes (None without two samples)."""
+        if self.count < 2:
+            return None
+        samples = min(self._samples(minutes), self.count - 1)
+        now = (self.count - 1) % self.capacity
+        then = (self.count - 1 - samples) % self.capacity
+        elapsed = self._raw["time"][now] - self._raw["time"][then]
+        return (self._raw[field][now] - self._raw[field][then]) / elapsed if elapsed > 0 else 0.0
+
+    def span(self):
+        """Return the seconds of history kept so far."""
+        return min(self.count, self.capacity - 1) * self.interval
+
+
+def display_metrics(sample, history, path="/", clear=False, processes=None):
+    """
+    Display the latest sample and the history's statistics.
+
+    Args:
+        sample (Sample): The latest sample
+        history (History): The history the sample was added to
+        path (str): The filesystem the disk figures are for
+        clear (bool): Whether to clear the screen first
+        processes (ProcessTracker): If given, its top processes are shown too
+    """
+    lines = []
+    lines.append(f"=== System Metrics ({datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}) ===\n")
+
+    cpu_percent = history.latest("cpu") or 0.0
+    filled = int(cpu_percent / 2.5)
+    lines.append(f"CPU Usage:    {cpu_percent:>5.1f}%  [{'#' * filled}{'.' * (40 - filled)}]\n")
+
+    mem_used = sample.mem_total - sample.mem_available
+    lines.append("MEMORY:")
+    lines.append(f"  Total:     {get_size(sample.mem_total):>10}")
+    lines.append(f"  Used:      {get_size(mem_used):>10} ({history.latest('memory') or 0.0:.1f}%)")
+    lines.append(f"  Available: {get_size(sample.mem_available):>10}\n")
+
+    lines.append(f"DISK ({path}):")
+    lines.append(f"  Total:     {get_size(sample.disk_total):>10}")
+    lines.append(f"  Used:      {get_size(sample.disk_used):>10} ({history.latest('disk') or 0.0:.1f}%)")
+    lines.append(f"  Free:      {get_size(sample.disk_free):>10}\n")
+
+    lines.append("NETWORK:")
+    lines.append(f"  Sent:      {get_size(sample.net_sent):>10}  ({get_size(history.latest('sent') or 0, 'B/s')})")
+    lines.append(f"  Received:  {get_size(sample.net_recv):>10}  ({get_size(history.latest('received') or 0, 'B/s')})\n")
+
+    span = datetime.timedelta(seconds=int(history.span()))
+    lines.append(f"HISTORY ({history.count} samples every {history.interval:g}s, {span} kept):")
+    lines.append("  " + " " * 14 + "".join(f"{f'{window}m':>14}" for window in history.windows))
+    for label, metric in (("CPU", "cpu"), ("Memory", "memory"), ("Disk", "disk")):
+        averages = (history.average(metric, window) for window in history.windows)
+        lines.append(f"  {label + ' avg':<14}" + "".join(f"{value or 0.0:>13.1f}%" for value in averages))
+        p95 = (history.percentile(metric, 95, window) for window in history.windows)
+        lines.append(f"  {label + ' p95':<14}" + "".join(f"{value or 0.0:>13.1f}%" for value in p95))
+    for label, field, metric in (("Sent", "net_sent", "sent"), ("Received", "net_recv", "received")):
+        rates = (history.rate(field, window) for window in history.windows)
+        lines.append(f"  {label + '/s':<14}" + "".join(f"{get_size(value or 0, 'B/s'):>14}" for value in rates))
+        p95 = (history.percentile(metric, 95, window) for window in history.windows)
+        lines.append(f"  {label + '/s p95':<14}" + "".join(f"{get_size(value or 0, 'B/s'):>14}" for value in p95))
+
+    if processes is not None:
+        lines.append(f"\nTOP PROCESSES (by {processes.key}, {len(processes)} running):")
+        lines.append("\n".join("  " + line for line in format_processes(processes.top()).splitlines()))
+
+    lines.append("\nPress Ctrl+C to stop monitoring.")
+    print((CLEAR_SCREEN if clear else "") + "\n".join(lines), flush=True)
+
+
+def monitor(sampler, history, refresh=DEFAULT_REFRESH, path="/", store=None, processes=None):
+    """
+    Sample every history.interval seconds, and display every refresh seconds.
+
+    Sleeps until the next sample is due, measured from the first, so that
+    the time the samples take doesn't add up into drift. If store is a
+    TimeSeriesStore, each sample's metrics are appended to it. If
+    processes is a ProcessTracker, it is updated at each display.
+    """
+    clear = sys.stdout.isatty()
+    started = time.monotonic()
+    next_display = started
+    taken = 0
+    while True:
+        sample = sampler.sample()
+        history.add(sample)
+        taken += 1
+        if store is not None and history.count:
+            store.append(time.time(), {metric: history.latest(metric) for metric in METRICS})
+        if sample.time >= next_display and history.count:
+            if processes is not None:
+                processes.update(sample.time)
+            display_metrics(sample, history, path, clear, processes)
+            next_display = sample.time + refresh
+        delay = started + taken * history.interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:  # Fell behind: skip the samples that were missed
+            taken = int((time.monotonic() - started) / history.interval) + 1
+
+
+def handle_signal(signum, frame):
+    """Stop on SIGTERM the same way as on Ctrl+C."""
+    raise KeyboardInterrupt
+
+
+def parse_windows(text):
+    """Parse a comma-separated list of minutes, like "1,5,15"."""
+    try:
+        windows = tuple(int(part) for part in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a list of minutes: {text!r}")
+    if not windows or min(windows) < 1:
+        raise argparse.ArgumentTypeError("windows must be at least 1 minute")
+    return windows
+
+
+def parse_arguments():
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Monitor system metrics")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"Seconds between samples (default: {DEFAULT_INTERVAL:g})")
+    parser.add_argument("--refresh", type=float, default=DEFAULT_REFRESH,
+                        help=f"Seconds between screen updates (default: {DEFAULT_REFRESH:g})")
+    parser.add_argument("--windows", type=parse_windows, default=DEFAULT_WINDOWS,
+                        help="History windows in minutes (default: 1,5,15)")
+    parser.add_argument("--path", default="/", help="Filesystem to report disk usage for (default: /)")
+    parser.add_argument("--store", metavar="DIR", help="Also keep every sample in time-series files in DIR")
+    parser.add_argument("--processes", type=int, default=0, metavar="N",
+                        help="Also show the top N processes (Linux only)")
+    parser.add_argument("--sort", choices=KEYS, default="cpu", help="Sort the processes by cpu or rss (default: cpu)")
+    parser.add_argument("--no-loop", action="store_true", help="Single measurement, no loop")
+    args = parser.parse_args()
+    if args.interval <= 0 or args.refresh <= 0:
+        parser.error("--interval and --refresh must be positive")
+    if args.processes < 0:
+        parser.error("--processes must not be negative")
+    return args
+
+
+def main():
+    """Main function to collect and display system metrics."""
+    args = parse_arguments()
 
-if __name__ == "__main__":
     print("System Monitoring Tool")
     print("=====================")
-    
-    # TODO: Implement your monitoring logic here
-    # Options:
-    # 1. Simple single measurement of system stats
-    # 2. Continuous monitoring with a loop and interval
+
+    try:
+        sampler = make_sampler(args.path)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    history = History(args.interval, args.windows)
+    processes = None
+    if args.processes:
+        if not os.path.isdir("/proc"):
+            print("Error: --processes needs /proc (Linux)", file=sys.stderr)
+            sys.exit(1)
+        processes = ProcessTracker(args.processes, args.sort)
+    store = TimeSeriesStore(args.store) if args.store and not args.no_loop else None
+    try:
+        if args.no_loop:
+            # CPU use and network rates need two samples
+            history.add(sampler.sample())
+            if processes is not None:
+                processes.update()
+            time.sleep(args.interval)
+            sample = sampler.sample()
+            history.add(sample)
+            if processes is not None:
+                processes.update()
+            display_metrics(sample, history, args.path, processes=processes)
+        else:
+            monitor(sampler, history, args.refresh, args.path, store, processes)
+    except KeyboardInterrupt:
+        print("\nMonitoring stopped.")
+    finally:
+        sampler.close()
+        if store is not None:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
 
 
 """
@@ -47,21 +530,27 @@ Sample output:
 
 === System Metrics (2023-06-01 14:30:22) ===
 
-CPU Usage:    23.5%  [##########...............]
+CPU Usage:     23.5%  [#########...............................]
 
 MEMORY:
-  Total:     16.0 GB
-  Used:       8.2 GB (51.3%)
-  Available:  7.8 GB
-  
+  Total:        16.0 GB
+  Used:          8.2 GB (51.3%)
+  Available:     7.8 GB
+
 DISK (/):
-  Total:    512.0 GB
-  Used:     298.5 GB (58.3%)
-  Free:     213.5 GB
-  
+  Total:       512.0 GB
+  Used:        298.5 GB (58.3%)
+  Free:        213.5 GB
+
 NETWORK:
-  Sent:      12.5 MB
-  Received:  45.8 MB
-  
+  Sent:         12.5 MB  (1.2 KB/s)
+  Received:     45.8 MB  (8.4 KB/s)
+
+HISTORY (3001 samples every 0.1s, 0:05:00 kept):
+                            1m            5m           15m
+  CPU avg                 21.7%         18.2%         18.2%
+  CPU p95                 41.0%         38.4%         38.4%
+  ...
+
 Press Ctrl+C to stop monitoring.
-""" 
\ No newline at end of file
+"""
@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+LAB04 - System Monitoring Scripts (Time-Series Module)
+
+Keeps the monitor's samples on disk, compactly enough for days of
+per-second metrics, in a directory of append-only files:
+
+    metrics/
+        meta.json   Format version, and the series with their scales
+        raw.tsd     One block per minute of samples, Gorilla-encoded
+        1m.tsd      One record per minute: min, mean and max of each
+                    series, and where the minute's block is in raw.tsd
+        1h.tsd      The same per hour, for the hours that are over
+
+Each value is stored as an integer: the metric times its scale (0.1% for
+the percentages, whole bytes per second for the rates). A block holds
+the first timestamp in milliseconds in its header, then column by column:
+for each sample the change of the time step (the "delta of delta",
+usually 0), then for each series the change of each value from the one
+before, in variable-length codes as in Facebook's Gorilla: a single 0 bit
+for no change, otherwise a few control bits and a zigzag integer of 7,
+11, 15, 20 or 64 bits. A series whose values jump about, like network
+traffic that comes and goes, is cheaper stored as the values themselves;
+one bit before each column says which it is. An idle host costs a few
+bits per sample, a busy one a byte or two per value.
+
+The rollup files are arrays of fixed-size records, read through mmap and
+searched by binary search, so a query for a day of 1m rollups or a month
+of 1h rollups takes milliseconds; a query for raw samples decodes only
+the minutes it covers. query() picks the resolution from the range.
+
+A minute is written, block first, when the first sample of the next one
+arrives, or by close(); a crash loses at most the minute in progress. On
+opening, anything after the last complete record is cut off.
+
+Usage:
+    python timeseries.py metrics/                       # Every sample of the last hour
+    python timeseries.py metrics/ --hours 24            # The last day, minute by minute
+    python timeseries.py metrics/ --hours 6 --resolution 1m
+"""
+
+import argparse
+import bisect
+import datetime
+import json
+import mmap
+import os
+import struct
+import time
+from collections import namedtuple
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+MAGIC = b"LAB04TS1"
+
+# Series in storage order, and the integer steps they are stored in
+SERIES = ("cpu", "memory", "disk", "sent", "received")
+SCALES = {"cpu": 10, "memory": 10, "disk": 10, "sent": 1, "received": 1}
+
+# Seconds per record of each rollup
+RESOLUTIONS = {"1m": 60, "1h": 3600}
+
+# query() returns raw samples for ranges up to RAW_SPAN seconds, 1m
+# rollups up to MINUTE_SPAN, and 1h rollups beyond
+RAW_SPAN = 3600
+MINUTE_SPAN = 3 * 24 * 3600
+
+# Block header: first timestamp (ms), samples, payload bytes
+BLOCK = struct.Struct("<qII")
+
+# Rollup record: start time (s), samples, offset of the block in raw.tsd
+# (1m only), then the min, mean and max of each series
+RECORD = struct.Struct(f"<IIQ{3 * len(SERIES)}f")
+
+# Control bits (value, width) and payload width of the variable-length
+# codes; a change of 0 is a single 0 bit
+CODES = ((0b10, 2, 7), (0b110, 3, 11), (0b1110, 4, 15), (0b11110, 5, 20), (0b11111, 5, 64))
+
+# One row of a query: each of minimum, mean and maximum has a value per
+# series. A raw sample is a row of count 1 with all three the same.
+Rollup = namedtuple("Rollup", "time count minimum mean maximum")
+
+
+class BitWriter:
+    """Packs values of any bit width into bytes, most significant bit first."""
+
+    def __init__(self):
+        self._bytes = bytearray()
+        self._bits = 0
+        self._pending = 0
+
+    def write(self, value, width):
+        """Append the low width bits of value."""
+        self._pending = (self._pending << width) | value
+        self._bits += width
+        while self._bits >= 8:
+            self._bits -= 8
+            self._bytes.append((self._pending >> self._bits) & 0xFF)
+        self._pending &= (1 << self._bits) - 1
+
+    def getvalue(self):
+        """Return the bytes written, the last one padded with 0 bits."""
+        if self._bits:
+            return bytes(self._bytes) + bytes([(self._pending << (8 - self._bits)) & 0xFF])
+        return bytes(self._bytes)
+
+
+class BitReader:
+    """Reads back what a BitWriter wrote."""
+
+    def __init__(self, data):
+        self._data = data
+        self._position = 0
+        self._bits = 0
+        self._pending = 0
+
+    def read(self, width):
+        """Return the next width bits as an integer."""
+        while self._bits < width:
+            self._pending = (self._pending << 8) | self._data[self._position]
+            self._position += 1
+            self._bits += 8
+        self._bits -= width
+        value = self._pending >> self._bits
+        self._pending &= (1 << self._bits) - 1
+        return value
+
+
+def write_change(writer, change):
+    """Write an integer change in the shortest code that holds it."""
+    if change == 0:
+        writer.write(0, 1)
+        return
+    zigzag = change * 2 if change > 0 else -change * 2 - 1
+    for control, control_width, width in CODES:
+        if zigzag < 1 << width:
+            writer.write(control, control_width)
+            writer.write(zigzag, width)
+            return
+    raise ValueError(f"change too large to encode: {change}")
+
+
+def read_change(reader):
+    """Read an integer change written by write_change()."""
+    if not reader.read(1):
+        return 0
+    # The control bits after the first 1: 0, 10, 110, 1110 or 1111
+    ones = 1
+    while ones < 4 and reader.read(1):
+        ones += 1
+    width = CODES[ones - 1][2] if ones < 4 else CODES[3 + reader.read(1)][2]
+    zigzag = reader.read(width)
+    return zigzag >> 1 if not zigzag & 1 else -(zigzag >> 1) - 1
+
+
+def _column_bits(column, deltas):
+    """The bits column takes, as deltas or as the values themselves."""
+    writer = BitWriter()
+    previous = 0
+    for value in column:
+        write_change(writer, value - previous)
+        if deltas:
+            previous = value
+    return writer._bits + 8 * len(writer._bytes)
+
+
+def encode_block(rows):
+    """
+    Encode samples as a block payload.
+
+    Args:
+        rows (list): (time in ms, values as integers) tuples, in time order
+
+    Returns:
+        bytes: The payload; the first time goes in the block header
+    """
+    writer = BitWriter()
+    previous_time = rows[0][0]
+    previous_step = 0
+    for when, _ in rows:
+        step = when - previous_time
+        write_change(writer, step - previous_step)
+        previous_time, previous_step = when, step
+
+    for column in zip(*(values for _, values in rows)):
+        deltas = _column_bits(column, True) <= _column_bits(column, False)
+        writer.write(deltas, 1)
+        previous = 0
+        for value in column:
+            write_change(writer, value - previous)
+            if deltas:
+                previous = value
+    return writer.getvalue()
+
+
+def decode_block(first_time, count, payload):
+    """Decode a block payload back into (time in ms, values as integers) tuples."""
+    reader = BitReader(payload)
+    times = []
+    when, step = first_time, 0
+    for _ in range(count):
+        step += read_change(reader)
+        when += step
+        times.append(when)
+
+    columns = []
+    for _ in SERIES:
+        if reader.read(1):
+            column = []
+            value = 0
+            for _ in range(count):
+                value += read_change(reader)
+                column.append(value)
+        else:
+            column = [read_change(reader) for _ in range(count)]
+        columns.append(column)
+    return list(zip(times, map(list, zip(*columns))))
+
+
+def merge(rollups, seconds):
+    """Combine rollups (in time order) into one per period of seconds."""
+    merged = []
+    for rollup in rollups:
+        start = rollup.time - rollup.time % seconds
+        if not merged or merged[-1].time != start:
+            merged.append(rollup._replace(time=start))
+            continue
+        last = merged[-1]
+        count = last.count + rollup.count
+        merged[-1] = Rollup(
+            start, count,
+            tuple(map(min, last.minimum, rollup.minimum)),
+            tuple((a * last.count + b * rollup.count) / count for a, b in zip(last.mean, rollup.mean)),
+            tuple(map(max, last.maximum, rollup.maximum)))
+    return merged
+
+
+def summarize(start, rows):
+    """Return the Rollup of raw (time in ms, integer values) rows."""
+    columns = [[value / SCALES[name] for value in column]
+               for name, column in zip(SERIES, zip(*(values for _, values in rows)))]
+    return Rollup(start, len(rows), tuple(map(min, columns)),
+                  tuple(sum(column) / len(rows) for column in columns), tuple(map(max, columns)))
+
+
+class _RecordTimes:
+    """The start times of a rollup file's records, as a sequence bisect can search."""
+
+    def __init__(self, data, count):
+        self._data = data
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        return struct.unpack_from("<I", self._data, len(MAGIC) + index * RECORD.size)[0]
+
+
+class TimeSeriesStore:
+    """
+    The directory of time-series files described in the module docstring.
+
+    append() takes the samples in time order; query() reads a range back.
+    A store opened read-only can be queried while a monitor writes to it,
+    and sees the samples written up to when it was opened.
+    """
+
+    def __init__(self, directory, readonly=False):
+        self.directory = directory
+        self.readonly = readonly
+        meta_path = os.path.join(directory, META_FILE)
+        meta = {"version": FORMAT_VERSION, "series": list(SERIES), "scales": SCALES}
+        if readonly or os.path.exists(meta_path):
+            with open(meta_path) as f:
+                if json.load(f) != meta:
+                    raise ValueError(f"{directory} holds time series in another format")
+        else:
+            os.makedirs(directory, exist_ok=True)
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+
+        self._files = {}
+        self._sizes = {}
+        self._maps = {}
+        for name in ("raw", *RESOLUTIONS):
+            self._open(name)
+        self._recover()
+
+        self._rows = []             # Samples of the minute in progress
+        self._minute = None         # Its start time, in seconds
+        self._next_hour = self._first_unrolled_hour()
+
+    def _open(self, name):
+        """Open one of the files for appending and reading, creating it if need be."""
+        f = open(os.path.join(self.directory, f"{name}.tsd"), "rb" if self.readonly else "a+b", buffering=0)
+        size = os.fstat(f.fileno()).st_size
+        if size == 0 and not self.readonly:
+            f.write(MAGIC)
+            size = len(MAGIC)
+        else:
+            f.seek(0)
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{f.name} is not a time-series file")
+        self._files[name] = f
+        self._sizes[name] = size
+
+    def _truncate(self, name, size):
+        """Cut a file down to size bytes (read-only, just ignore the rest)."""
+        if self._sizes[name] != size:
+            if not self.readonly:
+                self._files[name].truncate(size)
+                self._unmap(name)
+            self._sizes[name] = size
+
+    def _recover(self):
+        """Cut off whatever a crash left after the last complete record."""
+        for name in RESOLUTIONS:
+            self._truncate(name, len(MAGIC) + self._count(name) * RECORD.size)
+        count = self._count("1m")
+        raw_end = len(MAGIC)
+        self._last_time = None  # Time of the latest sample, in ms
+        if count:
+            offset = self._record(count - 1)[2]
+            data = self._map("raw")
+            first_time, rows, length = BLOCK.unpack_from(data, offset)
+            raw_end = offset + BLOCK.size + length
+            last_block = decode_block(first_time, rows, data[offset + BLOCK.size:raw_end])
+            self._last_time = last_block[-1][0]
+        self._truncate("raw", raw_end)
+
+    def _map(self, name):
+        """Return a read-only mmap of a file as it is now (b"" if it's too small to map)."""
+        mapped = self._maps.get(name)
+        if mapped is None:
+            mapped = self._maps[name] = mmap.mmap(self._files[name].fileno(), 0, access=mmap.ACCESS_READ)
+        return mapped
+
+    def _unmap(self, name):
+        """Drop a file's mmap after it changed size; the next read maps it anew."""
+        mapped = self._maps.pop(name, None)
+        if mapped is not None:
+            mapped.close()
+
+    def _append(self, name, data):
+        """Append bytes to a file; return the offset they start at."""
+        offset = self._sizes[name]
+        self._files[name].write(data)
+        self._sizes[name] += len(data)
+        self._unmap(name)
+        return offset
+
+    def _count(self, name):
+        """The number of complete records in a rollup file."""
+        return (self._sizes[name] - len(MAGIC)) // RECORD.size
+
+    def _record(self, index, name="1m"):
+        """Unpack a rollup file's record number index."""
+        return RECORD.unpack_from(self._map(name), len(MAGIC) + index * RECORD.size)
+
+    def _records(self, name, start, end):
+        """Return the raw records of a rollup file whose period starts from start up to end."""
+        count = self._count(name)
+        if not count:
+            return []
+        data = self._map(name)
+        times = _RecordTimes(data, count)
+        first = bisect.bisect_left(times, start)
+        last = bisect.bisect_right(times, end)
+        begin = len(MAGIC) + first * RECORD.size
+        return list(RECORD.iter_unpack(data[begin:begin + (last - first) * RECORD.size]))
+
+    @staticmethod
+    def _rollup(record):
+        """A record as a Rollup."""
+        series = len(SERIES)
+        values = record[3:]
+        return Rollup(record[0], record[1], values[:series], values[series:2 * series], values[2 * series:])
+
+    def _first_unrolled_hour(self):
+        """The start of the first hour that has minutes but no 1h record yet, or None."""
+        if self._count("1h"):
+            return self._record(self._count("1h") - 1, "1h")[0] + 3600
+        if self._count("1m"):
+            first = self._record(0)[0]
+            return first - first % 3600
+        return None
+
+    def append(self, when, values):
+        """
+        Add a sample.
+
+        Args:
+            when (float): Its time, in seconds since the epoch
+            values (dict): A value for each of SERIES
+
+        Returns:
+            bool: False if it was ignored for not being later than the
+            sample before (the clock went back)
+        """
+        if self.readonly:
+            raise ValueError("the store is open read-only")
+        milliseconds = round(when * 1000)
+        if self._last_time is not None and milliseconds <= self._last_time:
+            return False
+        minute = int(when // 60) * 60
+        if minute != self._minute:
+            self.flush()
+            self._minute = minute
+            hour = minute - minute % 3600
+            if self._next_hour is None:
+                self._next_hour = hour
+            elif hour > self._next_hour:
+                self._roll_hours(hour)
+        self._rows.append((milliseconds, [round(values[name] * SCALES[name]) for name in SERIES]))
+        self._last_time = milliseconds
+        return True
+
+    def flush(self):
+        """Write the minute in progress, so far, as a block and its 1m record."""
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        payload = encode_block(rows)
+        offset = self._append("raw", BLOCK.pack(rows[0][0], len(rows), len(payload)) + payload)
+        rollup = summarize(self._minute, rows)
+        self._append("1m", RECORD.pack(rollup.time, rollup.count, offset,
+                                       *rollup.minimum, *rollup.mean, *rollup.maximum))
+
+    def _roll_hours(self, hour):
+        """Write the 1h records of the hours from the first unrolled one up to hour."""
+        rollups = merge(map(self._rollup, self._records("1m", self._next_hour, hour - 1)), 3600)
+        if rollups:
+            self._append("1h", b"".join(RECORD.pack(rollup.time, rollup.count, 0,
+                                                    *rollup.minimum, *rollup.mean, *rollup.maximum)
+                                        for rollup in rollups))
+        self._next_hour = hour
+
+    def _pending(self, start, end):
+        """The minute in progress as a 1m Rollup, if it falls between start and end."""
+        if self._rows and start <= self._minute <= end:
+            return [summarize(self._minute, self._rows)]
+        return []
+
+    def samples(self, start, end):
+        """
+        Return the raw samples from start to end (seconds since the epoch).
+
+        Returns:
+            list: Rollup rows of count 1, in time order
+        """
+        blocks = [(record[2], record[1]) for record in self._records("1m", int(start // 60) * 60, end)]
+        data = self._map("raw") if blocks else b""
+        rows = []
+        for offset, _ in blocks:
+            first_time, count, length = BLOCK.unpack_from(data, offset)
+            rows.extend(decode_block(first_time, count, data[offset + BLOCK.size:offset + BLOCK.size + length]))
+        rows.extend(self._rows)
+
+        low, high = start * 1000, end * 1000
+        result = []
+        for when, values in rows:
+            if low <= when <= high:
+                values = tuple(value / SCALES[name] for name, value in zip(SERIES, values))
+                result.append(Rollup(when / 1000, 1, values, values, values))
+        return result
+
+    def rollups(self, start, end, resolution="1m"):
+        """
+        Return the rollups of the periods that start from start to end.
+
+        Args:
+            start (float): Seconds since the epoch
+            end (float): Seconds since the epoch
+            resolution (str): "1m" or "1h"
+
+        Returns:
+            list: Rollup rows, in time order
+        """
+        seconds = RESOLUTIONS[resolution]
+        start = int(start // seconds) * seconds
+        if resolution == "1m":
+            rollups = map(self._rollup, self._records("1m", start, end))
+            return merge([*rollups, *self._pending(start, end)], 60)
+        rollups = list(map(self._rollup, self._records("1h", start, end)))
+        if self._next_hour is not None and self._next_hour <= end:
+            # Hours not rolled up yet come from their minutes
+            minutes = map(self._rollup, self._records("1m", max(start, self._next_hour), end))
+            rollups += merge([*minutes, *self._pending(start, end)], 3600)
+        return rollups
+
+    def query(self, start, end, resolution=None):
+        """
+        Return the samples or rollups from start to end.
+
+        Args:
+            start (float): Seconds since the epoch
+            end (float): Seconds since the epoch
+            resolution (str): "raw", "1m" or "1h"; by default raw for up to
+                an hour, 1m for up to three days, and 1h beyond
+
+        Returns:
+            tuple: The resolution used, and its Rollup rows
+        """
+        if resolution is None:
+            span = end - start
+            resolution = "raw" if span <= RAW_SPAN else "1m" if span <= MINUTE_SPAN else "1h"
+        if resolution == "raw":
+            return resolution, self.samples(start, end)
+        return resolution, self.rollups(start, end, resolution)
+
+    def size(self):
+        """Return the bytes the files take, including the minute in progress."""
+        pending = len(encode_block(self._rows)) + BLOCK.size + RECORD.size if self._rows else 0
+        return sum(self._sizes.values()) + pending
+
+    def close(self):
+        """Write the minute in progress and close the files."""
+        if not self.readonly:
+            self.flush()
+        for name, f in self._files.items():
+            self._unmap(name)
+            f.close()
+
+
+def format_rows(resolution, rows):
+    """Format query rows as a table, one line per row."""
+    lines = [f"{'Time':<19} {'Samples':>7} {'CPU':>6} {'(max)':>6} {'Memory':>7} {'Disk':>6} "
+             f"{'Sent/s':>10} {'Recv/s':>10}"]
+    for row in rows:
+        when = datetime.datetime.fromtimestamp(row.time).strftime("%Y-%m-%d %H:%M:%S")
+        cpu, memory, disk, sent, received = row.mean
+        lines.append(f"{when:<19} {row.count:>7} {cpu:>5.1f}% {row.maximum[0]:>5.1f}% {memory:>6.1f}% "
+                     f"{disk:>5.1f}% {sent:>10.0f} {received:>10.0f}")
+    return "\n".join(lines)
+
+
+def main():
+    """Print the metrics a monitor stored in a directory."""
+    parser = argparse.ArgumentParser(description="Show metrics stored by monitor.py --store")
+    parser.add_argument("directory", help="The store's directory")
+    parser.add_argument("--hours", type=float, default=1.0, help="How far back to go (default: 1)")
+    parser.add_argument("--resolution", choices=("raw", *RESOLUTIONS),
+                        help="raw, 1m or 1h (default: by the range)")
+    args = parser.parse_args()
+
+    store = TimeSeriesStore(args.directory, readonly=True)
+    try:
+        end = time.time()
+        started = time.perf_counter()
+        resolution, rows = store.query(end - args.hours * 3600, end, args.resolution)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(format_rows(resolution, rows))
+        print(f"\n{len(rows)} rows at {resolution} resolution in {elapsed:.1f} ms")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,46 +5,392 @@ LAB05 - API Integration Tool
 This script demonstrates how to interact with a REST API using Python.
 It creates a reusable API client class that handles requests, responses, and errors.
 
+Requests go through one requests.Session, whose pool keeps up to
+API_POOL_SIZE connections to the API open, so repeat requests skip the
+TCP and TLS handshakes. GET responses are cached (see http_cache.py) in
+memory and, with --cache-dir, on disk, as the API's Cache-Control,
+ETag and Last-Modified headers allow: a fresh response is served without
+a request, and a stale one is revalidated with a conditional request,
+which costs a 304 Not Modified instead of the whole body when nothing
+changed.
+
+Identical GETs made at the same time, from several threads, share one
+round trip: the first one goes to the API, and the others wait for its
+response (single-flight). get_users_by_ids() looks up many users at once
+over a bounded pool of threads, and returns them in the order asked.
+
 Usage:
     python api_client.py
+    python api_client.py --base-url http://127.0.0.1:8000   # Against local_server.py
+    python api_client.py --cache-dir .api-cache              # Keep responses across runs
 """
 
-# TODO: Import necessary modules
-# You'll need the requests library and your config settings
+import argparse
+import json
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
 
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, HTTPError, RequestException, Timeout
 
-# TODO: Create an APIClient class
-# This class should:
-# - Initialize with the base URL and timeout from config
-# - Include methods to interact with different API endpoints
-# - Handle authentication (if needed)
-# - Process responses and handle errors
+from config import (
+    API_BASE_URL,
+    API_BATCH_WORKERS,
+    API_CACHE_DIR,
+    API_CACHE_ENTRIES,
+    API_ENDPOINTS,
+    API_MAX_RETRIES,
+    API_POOL_SIZE,
+    API_RETRY_BACKOFF,
+    API_TIMEOUT,
+    DEFAULT_HEADERS,
+)
+from http_cache import HTTPCache
 
 
-# TODO: Implement API endpoint methods
-# For example:
-# - get_users(): Fetch users from the API
-# - get_posts(): Fetch posts from the API
-# - get_user_by_id(user_id): Fetch a specific user
+class APIClient:
+    """
+    A reusable client for interacting with REST APIs.
 
+    This class provides methods to interact with different API endpoints,
+    reuses pooled connections, caches GET responses, and processes
+    responses and errors.
+    """
 
-# TODO: Add error handling
-# Consider handling these common scenarios:
-# - Connection errors
-# - Timeout errors
-# - HTTP error codes (4xx, 5xx)
-# - JSON parsing errors
+    def __init__(
+        self,
+        base_url: str = API_BASE_URL,
+        timeout: float = API_TIMEOUT,
+        pool_size: int = API_POOL_SIZE,
+        cache_entries: int = API_CACHE_ENTRIES,
+        cache_dir: Optional[str] = API_CACHE_DIR
+    ):
+        """
+        Initialize the API client.
 
+        Args:
+            base_url (str): The base URL of the API
+            timeout (float): Request timeout in seconds
+            pool_size (int): Most connections kept open to the API
+            cache_entries (int): Most responses cached in memory (0: no cache)
+            cache_dir (str, optional): Directory to also cache responses in
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        # Retries are done by _send(), with backoff, so the adapter doesn't retry
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.cache = HTTPCache(cache_entries, cache_dir) if cache_entries > 0 else None
+        # How GETs were answered: "hits" from the cache, "revalidated" by a 304,
+        # "fetched" with a full response, "coalesced" by an identical GET in flight
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._in_flight = {}   # (URL, headers) -> Future of the response body
+        self._in_flight_lock = threading.Lock()
+
+        # Uncomment and add if your API requires authentication
+        # if hasattr(config, 'API_KEY'):
+        #     self.session.headers.update({"Authorization": f"Bearer {config.API_KEY}"})
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.session.close()
+
+    def _count(self, outcome: str) -> None:
+        with self._stats_lock:
+            self.stats[outcome] += 1
+
+    def cache_stats(self) -> Dict[str, float]:
+        """
+        Summarize how the GET requests so far were answered.
+
+        Returns:
+            dict: The counts of "hits", "revalidated", "fetched" and
+                "coalesced", and "hit_rate": the share of GETs answered
+                without a body from the API (cache hits, 304s and GETs
+                that shared another's response)
+        """
+        with self._stats_lock:
+            stats = {outcome: self.stats[outcome]
+                     for outcome in ("hits", "revalidated", "fetched", "coalesced")}
+        total = sum(stats.values())
+        saved = stats["hits"] + stats["revalidated"] + stats["coalesced"]
+        stats["hit_rate"] = saved / total if total else 0.0
+        return stats
+
+    def _send(self, method: str, url: str, data: Optional[Dict], headers: Dict[str, str]) -> requests.Response:
+        """
+        Send one request, retrying connection errors, timeouts and 5XX
+        responses with exponential backoff.
+
+        Raises:
+            requests.exceptions.RequestException: For request errors
+        """
+        retries = 0
+        while True:
+            try:
+                response = self.session.request(
+                    method=method,
+                    url=url,
+                    json=data,  # Automatically serializes dict to JSON
+                    headers=headers,
+                    timeout=self.timeout
+                )
+                # Raise an exception for 4XX/5XX responses
+                response.raise_for_status()
+                return response
+
+            except (ConnectionError, Timeout):
+                # Network or timeout errors - retry
+                if retries >= API_MAX_RETRIES:
+                    raise
+
+            except HTTPError as e:
+                # Retry on 5XX errors; don't retry on 4XX errors or if max retries reached
+                if not 500 <= e.response.status_code < 600 or retries >= API_MAX_RETRIES:
+                    try:
+                        error_message = e.response.json().get("message", str(e))
+                    except (ValueError, AttributeError):
+                        error_message = str(e)
+                    raise HTTPError(f"HTTP Error: {e.response.status_code} - {error_message}",
+                                    response=e.response)
+
+            retries += 1
+            time.sleep(API_RETRY_BACKOFF * (2 ** (retries - 1)))
+
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        headers: Optional[Dict] = None
+    ) -> Any:
+        """
+        Make an HTTP request to the API. GETs go through the cache, and
+        identical GETs in flight at the same time share one response.
+
+        Args:
+            method (str): HTTP method (GET, POST, PUT, DELETE)
+            endpoint (str): API endpoint to call
+            params (dict, optional): Query parameters
+            data (dict, optional): Request body for POST/PUT
+            headers (dict, optional): Additional headers
+
+        Returns:
+            dict/list: Parsed JSON response
+
+        Raises:
+            requests.exceptions.RequestException: For request errors
+            ValueError: If the response isn't JSON
+        """
+        url = f"{self.base_url}{endpoint}"
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+        request_headers = dict(headers) if headers else {}
+
+        if method != "GET":
+            response = self._send(method, url, data, request_headers)
+            if self.cache is not None:
+                # The request may have changed the resource, so the cached copy is no good
+                self.cache.invalidate(url)
+            return response.json()
+
+        if self.cache is not None:
+            entry = self.cache.lookup(url, {**self.session.headers, **request_headers})
+            if entry is not None and entry.is_fresh():
+                self._count("hits")
+                return json.loads(entry.body)
+
+        # Single-flight: the first of identical GETs in flight fetches, the others wait for it
+        key = (url, tuple(sorted(request_headers.items())))
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            self._count("coalesced")
+            # Each caller parses its own copy, so none sees another's changes to it
+            return json.loads(future.result())
+
+        try:
+            body = self._get(url, request_headers)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(body)
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+        return json.loads(body)
+
+    def _get(self, url: str, request_headers: Dict[str, str]) -> bytes:
+        """
+        GET url, revalidating its cached copy if there is one, and cache the response.
+
+        Returns:
+            bytes: The response body
+        """
+        if self.cache is None:
+            body = self._send("GET", url, None, request_headers).content
+            self._count("fetched")
+            return body
+
+        sent_headers = {**self.session.headers, **request_headers}
+        # Looked up again: the response may have been cached since _request() looked
+        entry = self.cache.lookup(url, sent_headers)
+        if entry is not None and entry.is_fresh():
+            self._count("hits")
+            return entry.body
+        conditional = dict(request_headers)
+        if entry is not None:
+            conditional.update(entry.validators())
+
+        response = self._send("GET", url, None, conditional)
+
+        if response.status_code == 304 and entry is not None:
+            self._count("revalidated")
+            return self.cache.refresh(entry, response.headers).body
+        self._count("fetched")
+        self.cache.store(url, sent_headers, response.status_code, response.headers, response.content)
+        return response.content
+
+    def get_users(self) -> List[Dict]:
+        """
+        Fetch users from the API.
+
+        Returns:
+            list: List of user dictionaries
+        """
+        return self._request("GET", API_ENDPOINTS["users"])
+
+    def get_user_by_id(self, user_id: int) -> Dict:
+        """
+        Fetch a specific user by ID.
+
+        Args:
+            user_id (int): User ID to fetch
+
+        Returns:
+            dict: User data
+        """
+        return self._request("GET", f"{API_ENDPOINTS['users']}/{user_id}")
+
+    def get_posts(self, user_id: Optional[int] = None) -> List[Dict]:
+        """
+        Fetch posts, optionally filtered by user.
+
+        Args:
+            user_id (int, optional): Filter posts by user ID
+
+        Returns:
+            list: List of post dictionaries
+        """
+        params = {"userId": user_id} if user_id else None
+        return self._request("GET", API_ENDPOINTS["posts"], params=params)
+
+    def get_users_by_ids(self, user_ids: Iterable[int], workers: int = API_BATCH_WORKERS) -> List[Dict]:
+        """
+        Fetch many users at once, over a pool of threads.
+
+        Repeated IDs cost one request, through the cache or by sharing
+        the response of the request in flight.
+
+        Args:
+            user_ids (iterable): User IDs to fetch
+            workers (int): Most requests in flight at once
+
+        Returns:
+            list: User data, in the order of user_ids
+
+        Raises:
+            requests.exceptions.RequestException: The first error, in the
+                order of user_ids; the other lookups still finish first
+        """
+        user_ids = list(user_ids)
+        if len(user_ids) <= 1 or workers <= 1:
+            return [self.get_user_by_id(user_id) for user_id in user_ids]
+        with ThreadPoolExecutor(min(workers, len(user_ids)), thread_name_prefix="api") as pool:
+            return list(pool.map(self.get_user_by_id, user_ids))
+
+
+def display_user_info(user: Dict) -> None:
+    """Display formatted user information."""
+    print(f"\nUser Information:")
+    print(f"  Name: {user['name']}")
+    print(f"  Username: {user['username']}")
+    print(f"  Email: {user['email']}")
+    print(f"  Address: {user['address']['street']}, {user['address']['city']}")
+    print(f"  Company: {user['company']['name']}")
+
+
+def main() -> None:
+    """Main function demonstrating API client usage."""
+    parser = argparse.ArgumentParser(description="Demonstrate the API client")
+    parser.add_argument("--base-url", default=API_BASE_URL, help=f"API to use (default: {API_BASE_URL})")
+    parser.add_argument("--cache-dir", default=API_CACHE_DIR, help="Also cache responses in this directory")
+    parser.add_argument("--no-cache", action="store_true", help="Don't cache responses")
+    args = parser.parse_args()
 
-if __name__ == "__main__":
     print("API Integration Tool")
     print("===================")
-    
-    # TODO: Create an instance of your API client and use it
-    
-    # TODO: Call methods and display results
-    
-    # Add more API interactions as needed
-    
-    print("\nRemember to install dependencies:")
-    print("pip install requests") 
\ No newline at end of file
+
+    client = APIClient(args.base_url, cache_entries=0 if args.no_cache else API_CACHE_ENTRIES,
+                       cache_dir=args.cache_dir)
+    try:
+        # Fetch and display users
+        print("\nFetching users...")
+        users = client.get_users()
+        print(f"Found {len(users)} users")
+
+        if users:
+            # Display first 3 users
+            for i, user in enumerate(users[:3], 1):
+                print(f"{i}. {user['name']} ({user['email']})")
+
+        # Get and display specific user
+        user_id = 1
+        print(f"\nFetching details for user {user_id}...")
+        user = client.get_user_by_id(user_id)
+        display_user_info(user)
+
+        # Get posts for this user
+        print(f"\nFetching posts for user {user_id}...")
+        posts = client.get_posts(user_id)
+        print(f"Found {len(posts)} posts")
+        if posts:
+            print(f"\nSample post title: {posts[0]['title']}")
+
+        # The same requests again come from the cache
+        print("\nFetching the same data again...")
+        started = time.perf_counter()
+        client.get_users()
+        client.get_user_by_id(user_id)
+        client.get_posts(user_id)
+        print(f"Took {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        if client.cache is not None:
+            stats = client.cache_stats()
+            print(f"\nCache: {stats['hits']} hits, {stats['revalidated']} revalidated, "
+                  f"{stats['fetched']} fetched ({stats['hit_rate']:.0%} hit rate)")
+
+    except RequestException as e:
+        print(f"\nAPI Request Error: {e}")
+    except ValueError as e:
+        print(f"\nInvalid response from the API: {e}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+LAB05 - Batch Lookup Benchmark
+
+Looks up --lookups users from local_server.py, which waits --latency
+seconds before each response, as a distant API would:
+
+1. Sequentially, one get_user_by_id() after another
+2. With get_users_by_ids(), over pools of 4, 10 and 32 threads
+3. From --callers threads at once, sharing one client, each looking up
+   the same --distinct users one after another, as when many parts of
+   an automation ask for the same users at the same moment. The cache
+   is off, so only single-flight coalescing keeps identical requests in
+   flight at the same time down to one round trip.
+
+and reports the time each took and the requests the server received.
+Each run uses a new client, so none is helped by another's cache.
+
+The check at the end fails if the batch lookups on --workers threads
+take more than --max-fraction of the sequential time or return anything
+other than the sequential results in the same order, or if the callers
+send more than twice as many requests as there are distinct users.
+
+Usage:
+    python benchmark_batch.py
+    python benchmark_batch.py --lookups 5000 --latency 0.05
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+from api_client import APIClient
+from config import API_BATCH_WORKERS
+from local_server import start_server
+
+
+def timed(server, func, *args):
+    """Run func; return its result, the seconds it took, and the requests the server received."""
+    requests_before = server.requests
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started, server.requests - requests_before
+
+
+def main():
+    """Run the lookups each way and print a table."""
+    parser = argparse.ArgumentParser(description="Benchmark the API client's batch lookups.")
+    parser.add_argument("--lookups", type=int, default=1000, help="Users to look up (default: 1000)")
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="Server delay per response, in seconds (default: 0.02)")
+    parser.add_argument("--callers", type=int, default=50,
+                        help="Threads looking up the same users at once (default: 50)")
+    parser.add_argument("--distinct", type=int, default=20,
+                        help="Users each of the callers looks up (default: 20)")
+    parser.add_argument("--workers", type=int, default=API_BATCH_WORKERS,
+                        help=f"Threads for the checked batch run (default: {API_BATCH_WORKERS})")
+    parser.add_argument("--max-fraction", type=float, default=0.25,
+                        help="Most time the batch may take, as a fraction of sequential (default: 0.25)")
+    args = parser.parse_args()
+
+    print("Batch Lookup Benchmark")
+    print("======================")
+
+    server, url = start_server(users=args.lookups, latency=args.latency)
+    user_ids = list(range(1, args.lookups + 1))
+    random.Random(1).shuffle(user_ids)
+    print(f"\n{args.lookups} lookups, {args.latency * 1000:g} ms server latency\n")
+    print(f"{'Method':<36} {'Time (s)':>9} {'Requests':>9} {'Lookups/s':>10}")
+
+    def report(label, elapsed, sent):
+        print(f"{label:<36} {elapsed:>9.2f} {sent:>9} {args.lookups / elapsed:>10.0f}")
+
+    client = APIClient(url)
+    expected, sequential, sent = timed(server, lambda: [client.get_user_by_id(user_id) for user_id in user_ids])
+    client.close()
+    report("sequential get_user_by_id()", sequential, sent)
+
+    in_order = True
+    batch_time = None
+    for workers in sorted({4, args.workers, 32}):
+        client = APIClient(url, pool_size=workers)
+        results, elapsed, sent = timed(server, client.get_users_by_ids, user_ids, workers)
+        client.close()
+        report(f"get_users_by_ids(), {workers} threads", elapsed, sent)
+        in_order = in_order and results == expected
+        if workers == args.workers:
+            batch_time = elapsed
+
+    client = APIClient(url, pool_size=args.workers, cache_entries=0)
+    found = []
+
+    def caller():
+        found.append([client.get_user_by_id(user_id)["id"] for user_id in range(1, args.distinct + 1)])
+
+    def callers():
+        threads = [threading.Thread(target=caller) for _ in range(args.callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    _, elapsed, coalesced_sent = timed(server, callers)
+    client.close()
+    server.shutdown()
+    lookups = args.callers * args.distinct
+    print(f"{f'{args.callers} callers x {args.distinct} users':<36} {elapsed:>9.2f} {coalesced_sent:>9} "
+          f"{lookups / elapsed:>10.0f}")
+    in_order = in_order and found == [list(range(1, args.distinct + 1))] * args.callers
+
+    fraction = batch_time / sequential
+    print(f"\nBatch on {args.workers} threads: {fraction:.1%} of the sequential time")
+    print(f"Callers: {coalesced_sent} requests for {lookups} lookups of {args.distinct} users")
+    ok = fraction <= args.max_fraction and in_order and coalesced_sent <= 2 * args.distinct
+    print(f"\nUnder {args.max_fraction:.0%} of sequential, in order, and coalesced: {'yes' if ok else 'NO'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
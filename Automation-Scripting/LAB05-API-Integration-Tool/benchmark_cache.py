@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+LAB05 - API Client Cache Benchmark
+
+Runs the same workload of get_users(), get_posts() and get_user_by_id()
+calls against local_server.py five ways:
+
+1. A fresh connection per request (requests.get), no cache
+2. APIClient with its pooled session, no cache
+3. APIClient with its cache, while the server's max-age keeps responses
+   fresh: repeats are served without a request
+4. The same, with max-age=0: every repeat is revalidated, and answered
+   with a 304 and no body
+5. A new APIClient on the disk cache the third left behind: a warm start
+
+and reports, for each, the time taken, the requests and body bytes the
+server sent, and the client's cache hit rate (cache hits and 304s, out
+of all calls). The workload asks for popular users more often than
+others (a Zipf distribution), as real automation tends to.
+
+Finally it checks that every way returned the same data, and that a
+change on the server is seen through the cache once it revalidates.
+
+Usage:
+    python benchmark_cache.py
+    python benchmark_cache.py --calls 5000 --latency 0.01
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+
+import requests
+
+from api_client import APIClient
+from config import API_ENDPOINTS
+from local_server import start_server
+
+USERS = 100
+
+
+def workload(calls, seed=1):
+    """Return calls (method name, argument) pairs, with Zipf-distributed user IDs."""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, USERS + 1)]
+    ids = rng.choices(range(1, USERS + 1), weights, k=calls)
+    kinds = rng.choices(("get_user_by_id", "get_posts", "get_users"), (70, 25, 5), k=calls)
+    return [(kind, None if kind == "get_users" else user_id) for kind, user_id in zip(kinds, ids)]
+
+
+class UnpooledClient:
+    """The simplest client: requests.get, a new connection each time, no cache."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def get_users(self, _=None):
+        return requests.get(f"{self.base_url}{API_ENDPOINTS['users']}", timeout=10).json()
+
+    def get_user_by_id(self, user_id):
+        return requests.get(f"{self.base_url}{API_ENDPOINTS['users']}/{user_id}", timeout=10).json()
+
+    def get_posts(self, user_id):
+        return requests.get(f"{self.base_url}{API_ENDPOINTS['posts']}", params={"userId": user_id},
+                            timeout=10).json()
+
+
+def run(server, client, calls):
+    """Make the calls; return the results, the seconds taken, and the server's requests and bytes."""
+    requests_before, bytes_before = server.requests, server.bytes_sent
+    results = []
+    started = time.perf_counter()
+    for kind, argument in calls:
+        method = getattr(client, kind)
+        results.append(method() if argument is None else method(argument))
+    elapsed = time.perf_counter() - started
+    return results, elapsed, server.requests - requests_before, server.bytes_sent - bytes_before
+
+
+def main():
+    """Run the workload each way and print a table."""
+    parser = argparse.ArgumentParser(description="Benchmark the API client's pool and cache.")
+    parser.add_argument("--calls", type=int, default=2000, help="API calls per run (default: 2000)")
+    parser.add_argument("--latency", type=float, default=0.002,
+                        help="Server delay per response, in seconds (default: 0.002)")
+    args = parser.parse_args()
+
+    print("API Client Cache Benchmark")
+    print("==========================")
+
+    server, url = start_server(users=USERS, latency=args.latency)
+    calls = workload(args.calls)
+    print(f"\n{args.calls} calls, {args.latency * 1000:g} ms server latency\n")
+    print(f"{'Client':<34} {'Time (s)':>9} {'Requests':>9} {'Body KB':>9} {'Hit rate':>9}")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        runs = [
+            ("new connection per request", lambda: UnpooledClient(url), 60),
+            ("pooled, no cache", lambda: APIClient(url, cache_entries=0), 60),
+            ("pooled + cache, max-age=60", lambda: APIClient(url, cache_dir=cache_dir), 60),
+            ("pooled + cache, max-age=0", lambda: APIClient(url), 0),
+            ("new client, warm disk cache", lambda: APIClient(url, cache_dir=cache_dir), 60),
+        ]
+        outputs = []
+        for label, make_client, max_age in runs:
+            server.max_age = max_age
+            client = make_client()
+            results, elapsed, sent, body_bytes = run(server, client, calls)
+            outputs.append(results)
+            hit_rate = f"{client.cache_stats()['hit_rate']:.0%}" if getattr(client, "cache", None) else "-"
+            print(f"{label:<34} {elapsed:>9.2f} {sent:>9} {body_bytes / 1024:>9.0f} {hit_rate:>9}")
+            if isinstance(client, APIClient):
+                client.close()
+
+        # A change on the server shows up once the cached copy is revalidated
+        server.max_age = 0
+        client = APIClient(url)
+        before = client.get_user_by_id(1)
+        server.by_id[("users", "1")]["name"] = "Renamed User"
+        after = client.get_user_by_id(1)
+        client.close()
+        changed = before["name"] != "Renamed User" and after["name"] == "Renamed User"
+
+    server.shutdown()
+    same = all(output == outputs[0] for output in outputs)
+    print(f"\nEvery client returned the same data: {'yes' if same else 'NO'}")
+    print(f"A change on the server is seen through the cache: {'yes' if changed else 'NO'}")
+    sys.exit(0 if same and changed else 1)
+
+
+if __name__ == "__main__":
+    main()
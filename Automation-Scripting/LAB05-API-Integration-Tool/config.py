@@ -5,7 +5,7 @@ This file contains all the configuration parameters for the API client.
 Separating configuration from code improves maintainability and security.
 """
 
-# TODO: Set API connection parameters
+# API connection parameters
 # Update these values as needed for the API you are using
 
 # Base URL for the API
@@ -14,10 +14,33 @@ API_BASE_URL = "https://jsonplaceholder.typicode.com"
 # Request timeout in seconds
 API_TIMEOUT = 10
 
-# TODO: (Optional) Add API authentication parameters
+# Default headers
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "Content-Type": "application/json"
+}
+
+# API authentication parameters
 # Uncomment and populate these if your API requires authentication
 # API_KEY = "your_api_key_here"
 # API_USERNAME = "your_username"
 # API_PASSWORD = "your_password"
 
-# TODO: (Optional) Add additional configuration parameters
+# Additional configuration parameters
+API_MAX_RETRIES = 3
+API_RETRY_BACKOFF = 0.5  # seconds
+API_ENDPOINTS = {
+    "users": "/users",
+    "posts": "/posts",
+}
+
+# Connections kept open to the API host, for reuse by later requests
+API_POOL_SIZE = 10
+
+# Most requests in flight at once in batch lookups, like get_users_by_ids()
+API_BATCH_WORKERS = 10
+
+# Response cache: how many responses to keep in memory, and a directory
+# to also keep them on disk across runs (None: memory only)
+API_CACHE_ENTRIES = 256
+API_CACHE_DIR = None
@@ -0,0 +1,323 @@
+"""
+LAB05 - HTTP Response Cache
+
+A private HTTP cache (RFC 9111) for the API client's GET requests, in two
+tiers:
+
+- Memory: the most recently used responses, up to max_entries, kept in
+  least-recently-used order.
+- Disk (optional): every stored response, one file per URL, so that the
+  next run starts warm. Files are written under a temporary name and
+  renamed into place, so a crash never leaves half a response.
+
+    <directory>/
+        3f/3fa2...   One response: a JSON line of metadata, then the body
+
+A stored response is fresh for its Cache-Control max-age, less its age;
+failing that, until its Expires date; failing that, for a tenth of the
+time since its Last-Modified date (at most HEURISTIC_MAX seconds), as
+browsers do. A fresh response is used as it is. A stale one, or one
+marked no-cache, is revalidated: the request is sent again with
+If-None-Match and If-Modified-Since, and a 304 Not Modified answer
+refreshes the stored response without sending its body again.
+
+Responses marked no-store, or that vary on every request (Vary: *), are
+never stored.
+"""
+
+import email.utils
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Mapping, Optional
+
+# Headers kept with a stored response
+STORED_HEADERS = ("content-type", "cache-control", "expires", "date", "age",
+                  "etag", "last-modified", "vary")
+
+# Headers a 304 Not Modified may update (RFC 9111, section 4.3.4)
+REFRESHED_HEADERS = ("cache-control", "expires", "date", "age", "etag", "last-modified")
+
+# Longest heuristic freshness, for responses with only a Last-Modified date
+HEURISTIC_MAX = 24 * 3600
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    Parse a Cache-Control header into its directives.
+
+    Returns:
+        dict: Directive name (lowercase) -> its argument, or None
+    """
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def http_date(value: Optional[str]) -> Optional[float]:
+    """Parse an HTTP date into a timestamp; None if it is missing or invalid."""
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _seconds(value: Optional[str]) -> Optional[int]:
+    """Parse a delta-seconds value, like max-age's; None if it isn't one."""
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def storable(status: int, headers: Mapping[str, str]) -> bool:
+    """Whether a response to a GET may be stored."""
+    return (status == 200
+            and "no-store" not in parse_cache_control(headers.get("cache-control"))
+            and headers.get("vary", "").strip() != "*")
+
+
+class CachedResponse:
+    """A stored response, and when it was received."""
+
+    __slots__ = ("url", "headers", "body", "vary", "received", "lifetime", "initial_age")
+
+    def __init__(self, url: str, headers: Dict[str, str], body: bytes,
+                 vary: Dict[str, str], received: float):
+        self.url = url
+        self.headers = headers     # The STORED_HEADERS it came with, lowercase
+        self.body = body
+        self.vary = vary           # The request headers it varies on, and their values
+        self.received = received
+        self.lifetime = 0.0
+        self.initial_age = 0.0
+        self._compute_freshness()
+
+    def _compute_freshness(self):
+        """Work out how long the response stays fresh, and how old it was on arrival."""
+        headers = self.headers
+        directives = parse_cache_control(headers.get("cache-control"))
+        date = http_date(headers.get("date")) or self.received
+        max_age = _seconds(directives.get("max-age"))
+        expires = http_date(headers.get("expires"))
+        last_modified = http_date(headers.get("last-modified"))
+        if max_age is not None:
+            self.lifetime = max_age
+        elif "expires" in headers:
+            # An invalid Expires, like "0", means already expired
+            self.lifetime = max(expires - date, 0.0) if expires is not None else 0.0
+        elif last_modified is not None:
+            self.lifetime = min(max(date - last_modified, 0.0) / 10, HEURISTIC_MAX)
+        else:
+            self.lifetime = 0.0
+        age = _seconds(headers.get("age")) or 0
+        self.initial_age = max(self.received - date, age, 0.0)
+
+    def age(self, now: Optional[float] = None) -> float:
+        """Seconds since the origin server sent the response."""
+        return self.initial_age + (time.time() if now is None else now) - self.received
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """Whether the response may be used without asking the server."""
+        if "no-cache" in parse_cache_control(self.headers.get("cache-control")):
+            return False
+        return self.age(now) < self.lifetime
+
+    def validators(self) -> Dict[str, str]:
+        """The conditional request headers that revalidate the response."""
+        headers = {}
+        if "etag" in self.headers:
+            headers["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["last-modified"]
+        return headers
+
+    def matches(self, request_headers: Mapping[str, str]) -> bool:
+        """
+        Whether the response was for a request with the same values of the headers it varies on.
+
+        Args:
+            request_headers (Mapping): The new request's headers, under lowercase names
+        """
+        return all(request_headers.get(name, "") == value for name, value in self.vary.items())
+
+
+def _lower(headers: Mapping[str, str], names) -> Dict[str, str]:
+    """The given headers of a response, under lowercase names."""
+    return {name: headers[name] for name in names if name in headers}
+
+
+def _lowercase(headers: Mapping[str, str]) -> Dict[str, str]:
+    """All of a request's headers, under lowercase names, as Vary names are compared."""
+    return {name.lower(): value for name, value in headers.items()}
+
+
+class HTTPCache:
+    """
+    Stores GET responses by URL, in memory and, optionally, on disk.
+
+    Safe to share between threads.
+    """
+
+    def __init__(self, max_entries: int = 256, directory: Optional[str] = None):
+        """
+        Args:
+            max_entries (int): Most responses kept in memory
+            directory (str, optional): Where to also keep them on disk
+        """
+        self.max_entries = max_entries
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self._memory = OrderedDict()   # URL -> CachedResponse, least recently used first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._memory)
+
+    def lookup(self, url: str, request_headers: Mapping[str, str]) -> Optional[CachedResponse]:
+        """
+        Find the stored response for a GET of url, fresh or not.
+
+        Args:
+            url (str): The full URL, query string included
+            request_headers (Mapping): The headers the request will be sent with
+
+        Returns:
+            CachedResponse: The stored response, or None if there is none
+                for this request
+        """
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry is not None:
+                self._memory.move_to_end(url)
+        if entry is None and self.directory is not None:
+            entry = self._load(url)
+            if entry is not None:
+                self._remember(entry)
+        if entry is None or not entry.matches(_lowercase(request_headers)):
+            return None
+        return entry
+
+    def store(self, url: str, request_headers: Mapping[str, str], status: int,
+              headers: Mapping[str, str], body: bytes) -> Optional[CachedResponse]:
+        """
+        Store a response to a GET of url, if it may be stored.
+
+        Args:
+            url (str): The full URL, query string included
+            request_headers (Mapping): The headers the request was sent with
+            status (int): The response's status code
+            headers (Mapping): The response's headers (case-insensitive)
+            body (bytes): The response's body
+
+        Returns:
+            CachedResponse: The stored response, or None if it may not be stored
+        """
+        if not storable(status, headers):
+            self.invalidate(url)
+            return None
+        kept = _lower(headers, STORED_HEADERS)
+        request = _lowercase(request_headers)
+        names = (name.strip().lower() for name in kept.get("vary", "").split(","))
+        vary = {name: request.get(name, "") for name in names if name}
+        entry = CachedResponse(url, kept, body, vary, time.time())
+        self._remember(entry)
+        self._save(entry)
+        return entry
+
+    def refresh(self, entry: CachedResponse, headers: Mapping[str, str]) -> CachedResponse:
+        """
+        Update a stored response from a 304 Not Modified answer to its revalidation.
+
+        Args:
+            entry (CachedResponse): The response that was revalidated
+            headers (Mapping): The 304 response's headers
+
+        Returns:
+            CachedResponse: The refreshed response, fresh again for its new lifetime
+        """
+        refreshed = dict(entry.headers)
+        refreshed.update(_lower(headers, REFRESHED_HEADERS))
+        if "age" not in headers:
+            refreshed.pop("age", None)
+        entry = CachedResponse(entry.url, refreshed, entry.body, entry.vary, time.time())
+        self._remember(entry)
+        self._save(entry)
+        return entry
+
+    def invalidate(self, url: str):
+        """Forget the stored response for url, after a request that changed it."""
+        with self._lock:
+            self._memory.pop(url, None)
+        if self.directory is not None:
+            try:
+                os.remove(self._path(url))
+            except OSError:
+                pass
+
+    def clear(self):
+        """Forget every stored response, in memory and on disk."""
+        with self._lock:
+            self._memory.clear()
+        if self.directory is not None:
+            for root, _, names in os.walk(self.directory):
+                for name in names:
+                    os.remove(os.path.join(root, name))
+
+    def _remember(self, entry: CachedResponse):
+        """Put a response in memory, evicting the least recently used past max_entries."""
+        with self._lock:
+            self._memory[entry.url] = entry
+            self._memory.move_to_end(entry.url)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _path(self, url: str) -> str:
+        """The file a response to url is kept in."""
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def _save(self, entry: CachedResponse):
+        """Write a response to disk, if there is a disk tier."""
+        if self.directory is None:
+            return
+        path = self._path(entry.url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        meta = {"url": entry.url, "headers": entry.headers, "vary": entry.vary,
+                "received": entry.received, "initial_age": entry.initial_age}
+        temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temporary, "wb") as f:
+                f.write(json.dumps(meta).encode() + b"\n" + entry.body)
+            os.replace(temporary, path)
+        except OSError:
+            # The disk tier is a bonus; a full or read-only disk just means no copy there
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+    def _load(self, url: str) -> Optional[CachedResponse]:
+        """Read the response to url from disk; None if there is none, or it is damaged."""
+        try:
+            with open(self._path(url), "rb") as f:
+                data = f.read()
+            line, _, body = data.partition(b"\n")
+            meta = json.loads(line)
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:  # A hash collision, however unlikely
+            return None
+        entry = CachedResponse(url, meta["headers"], body, meta["vary"], meta["received"])
+        entry.initial_age = meta["initial_age"]
+        return entry
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+LAB05 - Local Test API
+
+A small stand-in for the JSONPlaceholder API, for trying out api_client.py
+without the internet:
+
+- GET /users, /users/<id>, /posts and /posts?userId=<id>, with generated
+  users (10 by default) and 10 posts each
+- Every response carries Cache-Control: max-age, an ETag, a
+  Last-Modified date and Vary: Accept-Encoding (as JSONPlaceholder's
+  do), and conditional requests (If-None-Match,
+  If-Modified-Since) are answered with 304 Not Modified
+- HTTP/1.1 keep-alive, so a client can reuse its connections
+
+--latency delays every response, to simulate a distant server, and the
+server counts the requests, 304s and body bytes it sent, so a client's
+cache can be checked from the other side.
+
+Usage:
+    python local_server.py
+    python local_server.py --port 8000 --latency 0.02 --max-age 5
+"""
+
+import argparse
+import email.utils
+import hashlib
+import json
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_users(count):
+    """Generate count users, shaped like JSONPlaceholder's."""
+    return [
+        {
+            "id": number,
+            "name": f"User {number}",
+            "username": f"user{number}",
+            "email": f"user{number}@example.com",
+            "address": {"street": f"{number} Main Street", "city": "Gwenborough"},
+            "company": {"name": f"Company {number % 7 + 1}"},
+        }
+        for number in range(1, count + 1)
+    ]
+
+
+def make_posts(users, per_user=10):
+    """Generate per_user posts for each user."""
+    return [
+        {
+            "userId": user["id"],
+            "id": (user["id"] - 1) * per_user + number,
+            "title": f"Post {number} by {user['username']}",
+            "body": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4,
+        }
+        for user in users
+        for number in range(1, per_user + 1)
+    ]
+
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers GETs for the users and posts of server.resources, with validators.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; don't let Nagle hold them back
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        """Stay quiet unless the server was started with verbose=True."""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.active += 1
+            self.server.peak_active = max(self.server.peak_active, self.server.active)
+        try:
+            if self.server.latency:
+                time.sleep(self.server.latency)
+            self.send_resource()
+        finally:
+            with self.server.lock:
+                self.server.active -= 1
+
+    def find_resource(self):
+        """Return the JSON body for the request's path, or None if there is none."""
+        url = urllib.parse.urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        query = urllib.parse.parse_qs(url.query)
+        resources = self.server.resources
+        if not parts or parts[0] not in resources:
+            return None
+        items = resources[parts[0]]
+        if len(parts) == 2:
+            return self.server.by_id.get((parts[0], parts[1]))
+        if len(parts) > 2:
+            return None
+        if "userId" in query:
+            items = [item for item in items if str(item.get("userId")) in query["userId"]]
+        return items
+
+    def send_resource(self):
+        body_object = self.find_resource()
+        if body_object is None:
+            body = b"{}"
+            self.send_response(404)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        body = json.dumps(body_object).encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        last_modified = email.utils.formatdate(self.server.started, usegmt=True)
+        if self.not_modified(etag):
+            with self.server.lock:
+                self.server.not_modified_sent += 1
+            self.send_response(304)
+            self.send_validators(etag, last_modified)
+            self.end_headers()
+            return
+
+        with self.server.lock:
+            self.server.bytes_sent += len(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_validators(etag, last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_validators(self, etag, last_modified):
+        """Send the caching headers that go with both 200 and 304 responses."""
+        self.send_header("Cache-Control", f"max-age={self.server.max_age}")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.send_header("Vary", "Accept-Encoding")
+
+    def not_modified(self, etag):
+        """Whether the client's cached copy, as described by its conditional headers, is current."""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            # If-None-Match takes precedence over If-Modified-Since
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        since = self.headers.get("If-Modified-Since")
+        if since:
+            try:
+                return int(self.server.started) <= email.utils.parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+class APIServer(ThreadingHTTPServer):
+    """A threaded server that also accepts hundreds of connections at once."""
+
+    daemon_threads = True
+    # Listen backlog; the default of 5 drops connections when many arrive together
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        """Clients that hang up mid-response are normal; don't print those."""
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_server(port=0, users=10, latency=0.0, max_age=60, verbose=False):
+    """
+    Serve the test API from a background thread.
+
+    Args:
+        port (int): Port on 127.0.0.1 (0 picks a free one)
+        users (int): How many users to generate, each with 10 posts
+        latency (float): Seconds to wait before each response
+        max_age (int): Seconds responses may be cached before revalidating
+        verbose (bool): Log every request
+
+    Returns:
+        tuple: (server, base URL); call server.shutdown() to stop it.
+            server.requests, server.not_modified_sent and server.bytes_sent
+            count what it answered, and server.peak_active is the most
+            requests it handled at once
+    """
+    server = APIServer(("127.0.0.1", port), APIRequestHandler)
+    user_list = make_users(users)
+    server.resources = {"users": user_list, "posts": make_posts(user_list)}
+    server.by_id = {(name, str(item["id"])): item for name, items in server.resources.items() for item in items}
+    server.latency = latency
+    server.max_age = max_age
+    server.verbose = verbose
+    server.started = time.time()
+    server.lock = threading.Lock()
+    server.requests = server.not_modified_sent = server.bytes_sent = 0
+    server.active = server.peak_active = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    """Serve the test API until Ctrl+C."""
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the JSONPlaceholder API")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--users", type=int, default=10, help="How many users to serve (default: 10)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay before each response, in seconds")
+    parser.add_argument("--max-age", type=int, default=60,
+                        help="Seconds clients may cache responses (default: 60)")
+    args = parser.parse_args()
+
+    server, url = start_server(args.port, args.users, args.latency, args.max_age, verbose=True)
+    print(f"Serving the test API at {url}/ (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
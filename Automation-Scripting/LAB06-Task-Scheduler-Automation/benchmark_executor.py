@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+LAB06 - Executor Benchmark
+
+Shows that slow tasks don't delay the others. A quick "tick" task runs
+every 0.1 s next to tasks that sleep far longer than their interval:
+
+- slow_thread sleeps 3 s every 1 s, in a thread, skipping overlapping runs
+- slow_process sleeps 3 s every 1 s, in a process with a 1.5 s timeout,
+  queueing overlapping runs
+- slow_async sleeps 2 s every 0.5 s, on the event loop, up to 3 at once
+
+The same schedule runs twice: first with every task on the scheduler's
+thread, as before the executor, then with the executor. Each run of tick
+records when it started. A late scheduler skips the runs it missed, so
+the delays show as gaps between runs: the check at the end fails if, with
+the executor, runs are missing or any gap is more than --max-late ms
+longer than 0.1 s.
+
+Usage:
+    python benchmark_executor.py
+    python benchmark_executor.py --seconds 10 --max-late 50
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+
+from executor import Executor, options_of, task
+from scheduler import Scheduler
+
+TICK = 0.1
+
+
+def tick(record):
+    """Record when this run started."""
+    record["started"].append(time.time())
+
+
+@task(execution="thread", overlap="skip")
+def slow_thread():
+    """Sleep 3 s in a thread."""
+    time.sleep(3)
+
+
+@task(execution="process", overlap="queue", timeout=1.5)
+def slow_process():
+    """Sleep 3 s in a process (stopped after 1.5 s)."""
+    time.sleep(3)
+
+
+@task(execution="asyncio", max_concurrent=3, overlap="skip")
+async def slow_async():
+    """Sleep 2 s on the event loop."""
+    await asyncio.sleep(2)
+
+
+def run_schedule(seconds, executor):
+    """
+    Run the schedule for seconds; return tick's start times, followed by
+    the end of the schedule, and the slow jobs.
+    """
+    scheduler = Scheduler(executor=executor)
+    record = {"started": []}
+    scheduler.add(f"every {TICK}s", tick, record)
+    jobs = [scheduler.add("every 1s", slow_thread), scheduler.add("every 1s", slow_process)]
+    if executor is not None:
+        jobs.append(scheduler.add("every 0.5s", slow_async))
+
+    runner = threading.Thread(target=scheduler.run)
+    runner.start()
+    time.sleep(seconds)
+    record["started"].append(time.time())  # So that a gap at the end counts too
+    scheduler.stop()
+    runner.join()
+    if executor is not None:
+        executor.shutdown(timeout=0)
+    return record["started"], jobs
+
+
+def longest_gap(started):
+    """The longest time between two runs, in ms."""
+    return max(later - earlier for earlier, later in zip(started, started[1:])) * 1000
+
+
+def main():
+    """Run the schedule inline, then with the executor, and check tick's runs."""
+    parser = argparse.ArgumentParser(description="Show that slow tasks don't delay others under the executor.")
+    parser.add_argument("--seconds", type=float, default=6.0, help="Seconds each schedule runs (default: 6)")
+    parser.add_argument("--max-late", type=float, default=100.0,
+                        help="Most a gap between tick runs may exceed 0.1 s with the executor, in ms "
+                             "(default: 100)")
+    args = parser.parse_args()
+
+    print("Executor Benchmark")
+    print("==================")
+    expected = int(args.seconds / TICK)
+    print(f"\ntick every {TICK:g}s for {args.seconds:g}s: {expected} runs due\n")
+
+    print(f"{'Tasks run':<26} {'Tick runs':>10} {'Longest gap (ms)':>17}")
+    inline, _ = run_schedule(args.seconds, None)
+    print(f"{'on the scheduler thread':<26} {len(inline) - 1:>10} {longest_gap(inline):>17.1f}")
+
+    executor = Executor(log=lambda message: None)
+    started, jobs = run_schedule(args.seconds, executor)
+    gap = longest_gap(started)
+    print(f"{'by the executor':<26} {len(started) - 1:>10} {gap:>17.1f}")
+
+    print(f"\n{'Slow task':<14} {'Runs as':<40} What happened")
+    for job in jobs:
+        print(f"{job.name:<14} {str(options_of(job.func)):<40} {executor.stats[job]}")
+
+    # The last run or two may still be due when the schedule stops
+    ok = len(started) - 1 >= expected - 2 and gap <= TICK * 1000 + args.max_late
+    print(f"\nWith the executor, no tick run was missed or over {args.max_late:g} ms late: {'yes' if ok else 'NO'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+LAB06 - Job Store Benchmark
+
+Two experiments with the scheduler's job store:
+
+1. Startup: saves 50,000 jobs (intervals and cron lines), then times a
+   restart: opening the store, adding the same jobs, which resume their
+   saved schedules, and writing what changed.
+2. Catch-up: 1,000 jobs run every minute on a simulated clock, the
+   scheduler stops for ten minutes, and restarts under each catch-up
+   policy, with and without jitter. Counts the runs in the first minute
+   after the restart, and the most that start in any one second.
+
+Usage:
+    python benchmark_jobstore.py
+    python benchmark_jobstore.py --jobs 100000
+"""
+
+import argparse
+import collections
+import os
+import shutil
+import tempfile
+import time
+
+from benchmark_scheduler import make_specs
+from jobstore import JobStore
+from scheduler import CATCH_UP_POLICIES, Scheduler
+
+
+def noop():
+    """A job that does nothing."""
+
+
+def add_jobs(scheduler, specs, catch_up="coalesce"):
+    """Add one job per spec, named by its position."""
+    for number, spec in enumerate(specs):
+        scheduler.add(spec, noop, name=f"job-{number}", catch_up=catch_up)
+
+
+def startup(path, count):
+    """Experiment 1: return the seconds of the first start and of a restart."""
+    specs = make_specs(count)
+    started = time.perf_counter()
+    store = JobStore(path)
+    add_jobs(Scheduler(store=store), specs)
+    store.close()
+    first = time.perf_counter() - started
+
+    started = time.perf_counter()
+    store = JobStore(path)
+    scheduler = Scheduler(store=store)
+    add_jobs(scheduler, specs)
+    store.flush()
+    restart = time.perf_counter() - started
+    resumed = sum(1 for job in scheduler.jobs() if job.anchor < scheduler.clock() - 0.5)
+    store.close()
+    return first, restart, resumed
+
+
+def catch_up(workdir, count, downtime, jitter):
+    """Experiment 2: return {policy: (runs in the first minute, most in one second)}."""
+    clock = [time.time()]
+    path = os.path.join(workdir, "catch-up.db")
+    store = JobStore(path)
+    scheduler = Scheduler(clock=lambda: clock[0], store=store)
+    add_jobs(scheduler, ["every 60s"] * count)
+    start = clock[0]
+    for second in range(1, 301):
+        clock[0] = start + second
+        scheduler.run_pending()
+    store.close()
+
+    results = {}
+    for policy in CATCH_UP_POLICIES:
+        copy = os.path.join(workdir, f"{policy}.db")
+        shutil.copy(path, copy)
+        clock[0] = start + 300 + downtime
+        restart = clock[0]
+        store = JobStore(copy)
+        scheduler = Scheduler(clock=lambda: clock[0], store=store, jitter=jitter)
+        per_second = collections.Counter()
+
+        def counted():
+            per_second[int(clock[0] - restart)] += 1
+
+        for number in range(count):
+            scheduler.add("every 60s", counted, name=f"job-{number}", catch_up=policy)
+        for second in range(0, 60):
+            clock[0] = restart + second
+            scheduler.run_pending()
+        store.close()
+        results[policy] = (sum(per_second.values()), max(per_second.values(), default=0))
+    return results
+
+
+def main():
+    """Run both experiments and print their tables."""
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler's job store.")
+    parser.add_argument("--jobs", type=int, default=50_000, help="Jobs saved for the startup test (default: 50000)")
+    args = parser.parse_args()
+
+    print("Job Store Benchmark")
+    print("===================")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "jobs.db")
+        first, restart, resumed = startup(path, args.jobs)
+        print(f"\n1. Startup with {args.jobs} jobs ({os.path.getsize(path) / 1e6:.1f} MB store)\n")
+        print(f"{'First start':<28} {first:>6.2f} s")
+        print(f"{'Restart, schedules resumed':<28} {restart:>6.2f} s  ({resumed} of {args.jobs} resumed)")
+
+        print("\n2. Catch-up: 1000 jobs every 60 s, down for 10 minutes, first minute after the restart\n")
+        print(f"{'Policy':<10} {'Jitter':>7} {'Runs':>7} {'Most in one second':>19}")
+        for jitter in (0, 30):
+            for policy, (runs, peak) in catch_up(workdir, 1000, 600, jitter).items():
+                print(f"{policy:<10} {jitter:>5} s {runs:>7} {peak:>19}")
+    print("\nEach job missed 10 runs. With jitter, catch-up runs are spread over the first 30 s.")
+
+
+if __name__ == "__main__":
+    main()
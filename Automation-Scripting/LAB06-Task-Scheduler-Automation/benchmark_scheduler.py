@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+LAB06 - Scheduler Benchmark
+
+Compares the heap scheduler of scheduler.py with a polling loop like
+`schedule.run_pending()` on a one-second tick, which checks every job on
+every tick:
+
+1. Scale: registers 100,000 jobs (intervals and cron lines), then runs a
+   simulated hour, timing each addition and each job run.
+2. Idle: with the same jobs registered and none due for a while, measures
+   the CPU time both use while they wait.
+3. Timeliness: runs a few jobs every 0.75 s for real and measures
+   how late each run starts. Runs that a late scheduler skips show as
+   missing runs.
+
+Usage:
+    python benchmark_scheduler.py
+    python benchmark_scheduler.py --jobs 200000 --idle 10
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from scheduler import Scheduler, parse_spec
+
+CRON_LINES = ("*/5 * * * *", "0 * * * *", "30 2 * * *", "*/15 9-17 * * 1-5", "0 0 * * 0")
+
+
+class PollingScheduler:
+    """The polling loop: every tick, check every job."""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.jobs = []
+
+    def add(self, spec, func):
+        now = self.clock()
+        spec = parse_spec(spec) if isinstance(spec, str) else spec
+        self.jobs.append([spec.next_after(now, now), spec, now, func])
+
+    def run_pending(self, now=None):
+        now = self.clock() if now is None else now
+        ran = 0
+        for job in self.jobs:
+            if job[0] <= now:
+                job[3]()
+                job[0] = job[1].next_after(now, job[2])
+                ran += 1
+        return ran
+
+    def run(self, stop, tick=1.0):
+        while not stop.is_set():
+            self.run_pending()
+            time.sleep(tick)
+
+
+def make_specs(count, seed=1):
+    """A mix of interval specs, from 5 minutes to a day, and cron lines."""
+    rng = random.Random(seed)
+    specs = []
+    for number in range(count):
+        if number % 4 == 3:
+            specs.append(rng.choice(CRON_LINES))
+        else:
+            specs.append(f"every {rng.choice((300, 900, 3600, 21600, 86400))}s")
+    return specs
+
+
+def scale(count):
+    """Experiment 1: add count jobs, then run a simulated hour on both schedulers."""
+    start_time = time.time()
+    clock = [start_time]
+    # Parse outside the timing: both schedulers share the spec parser
+    specs = [parse_spec(spec) for spec in make_specs(count)]
+    results = {}
+    for name, cls in (("heap", Scheduler), ("polling", PollingScheduler)):
+        clock[0] = start_time
+        scheduler = cls(clock=lambda: clock[0])
+        runs = [0]
+
+        def job():
+            runs[0] += 1
+
+        started = time.perf_counter()
+        for spec in specs:
+            scheduler.add(spec, job)
+        add_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for second in range(1, 3601):
+            clock[0] = start_time + second
+            scheduler.run_pending()
+        results[name] = (add_seconds, time.perf_counter() - started, runs[0])
+    return results
+
+
+def idle(count, seconds):
+    """Experiment 2: CPU time used while count jobs wait and none is due."""
+    results = {}
+    specs = ["@yearly"] * count
+    for name, cls in (("heap", Scheduler), ("polling", PollingScheduler)):
+        scheduler = cls()
+        for spec in specs:
+            scheduler.add(spec, lambda: None)
+        stop = threading.Event()
+        runner = threading.Thread(target=scheduler.run if cls is Scheduler else lambda: scheduler.run(stop))
+        runner.start()
+        time.sleep(0.2)  # Let the thread settle into its loop
+        cpu = time.process_time()
+        time.sleep(seconds)
+        results[name] = time.process_time() - cpu
+        if cls is Scheduler:
+            scheduler.stop()
+        stop.set()
+        runner.join()
+    return results
+
+
+def timeliness(seconds, jobs=5, every=0.75):
+    """
+    Experiment 3: runs, and how late they start in ms, measured from the
+    latest time each job was due.
+    """
+    results = {}
+    for name, cls in (("heap", Scheduler), ("polling", PollingScheduler)):
+        scheduler = cls()
+        lateness = []
+        for _ in range(jobs):
+            job = {"added": time.time()}
+
+            def run(job=job):
+                late = (time.time() - job["added"]) % every
+                lateness.append(late * 1000)
+
+            scheduler.add(f"every {every}s", run)
+        stop = threading.Event()
+        runner = threading.Thread(target=scheduler.run if cls is Scheduler else lambda: scheduler.run(stop))
+        runner.start()
+        time.sleep(seconds)
+        if cls is Scheduler:
+            scheduler.stop()
+        stop.set()
+        runner.join()
+        results[name] = (len(lateness), statistics.median(lateness), max(lateness))
+    return results
+
+
+def main():
+    """Run the experiments and print their tables."""
+    parser = argparse.ArgumentParser(description="Benchmark the heap scheduler against a polling loop.")
+    parser.add_argument("--jobs", type=int, default=100_000, help="Jobs registered (default: 100000)")
+    parser.add_argument("--idle", type=float, default=5.0, help="Seconds of idle time measured (default: 5)")
+    args = parser.parse_args()
+
+    print("Scheduler Benchmark")
+    print("===================")
+
+    print(f"\n1. Scale: {args.jobs} jobs, one simulated hour\n")
+    print(f"{'Scheduler':<10} {'Add (us/job)':>13} {'Hour (s)':>9} {'Runs':>10} {'Per run (us)':>13}")
+    for name, (add_seconds, hour_seconds, runs) in scale(args.jobs).items():
+        print(f"{name:<10} {add_seconds / args.jobs * 1e6:>13.1f} {hour_seconds:>9.2f} {runs:>10} "
+              f"{hour_seconds / max(runs, 1) * 1e6:>13.1f}")
+
+    print(f"\n2. Idle: {args.jobs} jobs, none due, {args.idle:g} s\n")
+    print(f"{'Scheduler':<10} {'CPU (ms)':>9} {'Share of a core':>16}")
+    for name, cpu in idle(args.jobs, args.idle).items():
+        print(f"{name:<10} {cpu * 1000:>9.1f} {cpu / args.idle:>16.3%}")
+
+    print("\n3. Timeliness: 5 jobs every 0.75 s, for 6 s (40 runs due)\n")
+    print(f"{'Scheduler':<10} {'Runs':>5} {'Late, median (ms)':>18} {'Late, max (ms)':>15}")
+    for name, (runs, median, worst) in timeliness(6.0).items():
+        print(f"{name:<10} {runs:>5} {median:>18.1f} {worst:>15.1f}")
+    print("\nThe polling loop checks every job on a 1 s tick, like schedule.run_pending() in a sleep(1) loop.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+LAB06 - Task Scheduler Automation (Executor Module)
+
+Runs scheduled tasks off the scheduler's thread, so that a slow task never
+delays the start of another one. Each task declares how it runs with the
+@task decorator:
+
+    @task(execution="process", max_concurrent=1, overlap="queue", timeout=600)
+    def backup_data(): ...
+
+- execution: "thread" (a shared thread pool), "process" (a new process
+  for each run, which a timeout can stop) or "asyncio" (a coroutine
+  function, run on the executor's event loop). By default coroutine
+  functions use asyncio and other functions a thread.
+- max_concurrent: how many runs of the task may be going at once.
+- overlap: what a run that comes due while max_concurrent runs are still
+  going does: "skip" drops it, "queue" waits for one of them to finish,
+  "allow" starts anyway (the limit doesn't apply).
+- timeout: seconds a run may take. A process is terminated and a
+  coroutine cancelled; a thread can't be stopped, so it is only reported,
+  and keeps its slot until it really ends.
+
+All bookkeeping happens on the event loop's thread, so none of it needs
+locks, and handing a run over from the scheduler costs one wakeup of the
+loop.
+"""
+
+import asyncio
+import inspect
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+EXECUTIONS = ("thread", "process", "asyncio")
+OVERLAPS = ("skip", "queue", "allow")
+
+# Threads shared by all thread tasks
+DEFAULT_THREADS = 16
+
+# Processes running at once, for all process tasks together
+DEFAULT_PROCESSES = os.cpu_count() or 2
+
+# Runs a "queue" task keeps waiting at most; more are dropped
+MAX_QUEUED = 100
+
+# Seconds a terminated process gets to exit before it is killed
+KILL_GRACE = 5.0
+
+
+class TaskOptions:
+    """How a task runs; see the module docstring."""
+
+    __slots__ = ("execution", "max_concurrent", "overlap", "timeout")
+
+    def __init__(self, execution=None, max_concurrent=1, overlap="skip", timeout=None):
+        if execution is not None and execution not in EXECUTIONS:
+            raise ValueError(f"execution must be one of {', '.join(EXECUTIONS)}")
+        if overlap not in OVERLAPS:
+            raise ValueError(f"overlap must be one of {', '.join(OVERLAPS)}")
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.execution = execution
+        self.max_concurrent = max_concurrent
+        self.overlap = overlap
+        self.timeout = timeout
+
+    def __str__(self):
+        timeout = f", timeout {self.timeout:g}s" if self.timeout else ""
+        return f"{self.execution or 'thread'}, {self.max_concurrent} at once, {self.overlap}{timeout}"
+
+
+def task(execution=None, max_concurrent=1, overlap="skip", timeout=None):
+    """
+    Decorator declaring how a task runs.
+
+    Args:
+        execution (str): "thread", "process" or "asyncio"
+        max_concurrent (int): Runs of the task at once
+        overlap (str): "skip", "queue" or "allow"
+        timeout (float): Seconds a run may take (default: no limit)
+
+    Returns:
+        callable: A decorator that stores the options on the function
+    """
+    options = TaskOptions(execution, max_concurrent, overlap, timeout)
+
+    def decorate(func):
+        func.task_options = options
+        return func
+    return decorate
+
+
+def options_of(func):
+    """Return func's declared TaskOptions, or the defaults for its kind."""
+    options = getattr(func, "task_options", None)
+    if options is None:
+        options = TaskOptions()
+    if options.execution is None:
+        execution = "asyncio" if inspect.iscoroutinefunction(func) else "thread"
+        options = TaskOptions(execution, options.max_concurrent, options.overlap, options.timeout)
+    return options
+
+
+class TaskStats:
+    """Counts of what happened to one job's runs."""
+
+    __slots__ = ("running", "waiting", "started", "finished", "failed", "timed_out", "skipped", "dropped")
+
+    def __init__(self):
+        self.running = 0
+        self.waiting = 0
+        self.started = 0
+        self.finished = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.skipped = 0
+        self.dropped = 0
+
+    def __str__(self):
+        return (f"{self.started} started, {self.finished} finished, {self.failed} failed, "
+                f"{self.timed_out} timed out, {self.skipped} skipped, {self.dropped} dropped")
+
+
+def _run_in_process(func, args, kwargs):
+    """Entry point of a process run: its exit code tells whether it succeeded."""
+    try:
+        func(*args, **kwargs)
+    except Exception as e:
+        print(f"{func.__name__} failed: {type(e).__name__}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+class Executor:
+    """
+    Runs jobs according to their functions' TaskOptions.
+
+    submit() may be called from any thread and returns at once. Runs are
+    supervised from an event loop on a thread of its own.
+    """
+
+    def __init__(self, threads=DEFAULT_THREADS, processes=DEFAULT_PROCESSES, log=print):
+        self.threads = threads
+        self.processes = processes
+        self.log = log
+        self.stats = {}
+        self._loop = None
+        self._thread = None
+        self._pool = None
+        self._process_slots = None
+        self._tasks = set()
+        # The default "fork" would copy locks that other threads might be holding
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+    def start(self):
+        """Start the event loop thread."""
+        if self._thread is not None:
+            return
+        self._pool = ThreadPoolExecutor(self.threads, thread_name_prefix="task")
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run_loop():
+            asyncio.set_event_loop(self._loop)
+            self._process_slots = asyncio.Semaphore(self.processes)
+            self._loop.call_soon(ready.set)
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run_loop, name="executor", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def submit(self, job):
+        """Hand a due job over; it runs, waits or is skipped per its options."""
+        if self._thread is None:
+            self.start()
+        self._loop.call_soon_threadsafe(self._dispatch, job)
+
+    def _dispatch(self, job):
+        """Start, queue or skip a run of job (on the loop)."""
+        options = options_of(job.func)
+        stats = self.stats.get(job)
+        if stats is None:
+            stats = self.stats[job] = TaskStats()
+        if stats.running < options.max_concurrent or options.overlap == "allow":
+            self._start(job, options, stats)
+        elif options.overlap == "queue" and stats.waiting < MAX_QUEUED:
+            stats.waiting += 1
+        elif options.overlap == "queue":
+            stats.dropped += 1
+            self.log(f"Job {job.name} dropped: {MAX_QUEUED} runs already waiting")
+        else:
+            stats.skipped += 1
+            self.log(f"Job {job.name} skipped: still running")
+
+    def _start(self, job, options, stats):
+        """Start one run of job (on the loop)."""
+        stats.running += 1
+        stats.started += 1
+        run = self._loop.create_task(self._run(job, options, stats))
+        self._tasks.add(run)
+        run.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job, options, stats):
+        """Run job once, then start a waiting run if there is one."""
+        try:
+            if options.execution == "process":
+                await self._run_process(job, options)
+            elif options.execution == "asyncio":
+                await asyncio.wait_for(job.func(*job.args, **job.kwargs), options.timeout)
+            elif not await self._run_thread(job, options, stats):
+                return
+            stats.finished += 1
+        except asyncio.TimeoutError:
+            stats.timed_out += 1
+            self.log(f"Job {job.name} timed out after {options.timeout:g}s")
+        except Exception as e:
+            stats.failed += 1
+            self.log(f"Job {job.name} failed: {type(e).__name__}: {e}")
+        finally:
+            stats.running -= 1
+            if stats.waiting:
+                stats.waiting -= 1
+                self._start(job, options, stats)
+
+    async def _run_thread(self, job, options, stats):
+        """
+        Run job in the thread pool. Returns False if it timed out: that is
+        reported at once, but the run holds its slot until the thread ends,
+        so that max_concurrent stays true.
+        """
+        future = self._in_pool(lambda: job.func(*job.args, **job.kwargs))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), options.timeout)
+            return True
+        except asyncio.TimeoutError:
+            stats.timed_out += 1
+            self.log(f"Job {job.name} timed out after {options.timeout:g}s; its thread can't be stopped")
+        try:
+            await future
+        except Exception:
+            pass
+        return False
+
+    def _in_pool(self, func):
+        """
+        Run func in the thread pool; return a future of its result, like
+        loop.run_in_executor(). A thread still running when shutdown()
+        closes the loop ends without a word, where run_in_executor()'s
+        future would raise "Event loop is closed" in it (on Python 3.8).
+        """
+        loop = self._loop
+        future = loop.create_future()
+        work = self._pool.submit(func)
+
+        def settle():
+            if future.cancelled():
+                return
+            if work.cancelled():
+                future.cancel()
+            elif work.exception() is not None:
+                future.set_exception(work.exception())
+            else:
+                future.set_result(work.result())
+
+        def finished(_):
+            # Called in the pool thread, or here if work was cancelled before it started
+            try:
+                loop.call_soon_threadsafe(settle)
+            except RuntimeError:  # The loop is closed: nobody is waiting any more
+                pass
+
+        def cancelled(_):
+            if future.cancelled():
+                work.cancel()
+
+        future.add_done_callback(cancelled)
+        work.add_done_callback(finished)
+        return future
+
+    async def _run_process(self, job, options):
+        """Run job in a new process, terminated if it times out."""
+        async with self._process_slots:
+            process = self._context.Process(target=_run_in_process, args=(job.func, job.args, job.kwargs),
+                                            name=f"task-{job.name}", daemon=True)
+            await self._in_pool(process.start)
+            try:
+                await asyncio.wait_for(self._exited(process), options.timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                await self._stop_process(process)
+                raise
+            if process.exitcode != 0:
+                raise RuntimeError(f"process exited with code {process.exitcode}")
+
+    def _exited(self, process):
+        """Return a future that completes when process exits."""
+        future = self._loop.create_future()
+        try:
+            # The sentinel becomes readable when the process exits
+            self._loop.add_reader(process.sentinel, self._reap, process, future)
+        except (NotImplementedError, TypeError):  # Event loops without add_reader (Windows)
+            return self._in_pool(process.join)
+        future.add_done_callback(lambda _: self._loop.remove_reader(process.sentinel))
+        return future
+
+    @staticmethod
+    def _reap(process, future):
+        """Collect an exited process and complete its future."""
+        process.join()
+        if not future.done():
+            future.set_result(process.exitcode)
+
+    async def _stop_process(self, process):
+        """Terminate process, killing it if it doesn't exit in KILL_GRACE seconds."""
+        process.terminate()
+        try:
+            await asyncio.wait_for(self._exited(process), KILL_GRACE)
+        except asyncio.TimeoutError:
+            process.kill()
+            await self._loop.run_in_executor(None, process.join)
+
+    def running(self):
+        """Return how many runs are going, in total."""
+        return sum(stats.running for stats in list(self.stats.values()))
+
+    def shutdown(self, timeout=None):
+        """
+        Stop the executor: wait up to timeout seconds for the runs going on,
+        then cancel what remains. Queued runs are dropped. Threads can't be
+        stopped, but the process doesn't wait for them.
+        """
+        if self._thread is None:
+            return
+
+        async def finish():
+            for stats in self.stats.values():
+                stats.waiting = 0
+            tasks = list(self._tasks)
+            if tasks:
+                _, pending = await asyncio.wait(tasks, timeout=timeout)
+                for run in pending:
+                    run.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(finish(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        if sys.version_info >= (3, 9):
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        else:
+            # No cancel_futures before 3.9; the runs cancelled above have
+            # already cancelled their pool work that hadn't started, and
+            # _in_pool() lets the work that had end quietly
+            self._pool.shutdown(wait=False)
+        self._thread = None
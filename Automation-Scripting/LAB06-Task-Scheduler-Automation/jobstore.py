@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+LAB06 - Task Scheduler Automation (Job Store Module)
+
+Keeps the scheduler's state across restarts in an SQLite file: for each
+job, by name, its spec, the time its interval grid started, its next and
+last run and how many times it has run.
+
+Changes are only noted when they happen and written by flush(), all in
+one transaction, which the scheduler calls once per batch of due jobs.
+The database runs in WAL mode with synchronous=NORMAL, so a commit
+doesn't wait for the disk: a crash can lose the last few updates, but
+never corrupts the file.
+"""
+
+import sqlite3
+import threading
+from collections import namedtuple
+
+# What load() returns for each job
+SavedJob = namedtuple("SavedJob", "spec anchor next_run last_run runs")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    name TEXT PRIMARY KEY,
+    spec TEXT NOT NULL,
+    anchor REAL NOT NULL,
+    next_run REAL,
+    last_run REAL,
+    runs INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID
+"""
+
+
+class JobStore:
+    """A job's saved state, by name, in an SQLite file."""
+
+    def __init__(self, path):
+        self.path = path
+        # The scheduler thread and the main thread both use it, one at a time
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(SCHEMA)
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def load(self):
+        """Return every saved job, as {name: SavedJob}."""
+        with self._lock:
+            rows = self._db.execute("SELECT name, spec, anchor, next_run, last_run, runs FROM jobs").fetchall()
+        return {row[0]: SavedJob._make(row[1:]) for row in rows}
+
+    def save(self, job):
+        """Note job's current state, to be written by the next flush()."""
+        row = (job.name, str(job.spec), job.anchor, job.next_run, job.last_run, job.runs)
+        with self._lock:
+            self._pending[job.name] = row
+
+    def delete(self, name):
+        """Note that the job called name is gone."""
+        with self._lock:
+            self._pending[name] = None
+
+    def flush(self):
+        """Write the noted changes in one transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO jobs (name, spec, anchor, next_run, last_run, runs) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", [row for row in pending.values() if row is not None])
+                self._db.executemany("DELETE FROM jobs WHERE name = ?",
+                                     [(name,) for name, row in pending.items() if row is None])
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")
+                # Keep the changes for the next try, unless newer ones replaced them
+                pending.update(self._pending)
+                self._pending = pending
+                raise
+
+    def close(self):
+        """Flush and close the database."""
+        self.flush()
+        with self._lock:
+            self._db.close()
@@ -5,37 +5,572 @@ LAB06 - Task Scheduler Automation
 This script implements a Python-based task scheduler that can run
 recurring tasks at specified intervals without external scheduling tools.
 
+Jobs wait in a min-heap ordered by their next run time. The scheduler
+sleeps until the first of them is due, instead of waking on a fixed tick
+to check every job, so adding, cancelling or running a job costs
+O(log n) however many are registered, and an idle scheduler uses no CPU.
+
+Due jobs are handed to the executor (executor.py), which runs each task
+in a thread, a process or on an event loop as the task declares, so the
+scheduler's thread never waits for a task to finish.
+
+Each job's next and last run are kept in a job store (jobstore.py), so a
+restarted scheduler carries on where it stopped. Runs missed while it was
+down are run once ("coalesce", the default), all ("run-all") or not at
+all ("skip"), after a random delay of up to --jitter seconds so that they
+don't all start at once.
+
+A job's schedule is a spec string, either an interval or a cron line:
+
+    every 20s, every 15 minutes, every 2h, every day
+    0 2 * * *  (minute hour day month weekday), @hourly, @daily, @weekly
+
 Usage:
     python scheduler.py
+    python scheduler.py --demo
+    python scheduler.py --display-only
+    python scheduler.py --catch-up run-all --jitter 60
 """
 
-# TODO: Import necessary modules
-# You'll need the 'schedule' library and your tasks module
+import argparse
+import bisect
+import datetime
+import functools
+import heapq
+import itertools
+import random
+import re
+import signal
+import threading
+import time
 
+from executor import Executor, options_of
+from jobstore import JobStore
+from tasks import (
+    backup_data,
+    check_system,
+    check_website_status,
+    cleanup_old_files,
+    log_event,
+    rotate_logs,
+)
 
-# TODO: Define the setup_schedule function
-# This function should:
-# - Set up all the tasks with their schedules
-# - Use schedule.every().interval.do(task) syntax
-# - Log the initialization
+# Longest the scheduler sleeps at once, in seconds, so that it notices
+# changes of the system clock
+MAX_SLEEP = 60.0
 
+# Seconds running tasks get to finish when the scheduler stops
+SHUTDOWN_TIMEOUT = 10.0
 
-# TODO: Add any helper functions needed
-# For example, a function to clear old logs or display the schedule
+# What to do with runs missed while the scheduler was down
+CATCH_UP_POLICIES = ("coalesce", "run-all", "skip")
 
+# Most missed runs of one job that "run-all" makes up for
+MAX_CATCH_UP = 1000
+
+# Default file for the job store, and most seconds catch-up runs are delayed
+STATE_FILE = "scheduler_state.db"
+DEFAULT_JITTER = 30.0
+
+# Interval units of "every N<unit>" specs, in seconds
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Cron shorthands
+CRON_MACROS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+}
+
+# How many years ahead a cron line is searched for its next match
+CRON_HORIZON_YEARS = 8
+
+
+class Interval:
+    """
+    Runs every `seconds`, on a fixed grid from the time the job was added,
+    so that late runs don't make the schedule drift.
+    """
+
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError("interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, timestamp, anchor=0.0):
+        """Return the first time on the grid from anchor that is after timestamp."""
+        steps = (timestamp - anchor) // self.seconds + 1
+        return anchor + max(steps, 1) * self.seconds
+
+    def __str__(self):
+        for unit in ("d", "h", "m"):
+            if self.seconds % UNITS[unit] == 0:
+                return f"every {self.seconds // UNITS[unit]:g}{unit}"
+        return f"every {self.seconds:g}s"
+
+
+class Cron:
+    """
+    Runs when the local time matches a cron line: minute, hour, day of
+    month, month and day of week (0 or 7 is Sunday). Fields accept *, lists,
+    ranges and steps, e.g. "*/15 9-17 * * 1-5". As in cron, when both day
+    fields are restricted (neither starts with *, so "*/2" isn't) a day
+    matching either of them is enough.
+    """
+
+    FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+    def __init__(self, line):
+        self.line = CRON_MACROS.get(line, line)
+        fields = self.line.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron line needs 5 fields, got {len(fields)}: '{line}'")
+        values = [self._parse_field(text, *field) for text, field in zip(fields, self.FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = values
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        self.days_restricted = not fields[2].startswith("*")
+        self.weekdays_restricted = not fields[4].startswith("*")
+        if self.next_after(time.time()) is None:
+            raise ValueError(f"cron line never matches: '{line}'")
+
+    @staticmethod
+    def _parse_field(text, name, low, high):
+        """Return the sorted values of one cron field."""
+        values = set()
+        for part in text.split(","):
+            match = re.fullmatch(r"(\*|(\d+)(?:-(\d+))?)(?:/(\d+))?", part)
+            if not match:
+                raise ValueError(f"bad cron {name} field: '{text}'")
+            if match.group(1) == "*":
+                start, end = low, high
+            else:
+                start = int(match.group(2))
+                end = int(match.group(3)) if match.group(3) else (high if match.group(4) else start)
+            step = int(match.group(4) or 1)
+            if not low <= start <= end <= high or step < 1:
+                raise ValueError(f"bad cron {name} field: '{text}' (allowed {low}-{high})")
+            values.update(range(start, end + 1, step))
+        return tuple(sorted(values))
+
+    def _day_matches(self, moment):
+        """Whether moment's date matches the day-of-month and day-of-week fields."""
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day or weekday
+        return day and weekday
+
+    def next_after(self, timestamp, anchor=0.0):
+        """
+        Return the first matching minute after timestamp, or None if there
+        is none within CRON_HORIZON_YEARS.
+
+        Each field that doesn't match moves the time to the start of its next
+        possible value, so the search takes a handful of steps, not one per
+        minute.
+        """
+        moment = datetime.datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0)
+        moment += datetime.timedelta(minutes=1)
+        last_year = moment.year + CRON_HORIZON_YEARS
+        while moment.year <= last_year:
+            if moment.month not in self.months:
+                index = bisect.bisect_right(self.months, moment.month)
+                if index < len(self.months):
+                    moment = moment.replace(month=self.months[index], day=1, hour=0, minute=0)
+                else:
+                    moment = moment.replace(year=moment.year + 1, month=self.months[0], day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+                continue
+            if moment.hour not in self.hours:
+                index = bisect.bisect_right(self.hours, moment.hour)
+                if index < len(self.hours):
+                    moment = moment.replace(hour=self.hours[index], minute=0)
+                else:
+                    moment = moment.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+                continue
+            if moment.minute not in self.minutes:
+                index = bisect.bisect_right(self.minutes, moment.minute)
+                if index < len(self.minutes):
+                    moment = moment.replace(minute=self.minutes[index])
+                else:
+                    moment = moment.replace(minute=0) + datetime.timedelta(hours=1)
+                continue
+            return moment.timestamp()
+        return None
+
+    def __str__(self):
+        return self.line
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_spec(text):
+    """
+    Parse a schedule spec.
+
+    Args:
+        text (str): "every N<s|m|h|d>" (or seconds/minutes/hours/days spelt
+            out, e.g. "every 15 minutes", "every day"), a cron line or a
+            cron shorthand such as "@daily"
+
+    Returns:
+        Interval or Cron: The parsed spec
+
+    Raises:
+        ValueError: If the spec is malformed
+
+    Specs hold no state, so one parsed spec serves every job that uses it.
+    """
+    text = " ".join(text.split())
+    match = re.fullmatch(r"every (\d+(?:\.\d+)?)? ?(s|m|h|d|secs?|mins?|seconds?|minutes?|hours?|days?)",
+                         text.lower())
+    if match:
+        return Interval(float(match.group(1) or 1) * UNITS[match.group(2)[0]])
+    if text.lower().startswith("every "):
+        raise ValueError(f"bad interval: '{text}' (units are s, m, h, d, or seconds, minutes, hours, days)")
+    return Cron(text)
+
+
+def missed_runs(spec, first, now, anchor=0.0):
+    """
+    Count the runs of spec from first up to now, at most MAX_CATCH_UP.
+
+    Interval runs are counted arithmetically, cron runs one by one.
+    """
+    if first > now:
+        return 0
+    if isinstance(spec, Interval):
+        return min(int((now - first) // spec.seconds) + 1, MAX_CATCH_UP)
+    count = 0
+    while first is not None and first <= now and count < MAX_CATCH_UP:
+        count += 1
+        first = spec.next_after(first, anchor)
+    return count
+
+
+class Job:
+    """A registered task: what to run, when, and how often it has run."""
+
+    __slots__ = ("name", "spec", "func", "args", "kwargs", "anchor", "next_run", "last_run", "runs",
+                 "catch_up", "_entry")
+
+    def __init__(self, name, spec, func, args, kwargs, anchor):
+        self.name = name
+        self.spec = spec
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.anchor = anchor
+        self.next_run = None
+        self.last_run = None
+        self.runs = 0
+        # Missed runs still to make up for, under "run-all"
+        self.catch_up = 0
+        self._entry = None
+
+    def __str__(self):
+        when = datetime.datetime.fromtimestamp(self.next_run).strftime("%Y-%m-%d %H:%M:%S") \
+            if self.next_run is not None else "never"
+        return f"{self.name} ({self.spec}), next run {when}"
+
+
+class Scheduler:
+    """
+    Runs jobs at the times of their specs.
+
+    The jobs wait in a heap of [next run, sequence, job] entries. Cancelling
+    a job only blanks its entry, which is then skipped when it comes up, so
+    no operation ever scans the heap. run() sleeps on a condition until the
+    first entry is due; adding a job that is due sooner wakes it early.
+
+    With an executor, due jobs are submitted to it; without one they run
+    on the scheduler's own thread, one after the other.
+
+    With a job store, each job's state is saved as it changes, and a job
+    added under a name the store knows, with the same spec, resumes its
+    saved schedule. Job names must then be unique.
+    """
+
+    def __init__(self, clock=time.time, executor=None, store=None, jitter=0.0):
+        self.clock = clock
+        self.executor = executor
+        self.store = store
+        self.jitter = jitter
+        self._saved = store.load() if store is not None else {}
+        self._names = set()
+        self._heap = []
+        self._jobs = 0
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._stopped = False
+
+    def add(self, spec, func, *args, name=None, catch_up="coalesce", **kwargs):
+        """
+        Register func(*args, **kwargs) to run on spec.
+
+        Args:
+            spec (str | Interval | Cron): When to run, see parse_spec()
+            func (callable): The task
+            name (str): Name for logs and the job store (default: the
+                function's name)
+            catch_up (str): What to do with runs of a saved job that were
+                missed while the scheduler was down, see CATCH_UP_POLICIES
+
+        Returns:
+            Job: The new job, which cancel() accepts
+
+        Raises:
+            ValueError: If catch_up is unknown, or with a job store, if the
+                name is already taken
+        """
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"catch_up must be one of {', '.join(CATCH_UP_POLICIES)}")
+        if isinstance(spec, str):
+            spec = parse_spec(spec)
+        now = self.clock()
+        job = Job(name or getattr(func, "__name__", repr(func)), spec, func, args, kwargs, now)
+        with self._condition:
+            if self.store is not None:
+                if job.name in self._names:
+                    raise ValueError(f"a job called '{job.name}' already exists")
+                self._names.add(job.name)
+            saved = self._saved.pop(job.name, None)
+            if saved is not None and saved.spec == str(spec) and saved.next_run is not None:
+                job.anchor, job.last_run, job.runs = saved.anchor, saved.last_run, saved.runs
+                next_run = self._resume(job, saved.next_run, now, catch_up)
+            else:
+                next_run = spec.next_after(now, now)
+            self._jobs += 1
+            self._push(job, next_run)
+            if self.store is not None and (saved is None or next_run != saved.next_run):
+                self.store.save(job)
+        return job
+
+    def _resume(self, job, next_run, now, catch_up):
+        """Return when a saved job runs next, applying catch_up to missed runs."""
+        if next_run > now:
+            return next_run
+        if catch_up == "skip":
+            return job.spec.next_after(now, job.anchor)
+        if catch_up == "run-all":
+            job.catch_up = missed_runs(job.spec, next_run, now, job.anchor) - 1
+        # A random delay, so that a restart doesn't start every missed run at once
+        return now + random.uniform(0, self.jitter)
+
+    def cancel(self, job):
+        """Stop running job. Returns False if it wasn't scheduled."""
+        with self._condition:
+            if job._entry is None:
+                return False
+            job._entry[2] = None
+            job._entry = None
+            job.next_run = None
+            self._jobs -= 1
+            self._names.discard(job.name)
+            if self.store is not None:
+                self.store.delete(job.name)
+            return True
+
+    def jobs(self):
+        """Return the scheduled jobs, soonest first."""
+        with self._condition:
+            return [entry[2] for entry in sorted(self._heap) if entry[2] is not None]
+
+    def __len__(self):
+        return self._jobs
+
+    def next_run(self):
+        """Return the time the next job is due, or None if there are no jobs."""
+        with self._condition:
+            self._drop_cancelled()
+            return self._heap[0][0] if self._heap else None
+
+    def _push(self, job, when):
+        """Queue job for when; the caller holds the condition."""
+        entry = [when, next(self._sequence), job]
+        job._entry = entry
+        job.next_run = when
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._condition.notify()
+
+    def _drop_cancelled(self):
+        """Pop cancelled entries off the top of the heap."""
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now):
+        """Take the jobs due at now off the heap and queue their next runs."""
+        due = []
+        with self._condition:
+            while self._heap and self._heap[0][0] <= now:
+                when, _, job = heapq.heappop(self._heap)
+                if job is None:
+                    continue
+                job.last_run = when
+                job.runs += 1
+                if job.catch_up:
+                    # Make up for another missed run right away
+                    job.catch_up -= 1
+                    next_run = when
+                else:
+                    # The next run after now, so that a late scheduler skips missed runs
+                    next_run = job.spec.next_after(max(when, now), job.anchor)
+                if next_run is None:
+                    job._entry = None
+                    job.next_run = None
+                    self._jobs -= 1
+                else:
+                    self._push(job, next_run)
+                if self.store is not None:
+                    self.store.save(job)
+                due.append(job)
+        return due
+
+    def run_pending(self, now=None):
+        """
+        Run the jobs that are due, in order.
+
+        Args:
+            now (float): The time to run up to (default: the clock)
+
+        Returns:
+            int: How many jobs ran
+        """
+        due = self._pop_due(self.clock() if now is None else now)
+        for job in due:
+            self._run_job(job)
+        return len(due)
+
+    def _run_job(self, job):
+        """Run one job; an error is logged and doesn't stop the scheduler."""
+        if self.executor is not None:
+            self.executor.submit(job)
+            return
+        try:
+            job.func(*job.args, **job.kwargs)
+        except Exception as e:
+            log_event(f"Job {job.name} failed: {type(e).__name__}: {e}")
+
+    def run(self):
+        """Run jobs as they come due, until stop() is called."""
+        with self._condition:
+            self._stopped = False
+        while True:
+            self.run_pending()
+            if self.store is not None:
+                self.store.flush()
+            with self._condition:
+                if self._stopped:
+                    return
+                self._drop_cancelled()
+                delay = MAX_SLEEP if not self._heap else min(self._heap[0][0] - self.clock(), MAX_SLEEP)
+                if delay > 0:
+                    self._condition.wait(delay)
+                if self._stopped:
+                    return
+
+    def stop(self):
+        """Make run() return, once the job it is running inline (if any) has finished."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+
+def setup_schedule(scheduler, quick_demo=False, catch_up="coalesce"):
+    """
+    Set up the task schedule.
+
+    Args:
+        scheduler (Scheduler): The scheduler to add the tasks to
+        quick_demo (bool): If True, schedule tasks more frequently for demo purposes
+        catch_up (str): What to do with runs missed while the scheduler was down
+    """
+    log_event("Setting up task scheduler...")
+
+    if quick_demo:
+        scheduler.add("every 20s", check_system, catch_up=catch_up)
+        scheduler.add("every 1m", backup_data, catch_up=catch_up)
+        scheduler.add("every 2m", cleanup_old_files, max_age_days=0, catch_up=catch_up)
+        scheduler.add("every 30s", check_website_status, catch_up=catch_up)
+        scheduler.add("every 45s", rotate_logs, max_size_kb=1, catch_up=catch_up)
+        scheduler.add("every 10s", log_event, "Scheduler heartbeat", name="heartbeat", catch_up=catch_up)
+    else:
+        scheduler.add("*/15 * * * *", check_system, catch_up=catch_up)
+        scheduler.add("0 2 * * *", backup_data, catch_up=catch_up)
+        scheduler.add("@weekly", cleanup_old_files, catch_up=catch_up)
+        scheduler.add("every 1h", check_website_status, catch_up=catch_up)
+        scheduler.add("@daily", rotate_logs, catch_up=catch_up)
+        scheduler.add("every 1h", log_event, "Scheduler heartbeat", name="heartbeat", catch_up=catch_up)
+
+    log_event("Task scheduler initialized successfully")
+
+
+def display_schedule(scheduler):
+    """Display all scheduled jobs, soonest first, and how they run."""
+    log_event("Current schedule:")
+    for job in scheduler.jobs():
+        log_event(f"  - {job} [{options_of(job.func)}]")
+
+
+def handle_signal(signum, frame):
+    """Stop on SIGTERM the same way as on Ctrl+C."""
+    raise KeyboardInterrupt
+
+
+def parse_arguments():
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Task Scheduler Automation")
+    parser.add_argument("--demo", action="store_true", help="Run in quick demo mode with shorter intervals")
+    parser.add_argument("--display-only", action="store_true", help="Display schedule and exit")
+    parser.add_argument("--state", metavar="FILE", default=STATE_FILE,
+                        help=f"Job store that keeps the schedule across restarts (default: {STATE_FILE})")
+    parser.add_argument("--no-state", action="store_true", help="Start afresh and keep no job store")
+    parser.add_argument("--catch-up", choices=CATCH_UP_POLICIES, default="coalesce",
+                        help="Runs missed while the scheduler was down: run once, all, or skip (default: coalesce)")
+    parser.add_argument("--jitter", type=float, default=DEFAULT_JITTER,
+                        help=f"Most seconds a catch-up run is delayed, at random (default: {DEFAULT_JITTER:g})")
+    return parser.parse_args()
+
+
+def main():
+    """Main function to run the scheduler."""
+    args = parse_arguments()
 
-if __name__ == "__main__":
     print("Task Scheduler Automation")
     print("========================")
-    
-    # TODO: Set up the task schedule
-    
-    # TODO: Implement the main loop
-    # The loop should:
-    # - Run pending tasks
-    # - Sleep for a short interval
-    # - Handle clean termination (Ctrl+C)
-
-    
-    print("\nRemember to install dependencies:")
-    print("pip install schedule") 
\ No newline at end of file
+
+    store = None if args.no_state else JobStore(args.state)
+    executor = Executor(log=log_event)
+    scheduler = Scheduler(executor=executor, store=store, jitter=args.jitter)
+    setup_schedule(scheduler, quick_demo=args.demo, catch_up=args.catch_up)
+    display_schedule(scheduler)
+
+    if args.display_only:
+        log_event("Display-only mode. Exiting.")
+        return
+
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    log_event("Scheduler started. Press Ctrl+C to exit.")
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        log_event("Scheduler stopped by keyboard interrupt.")
+    finally:
+        log_event(f"Waiting up to {SHUTDOWN_TIMEOUT:g}s for {executor.running()} running tasks...")
+        try:
+            executor.shutdown(timeout=SHUTDOWN_TIMEOUT)
+        except KeyboardInterrupt:
+            log_event("Interrupted again: not waiting for running tasks.")
+        if store is not None:
+            store.close()
+        log_event("Scheduler shutdown complete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,48 +3,260 @@
 LAB06 - Task Scheduler Automation (Tasks Module)
 
 This module contains the definitions of tasks that will be scheduled.
-Each task is implemented as a function that performs a specific job.
+Each task is implemented as a function that performs a specific job,
+and declares with @task how the executor runs it (see executor.py).
 
 These tasks will be imported and scheduled in scheduler.py.
 """
 
-# TODO: Import necessary modules
-# You'll need datetime, time, and possibly other modules
+import datetime
+import os
+import random
+import shutil
+import threading
+import time
 
+from executor import task
 
-# TODO: Implement a task logging function
-# This function should:
-# - Generate a timestamp
-# - Print a formatted log message
-# - Optionally write to a log file
+try:
+    import psutil
+except ImportError:  # Optional: check_system() reports a simulated status without it
+    psutil = None
 
+try:
+    import requests
+except ImportError:  # Optional: check_website_status() needs it
+    requests = None
 
-# TODO: Define a system check task
-# This function should:
-# - Log the start of the check
-# - Perform some simulated system check
-# - Log the result
+# Default log file for log_event()
+LOG_FILE = "task_log.txt"
 
+# Tasks may log from several threads at once
+_log_lock = threading.Lock()
 
-# TODO: Define a backup task
-# This function should:
-# - Log the start of the backup
-# - Simulate a backup process
-# - Log the completion
 
+def log_event(message, log_file=LOG_FILE):
+    """
+    Log a message with timestamp both to console and file.
 
-# TODO: Define a cleanup task
-# This function should:
-# - Log the start of cleanup
-# - Simulate a cleanup process (e.g., removing old files)
-# - Log the results
+    Args:
+        message (str): The message to log
+        log_file (str): The file to write logs to (None to only print)
+    """
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    log_entry = f"[{timestamp}] {message}"
 
+    with _log_lock:
+        print(log_entry)
+        if log_file:
+            with open(log_file, "a") as f:
+                f.write(log_entry + "\n")
 
-# TODO: BONUS - Define an advanced task
-# Consider implementing something more complex like:
-# - A task that reads/writes files
-# - A task that makes an API call
-# - A task that checks system resources
+
+@task(execution="thread", overlap="skip", timeout=30)
+def check_system():
+    """
+    System check task.
+
+    Checks CPU, memory and disk usage and logs the status. Without psutil
+    the status is simulated.
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    log_event("Performing system check...")
+
+    try:
+        if psutil is not None:
+            cpu_percent = psutil.cpu_percent(interval=1)
+            memory = psutil.virtual_memory()
+            disk = psutil.disk_usage("/")
+
+            log_event(f"CPU usage: {cpu_percent}%")
+            log_event(f"Memory usage: {memory.percent}%")
+            log_event(f"Disk usage: {disk.percent}%")
+
+            if cpu_percent > 80 or memory.percent > 80 or disk.percent > 90:
+                status = "Warning: High resource usage detected"
+            else:
+                status = "All systems normal"
+        else:
+            time.sleep(1)  # Simulate the time a real check takes
+            status = random.choice([
+                "All systems normal",
+                "Warning: High CPU usage detected",
+                "Warning: Low disk space",
+                "Warning: Memory usage high",
+            ])
+
+        log_event(f"System check result: {status}")
+        return True
+
+    except OSError as e:
+        log_event(f"Error in system check: {e}")
+        return False
+
+
+# A process, so that a timeout can stop it; runs that come due meanwhile wait their turn
+@task(execution="process", overlap="queue", timeout=600)
+def backup_data(source_dir="./data", backup_dir="./backups"):
+    """
+    Simulated backup task.
+
+    Args:
+        source_dir (str): Directory to backup
+        backup_dir (str): Where to store the backup
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    log_event(f"Starting backup process: {source_dir} -> {backup_dir}")
+
+    try:
+        os.makedirs(source_dir, exist_ok=True)
+        os.makedirs(backup_dir, exist_ok=True)
+
+        # Create a timestamped backup directory
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_path = os.path.join(backup_dir, f"backup_{timestamp}")
+        os.makedirs(backup_path, exist_ok=True)
+
+        time.sleep(3)  # Simulate time for copying files
+
+        with open(os.path.join(backup_path, "backup_info.txt"), "w") as f:
+            f.write(f"Backup created at: {timestamp}\n")
+            f.write(f"Source directory: {os.path.abspath(source_dir)}\n")
+            f.write("This is a simulated backup file.\n")
+
+        log_event(f"Backup completed successfully: {backup_path}")
+        return True
+
+    except OSError as e:
+        log_event(f"Error in backup process: {e}")
+        return False
+
+
+@task(execution="thread", overlap="skip", timeout=300)
+def cleanup_old_files(directory="./backups", max_age_days=7):
+    """
+    Clean up old files in a directory based on age.
+
+    Args:
+        directory (str): Directory to clean
+        max_age_days (int): Maximum age of files to keep in days
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    log_event(f"Starting cleanup of old files in {directory}")
+
+    try:
+        if not os.path.exists(directory):
+            log_event(f"Directory {directory} does not exist, skipping cleanup")
+            return True
+
+        cutoff_time = time.time() - max_age_days * 24 * 60 * 60
+        count_removed = 0
+
+        # Bottom-up, so that directories emptied here are removed too
+        for root, dirs, files in os.walk(directory, topdown=False):
+            for name in files:
+                file_path = os.path.join(root, name)
+                if os.stat(file_path).st_mtime < cutoff_time:
+                    os.remove(file_path)
+                    count_removed += 1
+                    log_event(f"Removed old file: {file_path}")
+
+            for name in dirs:
+                dir_path = os.path.join(root, name)
+                if not os.listdir(dir_path):
+                    os.rmdir(dir_path)
+                    log_event(f"Removed empty directory: {dir_path}")
+
+        log_event(f"Cleanup completed. Removed {count_removed} old files.")
+        return True
+
+    except OSError as e:
+        log_event(f"Error during cleanup: {e}")
+        return False
+
+
+@task(execution="thread", overlap="skip", timeout=15)
+def check_website_status(url="https://www.example.com"):
+    """
+    Check if a website is available and measure response time.
+
+    Args:
+        url (str): The URL to check
+
+    Returns:
+        bool: True if the site answered with status 200, False otherwise
+    """
+    if requests is None:
+        log_event("Skipping website check: pip install requests")
+        return False
+
+    log_event(f"Checking website status: {url}")
+
+    try:
+        start_time = time.time()
+        response = requests.get(url, timeout=10)
+        response_time = time.time() - start_time
+
+        if response.status_code == 200:
+            log_event(f"Website {url} is UP (Status: {response.status_code}, Response time: {response_time:.2f}s)")
+            return True
+        log_event(f"Website {url} returned status code: {response.status_code}")
+        return False
+
+    except requests.RequestException as e:
+        log_event(f"Error checking website {url}: {e}")
+        return False
+
+
+@task(execution="thread", overlap="skip")
+def rotate_logs(log_file=LOG_FILE, max_size_kb=1024, backup_count=3):
+    """
+    Rotate log files when they exceed a certain size.
+
+    Args:
+        log_file (str): The log file to rotate
+        max_size_kb (int): Maximum file size in KB before rotation
+        backup_count (int): Number of backup files to keep
+
+    Returns:
+        bool: True if rotation was performed, False otherwise
+    """
+    if not os.path.exists(log_file):
+        return False
+
+    file_size_kb = os.path.getsize(log_file) / 1024
+    if file_size_kb <= max_size_kb:
+        return False
+
+    log_event(f"Rotating log file: {log_file} ({file_size_kb:.2f} KB)")
+
+    try:
+        with _log_lock:
+            oldest_log = f"{log_file}.{backup_count}"
+            if os.path.exists(oldest_log):
+                os.remove(oldest_log)
+
+            for i in range(backup_count - 1, 0, -1):
+                src = f"{log_file}.{i}"
+                if os.path.exists(src):
+                    shutil.move(src, f"{log_file}.{i + 1}")
+
+            shutil.move(log_file, f"{log_file}.1")
+            with open(log_file, "w") as f:
+                f.write(f"Log rotated at {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+        log_event("Log rotation completed")
+        return True
+
+    except OSError as e:
+        print(f"Error during log rotation: {e}")  # Use print since logging might fail
+        return False
 
 
 # This allows you to test the tasks directly
@@ -53,3 +265,18 @@ if __name__ == "__main__":
     print("======================")
     print("This module contains tasks to be scheduled.")
     print("It's not meant to be run directly, but you can test tasks here.")
+
+    print("\nTesting check_system task:")
+    check_system()
+
+    print("\nTesting backup_data task:")
+    backup_data()
+
+    print("\nTesting cleanup_old_files task:")
+    cleanup_old_files()
+
+    print("\nTesting check_website_status task:")
+    check_website_status()
+
+    print("\nTesting rotate_logs task:")
+    rotate_logs()
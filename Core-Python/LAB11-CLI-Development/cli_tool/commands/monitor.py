@@ -13,6 +13,10 @@ a common DevOps task for observability.
 # import psutil
 # from ..utils import print_success, print_error, print_info, format_bytes
 
+import time
+
+from .processes import KEYS, ProcessTracker, format_processes
+
 
 def monitor_cpu(args):
     """
@@ -102,6 +106,44 @@ def monitor_disk(args):
     return 0
 
 
+def monitor_processes(args):
+    """
+    Display the top processes by CPU or memory.
+
+    Reads /proc twice, --interval seconds apart (default: 1), since CPU
+    use is measured between two reads. Both read every process, as a
+    single listing has no later ticks in which to catch up on the idle
+    ones.
+
+    Args:
+        args: Command-line arguments (processes: how many, sort: cpu or rss)
+
+    Returns:
+        int: Exit code (0 for success, non-zero for failure)
+    """
+    print_info = print  # Placeholder until utils are implemented
+    print_info("Process Monitoring")
+    print_info("------------------")
+
+    count = getattr(args, 'processes', None) or 10
+    key = getattr(args, 'sort', None) or "cpu"
+    if key not in KEYS:
+        print(f"Error: cannot sort processes by {key!r}, only by {' or '.join(KEYS)}")
+        return 1
+    try:
+        tracker = ProcessTracker(count, key)
+        tracker.update()
+        time.sleep(getattr(args, 'interval', None) or 1.0)
+        tracker.update(full=True)
+    except OSError as e:
+        print(f"Error: cannot read processes ({e}); this needs Linux /proc")
+        return 1
+
+    print_info(f"Processes: {len(tracker)}, top {count} by {key}")
+    print_info(format_processes(tracker.top()))
+    return 0
+
+
 def monitor_all(args):
     """
     Monitor all system resources and display information.
@@ -129,6 +171,9 @@ def monitor_all(args):
     monitor_memory(args)
     print_info("")
     monitor_disk(args)
+    if getattr(args, 'processes', None):
+        print_info("")
+        monitor_processes(args)
     
     return 0
 
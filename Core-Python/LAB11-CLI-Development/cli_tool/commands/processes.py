@@ -0,0 +1,289 @@
+"""
+Process tracking for the monitoring commands.
+
+Tracks the top processes by CPU or memory (RSS) on Linux, without reading
+every process on every tick, so that `monitor all --processes N` stays
+cheap on hosts with tens of thousands of them:
+
+- What doesn't change (name, user, command line) is read once per
+  process, and user and command line only for the processes shown.
+- A tick reads /proc/<pid>/stat, and nothing else, for the "hot"
+  processes: those that used CPU since they were last read, and the
+  current top ones. Up to FULL_SCAN processes, the others are read every
+  tick too, as that is still cheap. Past that they take turns, about
+  SCAN_FACTOR * sqrt(n) of them per tick, so the list lags: an idle
+  process that gets busy shows up only when its turn comes, up to
+  sqrt(n) / SCAN_FACTOR ticks later. Its CPU use is then averaged since
+  its last read, so a short burst that ended in between shows diluted.
+- New processes are found by listing /proc, a set difference done in C,
+  and read on their first tick. Until a process has been read twice, its
+  CPU is its average since it started, as ps shows it.
+- Each read pushes the process's new value on a heap; entries a newer
+  read replaced are skipped when they come up. The top N is popped off
+  the heap, so a tick costs O((hot + scanned + N) log n), not O(n).
+
+The same tracker as LAB04's processes.py, where benchmark_processes.py
+measures it against a full walk of /proc.
+"""
+
+import heapq
+import math
+import os
+import pwd
+import time
+from collections import deque, namedtuple
+
+PROC = "/proc"
+
+# What the top processes can be sorted by
+KEYS = ("cpu", "rss")
+
+# Idle processes read per tick: SCAN_FACTOR * sqrt(processes), at least MIN_SCAN
+SCAN_FACTOR = 4
+MIN_SCAN = 32
+
+# Up to this many processes, every one is read on every tick
+FULL_SCAN = 1000
+
+# What top() returns for each process; cpu in percent of one core, rss in bytes
+ProcessInfo = namedtuple("ProcessInfo", "pid name user cpu rss command")
+
+# Fields after the ")" that ends the name in /proc/<pid>/stat (field 3 is index 0)
+_UTIME, _STIME, _STARTTIME, _RSS = 11, 12, 19, 21
+
+
+class _Process:
+    """What the tracker knows of one process."""
+
+    __slots__ = ("pid", "stat_path", "start", "name", "user", "command",
+                 "ticks", "read_at", "cpu", "measured", "rss", "version", "hot")
+
+    def __init__(self, pid, stat_path):
+        self.pid = pid
+        self.stat_path = stat_path
+        self.start = None      # Start time in clock ticks after boot; tells reused PIDs apart
+        self.name = None
+        self.user = None       # Looked up when first shown
+        self.command = None    # Likewise
+        self.ticks = 0         # CPU time used, in clock ticks
+        self.read_at = None
+        self.cpu = 0.0
+        self.measured = False  # Whether cpu is since the last read, not since the start
+        self.rss = 0
+        self.version = 0       # Which of its heap entries is current
+        self.hot = False
+
+
+class ProcessTracker:
+    """
+    Keeps the top processes by CPU or RSS, reading /proc incrementally.
+
+    Call update() once per tick, then top() for the current top processes.
+    """
+
+    def __init__(self, count=10, key="cpu", proc=PROC, scan_factor=SCAN_FACTOR, full_scan=FULL_SCAN):
+        """
+        Args:
+            count (int): How many top processes to keep
+            key (str): "cpu" or "rss"
+            proc (str): Where procfs is mounted
+            scan_factor (float): Idle processes read per tick, per square
+                root of the number of processes
+            full_scan (int): Up to how many processes every one is read
+                on every tick
+
+        Raises:
+            ValueError: If key isn't one of KEYS
+        """
+        if key not in KEYS:
+            raise ValueError(f"key must be one of {', '.join(KEYS)}")
+        self.count = count
+        self.key = key
+        self.proc = proc
+        self.scan_factor = scan_factor
+        self.full_scan = full_scan
+        self.reads = 0         # stat files read by the last update()
+        self._clock_ticks = os.sysconf("SC_CLK_TCK")
+        self._page_size = os.sysconf("SC_PAGE_SIZE")
+        self._uptime_path = os.path.join(proc, "uptime")
+        self._listed = set()   # Names in proc at the last update()
+        self._processes = {}   # PID (as its name in proc) -> _Process
+        self._cold = deque()   # PIDs of idle processes, in the order they take turns
+        self._hot = set()
+        self._heap = []        # (-value, version, pid)
+        self._top = []
+        self._users = {}
+
+    def __len__(self):
+        return len(self._processes)
+
+    def update(self, now=None, full=False):
+        """
+        Read what changed since the last tick, and find the top processes.
+
+        Args:
+            now (float): The time of the tick, by time.monotonic() (default: now)
+            full (bool): Read every process, however many there are, as
+                for a one-off listing that can't wait for the idle ones' turns
+        """
+        now = time.monotonic() if now is None else now
+        with open(self._uptime_path, "rb") as f:
+            uptime = float(f.read().split()[0])
+
+        first = not self._listed
+        listed = set(os.listdir(self.proc))
+        for pid in self._listed - listed:
+            self._processes.pop(pid, None)
+        new = [pid for pid in listed - self._listed if pid.isdigit()]
+        self._listed = listed
+
+        due = [pid for pid in self._hot if pid in self._processes]
+        for pid in new:
+            self._processes[pid] = _Process(pid, os.path.join(self.proc, pid, "stat"))
+            due.append(pid)
+        if full or len(self._processes) <= self.full_scan:
+            budget = len(self._cold)
+        else:
+            budget = max(MIN_SCAN, math.ceil(self.scan_factor * math.sqrt(len(self._processes))))
+        for _ in range(min(budget, len(self._cold))):
+            pid = self._cold.popleft()
+            process = self._processes.get(pid)
+            if process is not None and not process.hot:  # Skip if gone, or hot since it was queued
+                due.append(pid)
+
+        self.reads = len(due)
+        hot = set()
+        for pid in due:
+            process = self._processes[pid]
+            if not self._read(process, now, uptime):
+                del self._processes[pid]
+            elif process.cpu > 0 and process.measured or not process.measured and not first:
+                # Busy, or started since the last tick: read it again next tick
+                hot.add(pid)
+
+        self._top = self._pop_top()
+        hot.update(process.pid for process in self._top)
+        for pid in self._hot.union(due):
+            process = self._processes.get(pid)
+            if process is not None:
+                process.hot = pid in hot
+                if not process.hot:
+                    self._cold.append(pid)
+        self._hot = hot
+
+        if len(self._heap) > 2 * len(self._processes) + 64:
+            self._rebuild_heap()
+
+    def _read(self, process, now, uptime):
+        """Read a process's stat file and push its new value; return False if it is gone."""
+        try:
+            fd = os.open(process.stat_path, os.O_RDONLY)
+            try:
+                data = os.read(fd, 4096)
+            finally:
+                os.close(fd)
+        except OSError:
+            return False
+        # The name may hold spaces and parentheses, so split after its last ")"
+        end = data.rfind(b")")
+        fields = data[end + 2:].split()
+        if len(fields) <= _RSS:
+            return False
+        ticks = int(fields[_UTIME]) + int(fields[_STIME])
+        start = int(fields[_STARTTIME])
+
+        if start != process.start:
+            # New, or its PID was reused: start over, with its CPU use since it started
+            process.start = start
+            process.name = data[data.find(b"(") + 1:end].decode(errors="replace")
+            process.user = process.command = None
+            age = uptime - start / self._clock_ticks
+            process.cpu = 100.0 * ticks / self._clock_ticks / age if age > 0 else 0.0
+            process.measured = False
+        else:
+            elapsed = now - process.read_at
+            if elapsed > 0:
+                process.cpu = 100.0 * (ticks - process.ticks) / self._clock_ticks / elapsed
+            process.measured = True
+        process.ticks = ticks
+        process.read_at = now
+        process.rss = int(fields[_RSS]) * self._page_size
+
+        process.version += 1
+        value = self._value(process)
+        if value > 0:
+            heapq.heappush(self._heap, (-value, process.version, process.pid))
+        return True
+
+    def _value(self, process):
+        """What the processes are ranked by."""
+        return process.cpu if self.key == "cpu" else process.rss
+
+    def _pop_top(self):
+        """Find the top processes: pop current entries off the heap, then push them back."""
+        heap = self._heap
+        top = []
+        entries = []
+        while heap and len(top) < self.count:
+            entry = heapq.heappop(heap)
+            process = self._processes.get(entry[2])
+            if process is not None and process.version == entry[1]:
+                top.append(process)
+                entries.append(entry)
+        for entry in entries:
+            heapq.heappush(heap, entry)
+        return top
+
+    def _rebuild_heap(self):
+        """Drop the stale entries, once they outnumber the current ones."""
+        self._heap = [(-self._value(process), process.version, process.pid)
+                      for process in self._processes.values() if self._value(process) > 0]
+        heapq.heapify(self._heap)
+
+    def _user(self, process):
+        """The name of the user a process runs as."""
+        try:
+            uid = os.stat(os.path.dirname(process.stat_path)).st_uid
+        except OSError:
+            return "?"
+        if uid not in self._users:
+            try:
+                self._users[uid] = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                self._users[uid] = str(uid)
+        return self._users[uid]
+
+    def _command(self, process):
+        """A process's command line, or its name in brackets if it has none (kernel threads)."""
+        try:
+            with open(os.path.join(os.path.dirname(process.stat_path), "cmdline"), "rb") as f:
+                command = f.read(4096).replace(b"\0", b" ").strip()
+        except OSError:
+            command = b""
+        return command.decode(errors="replace") or f"[{process.name}]"
+
+    def top(self):
+        """
+        Return the top processes as of the last update().
+
+        Returns:
+            list: ProcessInfo tuples, highest first
+        """
+        result = []
+        for process in self._top:
+            if process.user is None:
+                process.user = self._user(process)
+                process.command = self._command(process)
+            result.append(ProcessInfo(int(process.pid), process.name, process.user,
+                                      process.cpu, process.rss, process.command))
+        return result
+
+
+def format_processes(processes):
+    """Format ProcessInfo tuples as a table, one line per process."""
+    lines = [f"{'PID':>7} {'USER':<10} {'CPU%':>6} {'RSS':>10}  COMMAND"]
+    for info in processes:
+        lines.append(f"{info.pid:>7} {info.user[:10]:<10} {info.cpu:>6.1f} {info.rss / 1048576:>8.1f} MB  "
+                     f"{info.command[:60]}")
+    return "\n".join(lines)
+